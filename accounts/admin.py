@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from core.paginacion import PaginadorConteoEstimado
 from .forms import CustomUserCreationForm, CustomUserAdminForm
 from .models import CustomUser
 
@@ -17,6 +18,10 @@ class CustomUserAdmin(UserAdmin):
         'is_staff',
     )
     list_filter = ('tipo_usuario', 'division', 'is_staff', 'is_active')
+    list_select_related = ('division',)
+    # Sin COUNT(*) completo en cada página del listado (miles de jugadores)
+    paginator = PaginadorConteoEstimado
+    show_full_result_count = False
 
     # Campos mostrados al editar
     fieldsets = (
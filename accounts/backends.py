@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import F
+
+from equipos.models import Equipo
+
+# Campos del equipo que viajan en la misma consulta que el usuario
+CAMPOS_EQUIPO = [field.attname for field in Equipo._meta.concrete_fields]
+# Primero como jugador1 y si no como jugador2, igual que CustomUser.equipo
+RELACIONES = ('equipos_como_jugador1', 'equipos_como_jugador2')
+
+
+class BackendUsuarioConEquipo(ModelBackend):
+    """
+    ModelBackend que carga el usuario de la sesión con su división y su equipo
+    (LEFT JOIN por cada lado del equipo) en UNA consulta. El equipo queda en
+    la caché de `user.equipo`, así las vistas, mixins y templates no vuelven
+    a buscarlo.
+    """
+
+    def _consulta(self, user_id):
+        anotaciones = {
+            f'_{relacion}__{campo}': F(f'{relacion}__{campo}')
+            for relacion in RELACIONES
+            for campo in CAMPOS_EQUIPO
+        }
+        # Con varios equipos el JOIN repite al usuario: el orden deja primero
+        # el de menor id como jugador1 (los NULL, sin equipo, al final)
+        orden = [F(f'{relacion}__id').asc(nulls_last=True) for relacion in RELACIONES]
+        return (
+            get_user_model()._default_manager.select_related('division')
+            .annotate(**anotaciones)
+            .filter(pk=user_id)
+            .order_by(*orden)
+        )
+
+    def _preparar(self, user):
+        if user is None or not self.user_can_authenticate(user):
+            return None
+
+        equipo = None
+        for relacion in RELACIONES:
+            valores = [user.__dict__.pop(f'_{relacion}__{campo}') for campo in CAMPOS_EQUIPO]
+            if equipo is None and valores[CAMPOS_EQUIPO.index('id')] is not None:
+                equipo = Equipo.from_db(Equipo.objects.db, CAMPOS_EQUIPO, valores)
+        if equipo is not None:
+            if equipo.division_id == user.division_id:
+                # Misma división que el jugador (el caso normal): se reutiliza el objeto
+                Equipo.division.field.set_cached_value(equipo, user.division)
+            # El usuario queda enlazado desde su equipo: al disolverlo se le
+            # borra la caché de `equipo` (ver equipos/signals.py)
+            lado = Equipo.jugador1 if equipo.jugador1_id == user.pk else Equipo.jugador2
+            lado.field.set_cached_value(equipo, user)
+        user.equipo = equipo
+        return user
+
+    def get_user(self, user_id):
+        return self._preparar(self._consulta(user_id).first())
+
+    async def aget_user(self, user_id):
+        # ModelBackend redefine aget_user con su propia consulta: hay que cubrir ambos
+        return self._preparar(await self._consulta(user_id).afirst())
@@ -7,6 +7,7 @@ from django.contrib.auth.models import (
 )
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 
 # --- ¡NUEVO MODELO AÑADIDO AQUÍ! ---
@@ -125,11 +126,14 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def full_name(self):
         return f"{self.nombre} {self.apellido}"
 
-    @property
+    @cached_property
     def equipo(self):
         """
         Propiedad para encontrar fácilmente el equipo de un jugador,
         ya sea como jugador1 o jugador2.
+
+        Se calcula una vez por instancia; el usuario de la request ya la trae
+        resuelta desde accounts.backends.BackendUsuarioConEquipo.
         """
         # Importación local para evitar importación circular
         from equipos.models import Equipo
@@ -138,3 +142,16 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         if not equipo:
             equipo = self.equipos_como_jugador2.first()
         return equipo
+
+    def olvidar_equipo(self):
+        """Descarta el equipo calculado (Ej: el jugador creó o disolvió su equipo)."""
+        self.__dict__.pop('equipo', None)
+
+    async def aequipo(self):
+        """Versión async de `equipo` para las vistas que usan el ORM asíncrono."""
+        if 'equipo' not in self.__dict__:
+            equipo = await self.equipos_como_jugador1.afirst()
+            if not equipo:
+                equipo = await self.equipos_como_jugador2.afirst()
+            self.equipo = equipo
+        return self.equipo
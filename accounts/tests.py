@@ -1,3 +1,52 @@
+from asgiref.sync import async_to_sync
 from django.test import TestCase
 
-# Create your tests here.
+from core.siembra import crear_equipos, crear_jugadores
+from equipos.models import Equipo
+
+from .backends import BackendUsuarioConEquipo
+from .models import Division
+
+
+class BackendUsuarioConEquipoTests(TestCase):
+    """El usuario de la sesión se carga con división y equipo en una consulta."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.division = Division.objects.create(nombre="Séptima")
+        cls.jugadores = crear_jugadores(cls.division, [
+            {'email': f"jugador{i}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}"}
+            for i in range(1, 6)
+        ])
+        uno, dos, tres, cuatro, _ = cls.jugadores
+        cls.equipo, cls.otro_equipo = crear_equipos([(uno, dos), (tres, uno)], cls.division)
+
+    def setUp(self):
+        self.backend = BackendUsuarioConEquipo()
+
+    def test_una_consulta(self):
+        for jugador, equipo in zip(self.jugadores, (self.equipo, self.equipo, self.otro_equipo, None, None)):
+            with self.subTest(jugador=jugador.email), self.assertNumQueries(1):
+                usuario = self.backend.get_user(jugador.pk)
+                self.assertEqual(usuario.division.nombre, "Séptima")
+                self.assertEqual(usuario.equipo, equipo)
+                if equipo:
+                    self.assertEqual(usuario.equipo.division.nombre, "Séptima")
+
+    def test_mismo_equipo_que_la_propiedad(self):
+        # Jugador1 de un equipo y jugador2 de otro: gana el de jugador1
+        uno = self.jugadores[0]
+        self.assertEqual(self.backend.get_user(uno.pk).equipo, uno.equipo)
+        self.assertEqual(async_to_sync(self.backend.aget_user)(uno.pk).equipo, self.equipo)
+
+    def test_crear_o_disolver_el_equipo_refresca_la_cache(self):
+        _, _, _, cuatro, cinco = self.jugadores
+        usuario = self.backend.get_user(cuatro.pk)
+        self.assertIsNone(usuario.equipo)
+
+        Equipo.objects.create(jugador1=usuario, jugador2=cinco, division=self.division)
+        self.assertIsNotNone(usuario.equipo)
+
+        usuario = self.backend.get_user(cinco.pk)
+        usuario.equipo.delete()
+        self.assertIsNone(usuario.equipo)
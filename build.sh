@@ -9,6 +9,10 @@ python manage.py tailwind build
 
 python manage.py collectstatic --no-input
 python manage.py migrate
+# Head-to-head entre equipos (se mantiene solo; esto cubre datos previos)
+python manage.py reconstruir_enfrentamientos
+# Páginas de torneos finalizados con los templates de este deploy
+python manage.py congelar_torneos
 
 # Scripts de automatización
 python scripts/seed_divisions.py
@@ -1,3 +1,43 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PerfilRequest
+from .perfilador import rectangulos
+
+
+@admin.register(PerfilRequest)
+class PerfilRequestAdmin(admin.ModelAdmin):
+    """Perfiles tomados con ?_perfilar=1: solo lectura, con flame graph y línea de tiempo SQL."""
+
+    list_display = ('creado', 'metodo', 'ruta', 'status', 'duracion_ms', 'num_consultas', 'usuario')
+    list_filter = ('metodo', 'status')
+    search_fields = ('ruta',)
+    list_select_related = ('usuario',)
+    fields = ('creado', 'usuario', 'metodo', 'ruta', 'status', 'duracion_ms', 'muestras', 'intervalo_ms', 'num_consultas')
+    readonly_fields = fields
+    change_form_template = 'admin/core/perfilrequest/change_form.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        perfil = self.get_object(request, object_id)
+        extra_context = extra_context or {}
+        if perfil is not None:
+            cajas = rectangulos(perfil.pilas)
+            extra_context.update({
+                'cajas': cajas,
+                'niveles': max((c['nivel'] for c in cajas), default=0) + 1,
+                'consultas': [
+                    {
+                        **consulta,
+                        'x': consulta['inicio_ms'] / perfil.duracion_ms * 100,
+                        'ancho': max(consulta['duracion_ms'] / perfil.duracion_ms * 100, 0.2),
+                    }
+                    for consulta in perfil.consultas
+                ],
+                'tiempo_sql_ms': perfil.tiempo_sql_ms,
+            })
+        return super().change_view(request, object_id, form_url, extra_context)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Registra las funciones de `tareas.py` de cada app
+        from django.utils.module_loading import autodiscover_modules
+
+        autodiscover_modules('tareas')
+
+        import core.sqlcomentarios
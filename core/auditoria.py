@@ -0,0 +1,53 @@
+"""
+Páginas del admin de Django y su presupuesto de consultas SQL.
+
+Lo usan el comando `auditar_admin` (sobre los datos reales) y los tests de
+core (sobre un volumen sembrado), así los dos recorren las mismas páginas.
+"""
+from django.contrib import admin
+from django.test import RequestFactory
+from django.urls import reverse
+
+# Máximo de consultas por página del admin
+PRESUPUESTO_CONSULTAS = 15
+
+
+class ContadorConsultas:
+    """execute_wrapper que solo cuenta (connection.queries se corta en 9000)."""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def paginas_admin(usuario, apps=None):
+    """
+    (modelo, nombre, url) del listado, el alta y la edición del primer objeto
+    de cada ModelAdmin registrado, en orden de etiqueta. Se saltean las
+    páginas que el ModelAdmin no permite a `usuario` (Ej: alta de un admin de
+    solo lectura).
+    """
+    # Para preguntarle a cada ModelAdmin qué páginas permite
+    peticion = RequestFactory().get('/')
+    peticion.user = usuario
+
+    paginas = []
+    for modelo, model_admin in sorted(
+        admin.site._registry.items(), key=lambda item: item[0]._meta.label
+    ):
+        opts = modelo._meta
+        if apps and opts.app_label not in apps:
+            continue
+        base = f'admin:{opts.app_label}_{opts.model_name}'
+        puede_ver = model_admin.has_view_or_change_permission(peticion)
+        if puede_ver:
+            paginas.append((modelo, 'listado', reverse(f'{base}_changelist')))
+        if model_admin.has_add_permission(peticion):
+            paginas.append((modelo, 'alta', reverse(f'{base}_add')))
+        primero = modelo._default_manager.order_by('pk').values_list('pk', flat=True).first()
+        if primero is not None and puede_ver:
+            paginas.append((modelo, 'edición', reverse(f'{base}_change', args=[primero])))
+    return paginas
@@ -0,0 +1,144 @@
+"""
+GET condicional (ETag / Last-Modified) para las páginas públicas.
+
+Cada vista calcula sus validadores con una consulta mínima (la versión del
+torneo, la versión de la Home en caché, etc.) y, si el cliente ya tiene esa
+versión, responde 304 sin armar el contexto ni renderizar el template.
+
+Reglas comunes:
+- Con mensajes flash pendientes no se responde 304: la página tiene que
+  mostrarlos y borrar la cookie.
+- Para usuarios logueados el ETag incluye usuario y equipo (la página cambia
+  según quién la ve) y la respuesta es privada; para anónimos es pública y
+  apta para un CDN (s-maxage + stale-while-revalidate).
+
+Se usa en lugar de django.views.decorators.http.condition porque éste llama
+a las funciones de ETag de forma síncrona, también en vistas async.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# Páginas que cambian mientras se juega: el CDN las revalida seguido
+CACHE_PUBLICA = {'public': True, 'max_age': 0, 's_maxage': 30, 'stale_while_revalidate': 60}
+# Torneos finalizados: prácticamente no cambian
+CACHE_FINALIZADO = {
+    'public': True, 'max_age': 300, 's_maxage': 3600, 'stale_while_revalidate': 86400,
+}
+# Usuarios logueados: el navegador siempre revalida (y recibe 304 si no cambió)
+CACHE_PRIVADA = {'private': True, 'no_cache': True}
+# Archivos con la versión en la URL (Ej: imágenes para compartir): nunca cambian
+CACHE_INMUTABLE = {'public': True, 'max_age': 60 * 60 * 24 * 365, 'immutable': True}
+
+
+@dataclass
+class Validadores:
+    etag: str
+    ultima_modificacion: datetime | None = None
+    cache_control: dict = field(default_factory=lambda: dict(CACHE_PUBLICA))
+
+
+def hay_mensajes_pendientes(request):
+    return CookieStorage.cookie_name in request.COOKIES
+
+
+def parte_usuario(usuario, equipo=None):
+    """Fragmento del ETag que identifica a quién se le renderizó la página."""
+    if not usuario.is_authenticated:
+        return 'anon'
+    return f"u{usuario.pk}-e{equipo.pk if equipo else 0}"
+
+
+def armar_validadores(etag, usuario, ultima_modificacion=None, cache_control=CACHE_PUBLICA):
+    """Arma los Validadores ajustando Last-Modified y Cache-Control al usuario."""
+    if usuario.is_authenticated:
+        # Last-Modified no distingue usuarios: solo vale el ETag
+        return Validadores(f'W/"{etag}"', None, dict(CACHE_PRIVADA))
+    return Validadores(f'W/"{etag}"', ultima_modificacion, dict(cache_control))
+
+
+def respuesta_no_modificada(request, validadores):
+    """304 si el cliente ya tiene esta versión; None si hay que renderizar."""
+    if validadores is None:
+        return None
+    ultima = validadores.ultima_modificacion
+    respuesta = get_conditional_response(
+        request,
+        etag=validadores.etag,
+        last_modified=int(ultima.timestamp()) if ultima else None,
+    )
+    if respuesta is not None:
+        aplicar_validadores(respuesta, validadores)
+    return respuesta
+
+
+def aplicar_validadores(respuesta, validadores):
+    if validadores is not None and respuesta.status_code in (200, 304):
+        respuesta.headers.setdefault('ETag', validadores.etag)
+        if validadores.ultima_modificacion:
+            respuesta.headers.setdefault(
+                'Last-Modified', http_date(validadores.ultima_modificacion.timestamp())
+            )
+        patch_cache_control(respuesta, **validadores.cache_control)
+    return respuesta
+
+
+def es_condicional(request):
+    """Solo GET/HEAD y sin mensajes flash por mostrar."""
+    return request.method in ('GET', 'HEAD') and not hay_mensajes_pendientes(request)
+
+
+def get_condicional(obtener_validadores):
+    """
+    Decorador para vistas función. `obtener_validadores(request, *args, **kwargs)`
+    devuelve Validadores (o None para no usar caché); debe ser async si la vista
+    lo es.
+    """
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            @wraps(vista)
+            async def interna(request, *args, **kwargs):
+                if not es_condicional(request):
+                    return await vista(request, *args, **kwargs)
+                valores = await obtener_validadores(request, *args, **kwargs)
+                respuesta = respuesta_no_modificada(request, valores)
+                if respuesta is None:
+                    respuesta = aplicar_validadores(await vista(request, *args, **kwargs), valores)
+                return respuesta
+        else:
+            @wraps(vista)
+            def interna(request, *args, **kwargs):
+                if not es_condicional(request):
+                    return vista(request, *args, **kwargs)
+                valores = obtener_validadores(request, *args, **kwargs)
+                respuesta = respuesta_no_modificada(request, valores)
+                if respuesta is None:
+                    respuesta = aplicar_validadores(vista(request, *args, **kwargs), valores)
+                return respuesta
+        return interna
+    return decorador
+
+
+class GetCondicionalMixin:
+    """
+    Lo mismo para vistas de clase síncronas: la vista define get_validadores().
+    Las vistas async usan es_condicional, respuesta_no_modificada y
+    aplicar_validadores en su get().
+    """
+
+    def get_validadores(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        if not es_condicional(request):
+            return super().get(request, *args, **kwargs)
+        valores = self.get_validadores()
+        respuesta = respuesta_no_modificada(request, valores)
+        if respuesta is None:
+            respuesta = aplicar_validadores(super().get(request, *args, **kwargs), valores)
+        return respuesta
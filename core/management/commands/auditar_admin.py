@@ -0,0 +1,58 @@
+"""
+Cuenta las consultas SQL de cada página del admin de Django.
+Uso: python manage.py auditar_admin --presupuesto 15
+     python manage.py auditar_admin --app torneos --app accounts
+
+Renderiza el changelist, el formulario de alta y el de edición (primer
+objeto) de cada ModelAdmin registrado y marca los que superan el presupuesto.
+Las páginas que el propio ModelAdmin no permite (Ej: alta de un admin de
+solo lectura) se saltean.
+Conviene correrlo con volumen real de datos (Ej: tras `simulate_tournament`)
+para detectar consultas N+1 que con pocas filas no se notan.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from core.auditoria import PRESUPUESTO_CONSULTAS, ContadorConsultas, paginas_admin
+
+
+class Command(BaseCommand):
+    help = 'Cuenta las consultas SQL de las páginas del admin y marca las que superan el presupuesto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--app', action='append', dest='apps', help='Limitar a estas apps')
+        parser.add_argument('--presupuesto', type=int, default=PRESUPUESTO_CONSULTAS, help='Máximo de consultas por página')
+        parser.add_argument('--email', help='Superusuario con el que navegar (por defecto, el primero)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        superusuarios = User.objects.filter(is_superuser=True, is_active=True)
+        if options['email']:
+            superusuarios = superusuarios.filter(email=options['email'])
+        usuario = superusuarios.first()
+        if usuario is None:
+            raise CommandError('No hay superusuario activo con el que recorrer el admin.')
+
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        cliente = Client(HTTP_HOST=host)
+        cliente.force_login(usuario)
+
+        excedidas = 0
+        for modelo, nombre, url in paginas_admin(usuario, options['apps']):
+            contador = ContadorConsultas()
+            with connection.execute_wrapper(contador):
+                respuesta = cliente.get(url)
+            total = contador.total
+            linea = f"{modelo._meta.label:<28} {nombre:<9} {respuesta.status_code} {total:>4} consultas"
+            if respuesta.status_code >= 400 or total > options['presupuesto']:
+                excedidas += 1
+                self.stdout.write(self.style.ERROR(linea))
+            else:
+                self.stdout.write(linea)
+
+        if excedidas:
+            raise CommandError(f'{excedidas} página(s) fuera de presupuesto.')
+        self.stdout.write(self.style.SUCCESS('Todas las páginas dentro del presupuesto.'))
@@ -0,0 +1,70 @@
+"""
+Benchmark del costo de conexión a la base de datos por request.
+Uso: python manage.py bench_conexiones --requests 500 --consultas 3
+
+Simula el ciclo de vida de N requests (señales request_started/finished, que
+es donde Django abre, recicla o devuelve al pool la conexión) y mide la
+latencia de cada una. Comparar corridas con distintas variables de entorno:
+
+    DB_POOL=False DB_CONN_MAX_AGE=0   python manage.py bench_conexiones  # conexión nueva por request
+    DB_POOL=False DB_CONN_MAX_AGE=600 python manage.py bench_conexiones  # conexión persistente
+    DB_POOL=True                      python manage.py bench_conexiones  # pool de psycopg
+"""
+import statistics
+import time
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from torneos.models import Torneo
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de conexión a la base por request (p50/p95/p99)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests simuladas')
+        parser.add_argument('--consultas', type=int, default=3, help='Consultas por request')
+
+    def handle(self, *args, **options):
+        conexiones_nuevas = 0
+
+        def contar(sender, **kwargs):
+            nonlocal conexiones_nuevas
+            conexiones_nuevas += 1
+
+        connection_created.connect(contar)
+        settings_dict = connection.settings_dict
+        pool = settings_dict.get('OPTIONS', {}).get('pool')
+        self.stdout.write(
+            f"Motor: {settings_dict['ENGINE']} | CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']} "
+            f"| CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']} | pool={'sí' if pool else 'no'}"
+        )
+
+        latencias = []
+        for _ in range(options['requests']):
+            inicio = time.perf_counter()
+            request_started.send(sender=BaseHandler)
+            for _ in range(options['consultas']):
+                Torneo.objects.filter(pk=0).exists()
+            request_finished.send(sender=BaseHandler)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+        connection_created.disconnect(contar)
+        connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['requests']} requests | conexiones nuevas: {conexiones_nuevas}\n"
+            f"  media {statistics.fmean(latencias):.2f} ms | p50 {percentil(latencias, 50):.2f} ms"
+            f" | p95 {percentil(latencias, 95):.2f} ms | p99 {percentil(latencias, 99):.2f} ms"
+            f" | máx {max(latencias):.2f} ms"
+        ))
@@ -0,0 +1,95 @@
+"""
+Benchmark de escrituras en la base por vista de página autenticada.
+Uso: python manage.py bench_sesiones --vistas 50 --email jugador1a@ejemplo.com
+
+Inicia sesión con un jugador, recorre páginas de lectura y un ciclo
+POST -> mensaje flash -> GET, y cuenta las sentencias que escriben en la base
+(INSERT/UPDATE/DELETE) y las que leen django_session. Con SESSION_ENGINE
+cached_db y MESSAGE_STORAGE de cookies, las vistas en régimen estable deben
+dar 0 escrituras y 0 lecturas de sesión.
+"""
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from torneos.models import Torneo
+
+ESCRITURAS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class ContadorSesion:
+    """execute_wrapper que separa escrituras y lecturas de django_session."""
+
+    def __init__(self):
+        self.escrituras = 0
+        self.lecturas_sesion = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = sql.lstrip().upper()
+        if inicio.startswith(ESCRITURAS):
+            self.escrituras += 1
+        elif 'django_session' in sql:
+            self.lecturas_sesion += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Cuenta escrituras en la base y lecturas de sesión por vista autenticada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vistas', type=int, default=50, help='Vistas de página a medir')
+        parser.add_argument('--email', help='Jugador con el que navegar (por defecto, el primero)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        usuarios = User.objects.filter(tipo_usuario=User.TipoUsuario.PLAYER, is_active=True)
+        if options['email']:
+            usuarios = usuarios.filter(email=options['email'])
+        usuario = usuarios.first()
+        if usuario is None:
+            raise CommandError('No hay jugadores con los que navegar.')
+
+        self.stdout.write(
+            f"SESSION_ENGINE={settings.SESSION_ENGINE}\nMESSAGE_STORAGE={settings.MESSAGE_STORAGE}"
+        )
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        cliente = Client(HTTP_HOST=host)
+        cliente.force_login(usuario)
+
+        urls = [reverse('core:home'), reverse('torneos:finalizado_list')]
+        torneo = Torneo.objects.order_by('-pk').first()
+        if torneo:
+            urls.append(reverse('torneos:detail', args=[torneo.pk]))
+
+        # Primera vuelta para calentar la caché (no se mide)
+        for url in urls:
+            cliente.get(url)
+
+        contador = ContadorSesion()
+        with connection.execute_wrapper(contador):
+            for i in range(options['vistas']):
+                cliente.get(urls[i % len(urls)])
+        self._reportar('Vistas de lectura', options['vistas'], contador)
+
+        # Mensaje flash: se simula el redirect tras una acción que llama messages.success()
+        contador = ContadorSesion()
+        with connection.execute_wrapper(contador):
+            for _ in range(options['vistas']):
+                respuesta = cliente.get(urls[0])
+                messages.success(respuesta.wsgi_request, 'Resultado cargado.')
+                respuesta.wsgi_request._messages.update(respuesta)
+                cliente.cookies.update(respuesta.cookies)
+                cliente.get(urls[0])
+        self._reportar('Ciclos mensaje + redirect', options['vistas'], contador)
+
+    def _reportar(self, titulo, cantidad, contador):
+        estilo = self.style.SUCCESS if contador.escrituras == 0 else self.style.WARNING
+        self.stdout.write(estilo(
+            f"{titulo}: {cantidad} | escrituras: {contador.escrituras} "
+            f"({contador.escrituras / cantidad:.2f}/vista) | lecturas de django_session: "
+            f"{contador.lecturas_sesion}"
+        ))
@@ -0,0 +1,150 @@
+"""
+Siembra la base para las pruebas de carga (paquete `loadtest/`).
+Uso: python manage.py preparar_carga --equipos 200 --salida loadtest/plan.json
+
+Crea, en la división "Carga" y con una contraseña compartida:
+- un admin y `--equipos` equipos que todavía no están inscritos en nada,
+- `--sueltos` jugadores sin equipo (los que escriben en el autocompletado),
+- un torneo ABIERTO con cupo para todos los equipos (pico de inscripción),
+- un torneo EN JUEGO con la fase de grupos sin resultados y otro con los
+  grupos terminados y el bracket armado (carga de resultados del admin).
+
+Escribe un plan JSON con credenciales y URLs que lee `python -m loadtest`.
+Cada corrida del pico de inscripción consume los cupos: volver a sembrar
+antes de repetirla.
+"""
+import json
+import random
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Division
+from core import siembra
+from core.models import Tarea
+from core.tareas import ejecutar, identificador_worker, tomar
+from torneos.models import Torneo, PartidoGrupo
+
+User = get_user_model()
+
+PREFIJO = "[Carga]"
+DOMINIO = "@carga.local"
+PASSWORD = "carga123456"
+EQUIPOS_EN_JUEGO = 16
+
+
+class Command(BaseCommand):
+    help = 'Siembra torneos, jugadores y equipos para las pruebas de carga y escribe el plan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--equipos', type=int, default=200, help='Equipos para el pico de inscripción')
+        parser.add_argument('--sueltos', type=int, default=100, help='Jugadores sin equipo')
+        parser.add_argument(
+            '--salida', default=str(Path(settings.BASE_DIR) / 'loadtest' / 'plan.json'),
+            help='Ruta del plan JSON',
+        )
+
+    def handle(self, *args, **options):
+        random.seed(7)
+        self.stdout.write("Limpiando datos de carga anteriores...")
+        Torneo.objects.filter(nombre__startswith=PREFIJO).delete()
+        User.objects.filter(email__endswith=DOMINIO).delete()
+
+        division, _ = Division.objects.get_or_create(nombre="Carga")
+        with transaction.atomic():
+            admin = User.objects.create_user(
+                f"admin{DOMINIO}", PASSWORD, nombre='Admin', apellido='Carga',
+                tipo_usuario=User.TipoUsuario.ADMIN, division=division,
+            )
+            total_equipos = options['equipos'] + 2 * EQUIPOS_EN_JUEGO
+            filas = [
+                {'email': f"j{i}{letra}{DOMINIO}", 'nombre': f"Carga{i}{letra}", 'apellido': f"Jugador{i}"}
+                for i in range(1, total_equipos + 1) for letra in ('a', 'b')
+            ] + [
+                {'email': f"suelto{i}{DOMINIO}", 'nombre': f"Suelto{i}", 'apellido': f"Carga{i}"}
+                for i in range(1, options['sueltos'] + 1)
+            ]
+            jugadores = siembra.crear_jugadores(division, filas, password=PASSWORD)
+            con_equipo = jugadores[:2 * total_equipos]
+            equipos = siembra.crear_equipos(zip(con_equipo[0::2], con_equipo[1::2]), division)
+
+            abierto = self._torneo("Apertura", division, cupos=options['equipos'])
+            grupos = self._torneo("Fase de grupos", division, cupos=EQUIPOS_EN_JUEGO)
+            bracket = self._torneo("Eliminación", division, cupos=EQUIPOS_EN_JUEGO)
+            siembra.inscribir_equipos(grupos, equipos[-2 * EQUIPOS_EN_JUEGO:-EQUIPOS_EN_JUEGO])
+            siembra.inscribir_equipos(bracket, equipos[-EQUIPOS_EN_JUEGO:])
+
+        self.stdout.write("Sorteando grupos y armando el bracket...")
+        self._ejecutar_tarea('iniciar_torneo', grupos)
+        self._ejecutar_tarea('iniciar_torneo', bracket)
+        self._completar_grupos(bracket)
+        self._ejecutar_tarea('generar_bracket', bracket)
+
+        plan = {
+            'password': PASSWORD,
+            'admin': admin.email,
+            'jugadores': [equipo.jugador1.email for equipo in equipos[:options['equipos']]],
+            'sueltos': [fila['email'] for fila in filas[2 * total_equipos:]],
+            'busquedas': ['Suelto', 'Carga', 'Suelto1'],
+            'urls': {
+                'login': reverse('accounts:login'),
+                'inscribirse': reverse('torneos:inscribirse', args=[abierto.pk]),
+                'detalle': [
+                    reverse('torneos:detail', args=[torneo.pk]) for torneo in (abierto, grupos, bracket)
+                ],
+                'resultado_grupo': [
+                    reverse('torneos:cargar_resultado_grupo', args=[pk])
+                    for pk in PartidoGrupo.objects.filter(grupo__torneo=grupos).values_list('pk', flat=True)
+                ],
+                'resultado_bracket': [
+                    reverse('torneos:admin_partido_resultado', args=[partido.pk])
+                    for partido in bracket.partidos.filter(
+                        equipo1__isnull=False, equipo2__isnull=False, ganador__isnull=True
+                    )
+                ],
+                'autocompletar': reverse('equipos:jugador_autocomplete'),
+            },
+        }
+        salida = Path(options['salida'])
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(json.dumps(plan, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(
+            f"Plan escrito en {salida}: {len(plan['jugadores'])} jugadores para inscribirse, "
+            f"{len(plan['urls']['resultado_grupo'])} partidos de grupo y "
+            f"{len(plan['urls']['resultado_bracket'])} de bracket."
+        ))
+
+    def _torneo(self, nombre, division, cupos):
+        return Torneo.objects.create(
+            nombre=f"{PREFIJO} {nombre}",
+            division=division,
+            fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now() + timedelta(days=7),
+            cupos_totales=cupos,
+            equipos_por_grupo=4,
+        )
+
+    def _ejecutar_tarea(self, nombre, torneo):
+        # Se ejecuta aquí mismo, sin pasar por el worker
+        tarea = Tarea.objects.create(nombre=nombre, parametros={'torneo_id': torneo.pk})
+        ejecutar(tomar(identificador_worker(), tarea_id=tarea.pk))
+        tarea.refresh_from_db()
+        if tarea.estado != Tarea.Estado.COMPLETADA:
+            raise RuntimeError(f"{nombre} falló: {tarea.mensaje}")
+
+    def _completar_grupos(self, torneo):
+        for partido in PartidoGrupo.objects.filter(grupo__torneo=torneo).select_related('equipo1', 'equipo2'):
+            games = random.choice([(6, 3), (3, 6), (6, 4), (4, 6)])
+            partido.e1_set1, partido.e2_set1 = games
+            partido.e1_set2, partido.e2_set2 = games
+            gana_e1 = games[0] > games[1]
+            partido.e1_sets_ganados, partido.e2_sets_ganados = (2, 0) if gana_e1 else (0, 2)
+            partido.e1_games_ganados, partido.e2_games_ganados = games[0] * 2, games[1] * 2
+            partido.ganador = partido.equipo1 if gana_e1 else partido.equipo2
+            partido.save()
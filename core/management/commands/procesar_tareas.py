@@ -0,0 +1,60 @@
+"""
+Worker de la cola de tareas (core.tareas).
+Uso: python manage.py procesar_tareas            # bucle continuo
+     python manage.py procesar_tareas --una-vez  # vacía la cola y termina
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.tareas import ejecutar, identificador_worker, liberar_colgadas, tomar
+
+
+class Command(BaseCommand):
+    help = 'Toma y ejecuta las tareas pendientes de la cola en segundo plano'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--una-vez', action='store_true', help='Procesa lo pendiente y termina'
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=2.0,
+            help='Segundos de espera cuando la cola está vacía',
+        )
+
+    def handle(self, *args, **options):
+        self.detener = False
+        signal.signal(signal.SIGTERM, self._detener)
+        signal.signal(signal.SIGINT, self._detener)
+
+        worker = identificador_worker()
+        self.stdout.write(f"Worker {worker} esperando tareas...")
+        ultima_limpieza = 0.0
+
+        while not self.detener:
+            close_old_connections()
+            if time.monotonic() - ultima_limpieza > 60:
+                liberadas = liberar_colgadas()
+                if liberadas:
+                    self.stdout.write(self.style.WARNING(f"{liberadas} tarea(s) colgada(s) liberada(s)"))
+                ultima_limpieza = time.monotonic()
+
+            tarea = tomar(worker)
+            if tarea is None:
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f"→ {tarea.nombre} #{tarea.pk} (intento {tarea.intentos})")
+            tarea = ejecutar(tarea)
+            estilo = self.style.SUCCESS if tarea.estado == tarea.Estado.COMPLETADA else self.style.ERROR
+            self.stdout.write(estilo(f"  {tarea.get_estado_display()}: {tarea.mensaje}"))
+
+        self.stdout.write("Worker detenido.")
+
+    def _detener(self, *args):
+        # Termina la tarea en curso antes de salir
+        self.detener = True
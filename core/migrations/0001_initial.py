@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('estado', models.CharField(choices=[('PE', 'Pendiente'), ('EC', 'En curso'), ('OK', 'Completada'), ('ER', 'Fallida')], default='PE', max_length=2)),
+                ('progreso', models.PositiveSmallIntegerField(default=0)),
+                ('mensaje', models.CharField(blank=True, max_length=255)),
+                ('resultado_url', models.CharField(blank=True, max_length=255)),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('actualizada', models.DateTimeField(auto_now=True)),
+                ('creada_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tareas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-creada'],
+            },
+        ),
+    ]
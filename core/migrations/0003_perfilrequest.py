@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tarea_reintentos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfilRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('metodo', models.CharField(max_length=10)),
+                ('ruta', models.CharField(max_length=500)),
+                ('status', models.PositiveSmallIntegerField()),
+                ('duracion_ms', models.FloatField()),
+                ('intervalo_ms', models.FloatField()),
+                ('muestras', models.PositiveIntegerField(default=0)),
+                ('pilas', models.JSONField(default=dict)),
+                ('num_consultas', models.PositiveIntegerField(default=0)),
+                ('consultas', models.JSONField(default=list)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'perfil de request',
+                'verbose_name_plural': 'perfiles de requests',
+                'ordering': ['-creado'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_perfilrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarea',
+            name='clave',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -1,3 +1,92 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Tarea(models.Model):
+    """Operación larga ejecutada fuera del ciclo request/response."""
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'PE', 'Pendiente'
+        EN_CURSO = 'EC', 'En curso'
+        COMPLETADA = 'OK', 'Completada'
+        FALLIDA = 'ER', 'Fallida'
+
+    nombre = models.CharField(max_length=100)  # Clave en el registro de core.tareas
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(
+        max_length=2, choices=Estado.choices, default=Estado.PENDIENTE
+    )
+
+    # Progreso reportado por la propia tarea (0-100)
+    progreso = models.PositiveSmallIntegerField(default=0)
+    mensaje = models.CharField(max_length=255, blank=True)
+
+    # URL a la que se redirige al terminar (Ej: gestión del torneo creado)
+    resultado_url = models.CharField(max_length=255, blank=True)
+
+    # Reintentos: la tarea vuelve a PENDIENTE hasta agotar max_intentos
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    disponible_desde = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)  # Quién la tomó
+    # Clave de idempotencia del envío que la encoló (ver tareas.encolar_una_vez)
+    clave = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
+    creada_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tareas',
+    )
+    creada = models.DateTimeField(auto_now_add=True)
+    actualizada = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-creada']
+        indexes = [
+            # Consulta del worker: pendientes disponibles, las más viejas primero
+            models.Index(fields=['estado', 'disponible_desde'], name='tarea_cola_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_estado_display()})"
+
+    @property
+    def terminada(self):
+        return self.estado in (self.Estado.COMPLETADA, self.Estado.FALLIDA)
+
+
+class PerfilRequest(models.Model):
+    """Perfil de una request tomado a pedido por un admin (ver core/perfilador.py)."""
+
+    creado = models.DateTimeField(auto_now_add=True)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    metodo = models.CharField(max_length=10)
+    ruta = models.CharField(max_length=500)
+    status = models.PositiveSmallIntegerField()
+    duracion_ms = models.FloatField()
+
+    # Muestreo: pilas colapsadas ("raíz;...;hoja" -> cantidad de muestras)
+    intervalo_ms = models.FloatField()
+    muestras = models.PositiveIntegerField(default=0)
+    pilas = models.JSONField(default=dict)
+
+    # Línea de tiempo SQL: [{inicio_ms, duracion_ms, alias, sql}, ...]
+    num_consultas = models.PositiveIntegerField(default=0)
+    consultas = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ['-creado']
+        verbose_name = 'perfil de request'
+        verbose_name_plural = 'perfiles de requests'
+
+    def __str__(self):
+        return f"{self.metodo} {self.ruta} ({self.duracion_ms:.0f} ms)"
+
+    @property
+    def tiempo_sql_ms(self):
+        return round(sum(c['duracion_ms'] for c in self.consultas), 2)
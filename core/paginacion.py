@@ -0,0 +1,204 @@
+"""
+Paginación por cursor (keyset) para listados grandes.
+
+A diferencia del Paginator de Django (COUNT(*) + OFFSET por página), cada
+página se pide con un WHERE sobre la clave de orden de la última fila vista:
+
+    WHERE (fecha_inicio, id) < (:fecha, :id) ORDER BY fecha_inicio DESC, id DESC LIMIT 11
+
+así una página profunda cuesta lo mismo que la primera (con un índice sobre
+esas columnas). El cursor viaja en la URL como base64 opaco; el total se
+muestra aproximado (estimación del planner en PostgreSQL). En SQLite y el
+resto de motores no hay estimación: conteo_aproximado() hace un COUNT(*)
+exacto por página, que con tablas grandes vuelve a costar lo que se evitaba.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+PARAM_DESPUES = 'despues'
+PARAM_ANTES = 'antes'
+
+# Por debajo de este tamaño estimado se hace el COUNT(*) exacto (es barato)
+UMBRAL_CONTEO_EXACTO = 10000
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _campo_y_sentido(orden):
+    return (orden[1:], True) if orden.startswith('-') else (orden, False)
+
+
+def codificar_valores(valores):
+    """Serializa una lista de valores (fechas en ISO) a un cursor opaco."""
+    valores = [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores]
+    crudo = json.dumps(valores, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+
+def decodificar_valores(cursor, cantidad):
+    """Inversa de codificar_valores: la lista cruda de `cantidad` valores."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError) as exc:
+        raise CursorInvalido(cursor) from exc
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise CursorInvalido(cursor)
+    return valores
+
+
+def codificar_cursor(objeto, orden):
+    """Serializa los valores de la clave de orden de `objeto` a un cursor opaco."""
+    return codificar_valores([
+        getattr(objeto, objeto._meta.get_field(campo).attname)
+        for campo, _ in map(_campo_y_sentido, orden)
+    ])
+
+
+def decodificar_cursor(cursor, modelo, orden):
+    """Devuelve los valores de la clave de orden, ya convertidos al tipo de cada campo."""
+    valores = decodificar_valores(cursor, len(orden))
+    try:
+        return [
+            modelo._meta.get_field(campo).to_python(valor)
+            for (campo, _), valor in zip(map(_campo_y_sentido, orden), valores)
+        ]
+    except (ValidationError, ValueError, TypeError) as exc:
+        raise CursorInvalido(cursor) from exc
+
+
+def filtro_keyset(orden, valores, hacia_atras=False):
+    """
+    Construye el Q de "filas posteriores al cursor" para un orden arbitrario.
+
+    Para orden (a DESC, b ASC) y cursor (x, y): a < x OR (a = x AND b > y).
+    Con hacia_atras=True se invierte para pedir las filas anteriores.
+    """
+    condicion = Q(pk__in=[])
+    iguales = Q()
+    for (campo, descendente), valor in zip(map(_campo_y_sentido, orden), valores):
+        menor = descendente != hacia_atras
+        condicion |= iguales & Q(**{f"{campo}__{'lt' if menor else 'gt'}": valor})
+        iguales &= Q(**{campo: valor})
+    return condicion
+
+
+def conteo_aproximado(queryset):
+    """
+    Total estimado de filas. En PostgreSQL usa la estimación del planner
+    (EXPLAIN, sin recorrer la tabla); en otros motores (Ej: SQLite en
+    desarrollo y tests) cae a un COUNT(*) exacto.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset.count()
+
+
+class PaginadorConteoEstimado(Paginator):
+    """
+    Paginator (Ej: para el admin) que no hace COUNT(*) sobre tablas grandes:
+    si la estimación del planner supera UMBRAL_CONTEO_EXACTO, usa la estimación.
+    """
+
+    @cached_property
+    def count(self):
+        if connections[self.object_list.db].vendor != 'postgresql':
+            return super().count
+        estimado = conteo_aproximado(self.object_list)
+        return estimado if estimado > UMBRAL_CONTEO_EXACTO else super().count
+
+
+class PaginaKeyset:
+    """Página de resultados con la misma interfaz básica que django.core.paginator.Page."""
+
+    def __init__(self, objetos, orden, hay_siguiente, hay_anterior, total_aproximado, codificar=None):
+        self.object_list = objetos
+        self.orden = orden
+        # Para filas que no son instancias de modelo (Ej: resultados de SQL crudo)
+        self.codificar = codificar or (lambda objeto: codificar_cursor(objeto, orden))
+        self._hay_siguiente = hay_siguiente
+        self._hay_anterior = hay_anterior
+        self.total_aproximado = total_aproximado
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._hay_siguiente
+
+    def has_previous(self):
+        return self._hay_anterior
+
+    def has_other_pages(self):
+        return self._hay_siguiente or self._hay_anterior
+
+    @property
+    def cursor_siguiente(self):
+        if self._hay_siguiente and self.object_list:
+            return self.codificar(self.object_list[-1])
+        return None
+
+    @property
+    def cursor_anterior(self):
+        if self._hay_anterior and self.object_list:
+            return self.codificar(self.object_list[0])
+        return None
+
+
+def paginar_keyset(queryset, orden, tamano, despues=None, antes=None):
+    """
+    Devuelve la PaginaKeyset que sigue al cursor `despues` (o precede a `antes`).
+    Sin cursores devuelve la primera página.
+    """
+    orden = tuple(orden)
+    total = conteo_aproximado(queryset)
+    if antes:
+        valores = decodificar_cursor(antes, queryset.model, orden)
+        invertido = [o[1:] if o.startswith('-') else f'-{o}' for o in orden]
+        filas = list(
+            queryset.filter(filtro_keyset(orden, valores, hacia_atras=True))
+            .order_by(*invertido)[:tamano + 1]
+        )
+        hay_anterior = len(filas) > tamano
+        objetos = filas[:tamano][::-1]
+        return PaginaKeyset(objetos, orden, True, hay_anterior, total)
+
+    if despues:
+        valores = decodificar_cursor(despues, queryset.model, orden)
+        queryset = queryset.filter(filtro_keyset(orden, valores))
+    filas = list(queryset.order_by(*orden)[:tamano + 1])
+    return PaginaKeyset(filas[:tamano], orden, len(filas) > tamano, bool(despues), total)
+
+
+class KeysetPaginationMixin:
+    """
+    Reemplaza la paginación por OFFSET de ListView por paginación keyset.
+    La vista define `orden_keyset` (debe terminar en una columna única, Ej: 'id').
+    """
+    orden_keyset = ('id',)
+
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            pagina = paginar_keyset(
+                queryset,
+                self.orden_keyset,
+                page_size,
+                despues=self.request.GET.get(PARAM_DESPUES),
+                antes=self.request.GET.get(PARAM_ANTES),
+            )
+        except CursorInvalido:
+            raise Http404("Cursor de paginación inválido.")
+        return (None, pagina, pagina.object_list, pagina.has_other_pages())
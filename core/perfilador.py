@@ -0,0 +1,240 @@
+"""
+Perfilador de requests a pedido, solo para admins.
+
+Se activa en una request puntual con `?_perfilar=1` o el header
+`X-Perfilar: 1`. Sin eso el middleware no hace nada más que buscar esas dos
+claves (no toca la sesión ni la base), así que puede quedar instalado en
+producción.
+
+Cuando se activa:
+- un hilo muestrea cada PERFILADOR_INTERVALO segundos las pilas de los hilos
+  que atienden la request (en modo ASGI: el del event loop y el hilo donde
+  corren sus sync_to_async) y las guarda en formato "colapsado"
+  (raíz;...;hoja -> muestras), que es lo que dibuja el flame graph;
+- un execute_wrapper registra cada consulta SQL con su inicio y duración.
+
+El resultado se guarda en PerfilRequest (se conservan los últimos
+PERFILADOR_MAXIMO) y se ve en el admin; la respuesta trae el header
+X-Perfil con la URL.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+
+PARAMETRO = '_perfilar'
+HEADER = 'HTTP_X_PERFILAR'
+
+INTERVALO = getattr(settings, 'PERFILADOR_INTERVALO', 0.001)
+MAXIMO = getattr(settings, 'PERFILADOR_MAXIMO', 50)
+# Máximo de consultas guardadas por perfil (el resto solo se cuenta)
+MAXIMO_CONSULTAS = 500
+
+# Archivos que no aportan al flame graph (el propio muestreo)
+_ESTE_ARCHIVO = os.path.abspath(__file__)
+
+
+def pedido(request):
+    return PARAMETRO in request.GET or HEADER in request.META
+
+
+def es_admin(usuario):
+    return usuario.is_authenticated and (
+        usuario.is_staff or getattr(usuario, 'tipo_usuario', None) == 'ADMIN'
+    )
+
+
+def _nombre_frame(frame):
+    codigo = frame.f_code
+    archivo = codigo.co_filename
+    base = str(settings.BASE_DIR)
+    if archivo.startswith(base):
+        archivo = os.path.relpath(archivo, base)
+    elif 'site-packages' in archivo:
+        archivo = archivo.split('site-packages' + os.sep, 1)[1]
+    return f"{codigo.co_name} ({archivo}:{codigo.co_firstlineno})"
+
+
+class Muestreador(threading.Thread):
+    """Hilo que toma una muestra de las pilas de `hilos` cada `intervalo` segundos."""
+
+    def __init__(self, hilos, intervalo=INTERVALO):
+        super().__init__(name='perfilador', daemon=True)
+        self.hilos = set(hilos)
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            frames = sys._current_frames()
+            for hilo in self.hilos:
+                frame = frames.get(hilo)
+                pila = []
+                while frame is not None:
+                    if frame.f_code.co_filename != _ESTE_ARCHIVO:
+                        pila.append(_nombre_frame(frame))
+                    frame = frame.f_back
+                if pila:
+                    self.pilas[';'.join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def detener(self):
+        self._parar.set()
+        self.join()
+
+
+class LineaDeTiempoSQL:
+    """execute_wrapper que anota cada consulta relativa al inicio de la request."""
+
+    def __init__(self, inicio):
+        self.inicio = inicio
+        self.consultas = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        comienzo = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += 1
+            if len(self.consultas) < MAXIMO_CONSULTAS:
+                self.consultas.append({
+                    'inicio_ms': round((comienzo - self.inicio) * 1000, 2),
+                    'duracion_ms': round((time.perf_counter() - comienzo) * 1000, 2),
+                    'alias': context['connection'].alias,
+                    'sql': sql[:2000],
+                })
+
+    def instalar(self):
+        for conexion in connections.all(initialized_only=False):
+            conexion.execute_wrappers.append(self)
+
+    def quitar(self):
+        for conexion in connections.all(initialized_only=False):
+            if self in conexion.execute_wrappers:
+                conexion.execute_wrappers.remove(self)
+
+
+class Sesion:
+    """Estado de una request perfilada: muestreador + SQL + tiempos."""
+
+    def __init__(self, hilos):
+        self.inicio = time.perf_counter()
+        self.sql = LineaDeTiempoSQL(self.inicio)
+        self.muestreador = Muestreador(hilos)
+
+    def comenzar(self):
+        self.muestreador.start()
+
+    def terminar(self):
+        self.muestreador.detener()
+        self.duracion_ms = (time.perf_counter() - self.inicio) * 1000
+
+    def guardar(self, request, respuesta):
+        from .models import PerfilRequest
+
+        perfil = PerfilRequest.objects.create(
+            usuario=request.user if request.user.is_authenticated else None,
+            metodo=request.method,
+            ruta=request.get_full_path()[:500],
+            status=respuesta.status_code,
+            duracion_ms=round(self.duracion_ms, 2),
+            intervalo_ms=self.muestreador.intervalo * 1000,
+            muestras=self.muestreador.muestras,
+            pilas=dict(self.muestreador.pilas),
+            num_consultas=self.sql.total,
+            consultas=self.sql.consultas,
+        )
+        # Buffer circular: se borran los más viejos
+        viejos = PerfilRequest.objects.order_by('-pk').values_list('pk', flat=True)[MAXIMO:]
+        PerfilRequest.objects.filter(pk__in=list(viejos)).delete()
+        respuesta['X-Perfil'] = reverse('admin:core_perfilrequest_change', args=[perfil.pk])
+        return respuesta
+
+
+class PerfiladorMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not pedido(request) or not es_admin(request.user):
+            return self.get_response(request)
+
+        sesion = Sesion([threading.get_ident()])
+        sesion.sql.instalar()
+        sesion.comenzar()
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            sesion.terminar()
+            sesion.sql.quitar()
+        return sesion.guardar(request, respuesta)
+
+    async def __acall__(self, request):
+        if not pedido(request) or not es_admin(await request.auser()):
+            return await self.get_response(request)
+
+        # El ORM de esta request corre en el hilo de sync_to_async (thread_sensitive):
+        # ahí se instala el wrapper de SQL y también se muestrea ese hilo.
+        hilo_sync = await sync_to_async(threading.get_ident)()
+        sesion = Sesion([threading.get_ident(), hilo_sync])
+        await sync_to_async(sesion.sql.instalar)()
+        sesion.comenzar()
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            sesion.terminar()
+            await sync_to_async(sesion.sql.quitar)()
+        request.user = await request.auser()
+        return await sync_to_async(sesion.guardar)(request, respuesta)
+
+
+def rectangulos(pilas, ancho_minimo=0.002):
+    """
+    Convierte pilas colapsadas en rectángulos del flame graph:
+    dicts con nivel, x y ancho (fracciones del total), nombre y muestras.
+    """
+    total = sum(pilas.values())
+    if not total:
+        return []
+    arbol = {}
+    for pila, cuenta in pilas.items():
+        nodo = arbol
+        for nombre in pila.split(';'):
+            hijo = nodo.setdefault(nombre, {'muestras': 0, 'hijos': {}})
+            hijo['muestras'] += cuenta
+            nodo = hijo['hijos']
+
+    resultado = []
+
+    def recorrer(hijos, nivel, x):
+        for nombre, nodo in sorted(hijos.items()):
+            ancho = nodo['muestras'] / total
+            if ancho >= ancho_minimo:
+                resultado.append({
+                    'nivel': nivel,
+                    'x': x * 100,
+                    'ancho': ancho * 100,
+                    'nombre': nombre,
+                    'muestras': nodo['muestras'],
+                })
+                recorrer(nodo['hijos'], nivel + 1, x)
+            x += ancho
+
+    recorrer(arbol, 0, 0.0)
+    return resultado
@@ -0,0 +1,85 @@
+"""
+Datos de la página principal (Home).
+
+Los torneos abiertos y en juego salen de UNA consulta anotada (nombre de la
+división, cantidad de inscripciones y, si hay usuario, un EXISTS "mi equipo
+está inscrito"). La parte común a todos los visitantes se guarda en caché bajo
+la versión de la Home; por usuario solo se calcula el flag.
+
+La versión sale de la base y no de una clave de caché: la caché es local a
+cada instancia (FileBasedCache) y el worker de tareas no podría invalidar la
+del servicio web. Todo lo que se muestra en la Home sube `Torneo.actualizado`
+(ver Torneo.registrar_cambio), así que con el último cambio y la cantidad de
+torneos (por los borrados) alcanza.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Exists, F, Max, OuterRef, Q
+
+from torneos.models import Torneo, Inscripcion
+
+CLAVE_CACHE = 'portada:torneos'
+# Las entradas de versiones viejas no se borran: vencen solas
+TTL_CACHE = 300
+
+CAMPOS = ('pk', 'nombre', 'estado', 'fecha_inicio', 'cupos_totales', 'division_nombre', 'num_inscripciones')
+
+
+def _inscripciones_de(usuario):
+    return Inscripcion.objects.filter(Q(equipo__jugador1=usuario) | Q(equipo__jugador2=usuario))
+
+
+def consulta_portada(usuario=None):
+    """Torneos abiertos y en juego como diccionarios, con el flag `inscrito` si hay usuario."""
+    torneos = (
+        Torneo.objects.filter(estado__in=[Torneo.Estado.ABIERTO, Torneo.Estado.EN_JUEGO])
+        .annotate(
+            division_nombre=F('division__nombre'),
+            num_inscripciones=Count('inscripciones'),
+        )
+        .order_by('fecha_inicio', 'pk')
+    )
+    campos = CAMPOS
+    if usuario is not None:
+        torneos = torneos.annotate(
+            inscrito=Exists(_inscripciones_de(usuario).filter(torneo=OuterRef('pk')))
+        )
+        campos += ('inscrito',)
+    return torneos.values(*campos)
+
+
+async def version():
+    """Versión actual de la Home (su ETag): una consulta agregada sobre Torneo."""
+    estado = await Torneo.objects.aaggregate(ultimo=Max('actualizado'), total=Count('pk'))
+    ultimo = estado['ultimo']
+    return f"{int(ultimo.timestamp() * 1_000_000) if ultimo else 0:x}-{estado['total']}"
+
+
+async def datos_portada(usuario, token):
+    """
+    Devuelve (torneos_abiertos, torneos_en_juego) para `usuario` en la
+    versión `token` de la Home.
+
+    Con caché vacía: una sola consulta (la del usuario, si está logueado) que
+    además llena la caché. Con caché: solo la consulta de flags del usuario.
+    """
+    autenticado = usuario.is_authenticated
+    clave = f'{CLAVE_CACHE}:{token}'
+    filas = await cache.aget(clave)
+    if filas is None:
+        # Puede salir de la réplica: si está atrasada, el token leído también,
+        # y al ponerse al día cambia de clave
+        consulta = consulta_portada(usuario if autenticado else None)
+        filas = [fila async for fila in consulta]
+        compartidas = [{campo: fila[campo] for campo in CAMPOS} for fila in filas]
+        await cache.aset(clave, compartidas, TTL_CACHE)
+    elif autenticado:
+        inscritos = {
+            torneo_id async for torneo_id in _inscripciones_de(usuario)
+            .filter(torneo_id__in=[fila['pk'] for fila in filas])
+            .values_list('torneo_id', flat=True)
+        }
+        filas = [{**fila, 'inscrito': fila['pk'] in inscritos} for fila in filas]
+
+    abiertos = [fila for fila in filas if fila['estado'] == Torneo.Estado.ABIERTO]
+    en_juego = [fila for fila in filas if fila['estado'] == Torneo.Estado.EN_JUEGO]
+    return abiertos, en_juego
@@ -0,0 +1,131 @@
+"""
+Lecturas de las vistas públicas en una réplica de la base.
+
+- RouterReplica manda a la réplica (alias REPLICA) las lecturas de las vistas
+  envueltas con `en_replica`; todo lo demás, y cualquier escritura, va a la
+  primaria. Dentro de una transacción también se lee de la primaria.
+- ReplicaMiddleware deja un EstadoReplica por request. Si en la request hubo
+  una escritura, responde con la cookie COOKIE_PRIMARIA y ese navegador lee de
+  la primaria durante REPLICA_FIJAR_SEGUNDOS (lee sus propias escrituras
+  aunque la réplica venga atrasada).
+- Sin el alias REPLICA en DATABASES no cambia nada: todo va a `default`.
+
+`en_replica` solo marca el estado de la request (no lo restaura al salir), así
+que el render diferido de una TemplateResponse también lee de la réplica.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+COOKIE_PRIMARIA = 'leer_primaria'
+
+_estado = ContextVar('estado_replica', default=None)
+
+
+class EstadoReplica:
+    __slots__ = ('fijada', 'replica', 'escribio')
+
+    def __init__(self, fijada=False):
+        # La cookie de lectura en primaria está vigente
+        self.fijada = fijada
+        self.replica = False
+        self.escribio = False
+
+
+def hay_replica():
+    return REPLICA in settings.DATABASES
+
+
+class RouterReplica:
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if (
+            estado is None
+            or not estado.replica
+            or estado.fijada
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.escribio = True
+        # Explícito: sin esto Django escribe en la base de la que se leyó la instancia
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica es una copia de la primaria
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # El esquema llega a la réplica por replicación
+        return db != REPLICA
+
+
+def en_replica(vista):
+    """Las lecturas de `vista` (sync o async) van a la réplica si existe."""
+    if not hay_replica():
+        return vista
+
+    def marcar():
+        estado = _estado.get()
+        if estado is not None and not estado.fijada:
+            estado.replica = True
+
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            marcar()
+            return await vista(request, *args, **kwargs)
+    else:
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            marcar()
+            return vista(request, *args, **kwargs)
+    return envoltura
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = EstadoReplica(fijada=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado.set(estado)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _estado.reset(token)
+        return self.fijar(estado, respuesta)
+
+    async def __acall__(self, request):
+        estado = EstadoReplica(fijada=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado.set(estado)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _estado.reset(token)
+        return self.fijar(estado, respuesta)
+
+    def fijar(self, estado, respuesta):
+        if estado.escribio and hay_replica():
+            respuesta.set_cookie(
+                COOKIE_PRIMARIA, '1',
+                max_age=settings.REPLICA_FIJAR_SEGUNDOS,
+                httponly=True, samesite='Lax',
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return respuesta
@@ -0,0 +1,151 @@
+"""
+Herramientas de siembra de datos (seeding) para desarrollo, simulaciones y demos.
+
+`create_user()` ejecuta el hash PBKDF2 completo (600k iteraciones) por cada
+jugador. Aquí la contraseña compartida se hashea UNA sola vez y usuarios,
+equipos e inscripciones se crean con bulk_create.
+"""
+import math
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Division
+from equipos.models import Equipo
+from torneos.estadisticas import reconstruir_enfrentamientos
+from torneos.models import Torneo, Inscripcion, Partido
+
+User = get_user_model()
+
+# Datos del torneo de prueba (vista `crear_torneo_prueba` y comando `crear_torneo_24`)
+PREFIJO_TORNEO_PRUEBA = "Torneo 24 Equipos"
+DOMINIO_PRUEBA = "@ejemplo.com"
+PASSWORD_PRUEBA = "sim123456"
+
+
+def crear_jugadores(division, filas, password=None, batch_size=1000):
+    """
+    Crea jugadores en bloque con una contraseña compartida.
+
+    `filas` es un iterable de diccionarios con al menos email, nombre y
+    apellido (se aceptan otros campos de CustomUser). Sin `password` los
+    usuarios quedan con contraseña inutilizable.
+    """
+    password_hash = make_password(password)
+    jugadores = [
+        User(
+            division=division,
+            tipo_usuario=User.TipoUsuario.PLAYER,
+            password=password_hash,
+            **fila,
+        )
+        for fila in filas
+    ]
+    return User.objects.bulk_create(jugadores, batch_size=batch_size)
+
+
+def crear_equipos(parejas, division, batch_size=1000):
+    """Crea un equipo por cada pareja (jugador1, jugador2) con el nombre que calcularía Equipo.save()."""
+    equipos = [
+        Equipo(
+            jugador1=jugador1,
+            jugador2=jugador2,
+            division=division,
+            nombre=Equipo.generar_nombre(jugador1, jugador2),
+        )
+        for jugador1, jugador2 in parejas
+    ]
+    return Equipo.objects.bulk_create(equipos, batch_size=batch_size)
+
+
+def inscribir_equipos(torneo, equipos, batch_size=1000):
+    inscripciones = Inscripcion.objects.bulk_create(
+        [Inscripcion(torneo=torneo, equipo=equipo) for equipo in equipos],
+        batch_size=batch_size,
+    )
+    # bulk_create no dispara post_save: se versiona a mano (también mueve la Home)
+    Torneo.registrar_cambio(pk=torneo.pk)
+    return inscripciones
+
+
+def crear_bracket_jugado(torneo, equipos):
+    """
+    Crea el cuadro de eliminación completo de `equipos` (potencia de 2) con
+    bulk_create y su head-to-head: gana siempre el equipo1 y la final queda
+    sin jugar, así el torneo sigue EN_JUEGO. Devuelve la final.
+    """
+    rondas = int(math.log2(len(equipos)))
+    cruces = {1: list(zip(equipos[0::2], equipos[1::2]))}
+    for ronda in range(2, rondas + 1):
+        ganadores = [e1 for e1, _ in cruces[ronda - 1]]
+        cruces[ronda] = list(zip(ganadores[0::2], ganadores[1::2]))
+
+    # De la final hacia atrás: cada partido ya conoce a su siguiente
+    siguientes = []
+    for ronda in range(rondas, 0, -1):
+        partidos = []
+        for i, (e1, e2) in enumerate(cruces[ronda], start=1):
+            partido = Partido(
+                torneo=torneo, ronda=ronda, orden_partido=i, equipo1=e1, equipo2=e2,
+                siguiente_partido=siguientes[(i - 1) // 2] if siguientes else None,
+            )
+            if ronda < rondas:
+                partido.cargar_sets([(6, 3), (6, 4)])
+                partido.ganador = e1
+                partido.resultado = partido.marcador(', ')
+            partidos.append(partido)
+        siguientes = Partido.objects.bulk_create(partidos)
+        if ronda == rondas:
+            final = siguientes[0]
+    reconstruir_enfrentamientos([torneo.pk])
+    return final
+
+
+def crear_torneo_prueba(num_equipos=24, equipos_por_grupo=3, progreso=None):
+    """
+    Crea un torneo ABIERTO con `num_equipos` equipos inscritos, borrando antes
+    los torneos y jugadores de prueba anteriores.
+
+    `progreso(porcentaje, mensaje)` se llama en cada etapa, si se pasa.
+    """
+    def reportar(porcentaje, mensaje):
+        if progreso:
+            progreso(porcentaje, mensaje)
+
+    reportar(5, "Limpiando datos de prueba anteriores...")
+    Torneo.objects.filter(nombre__startswith=PREFIJO_TORNEO_PRUEBA).delete()
+    User.objects.filter(email__endswith=DOMINIO_PRUEBA).delete()
+
+    with transaction.atomic():
+        reportar(30, "Creando torneo...")
+        division, _ = Division.objects.get_or_create(nombre="Séptima")
+        torneo = Torneo.objects.create(
+            nombre=f"{PREFIJO_TORNEO_PRUEBA} - {timezone.now().strftime('%Y-%m-%d %H:%M')}",
+            division=division,
+            fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now() + timedelta(days=7),
+            cupos_totales=num_equipos,
+            equipos_por_grupo=equipos_por_grupo,
+            estado=Torneo.Estado.ABIERTO,
+        )
+
+        reportar(45, f"Creando {num_equipos * 2} jugadores...")
+        filas = []
+        for i in range(1, num_equipos + 1):
+            for letra in ('A', 'B'):
+                filas.append({
+                    'email': f"jugador{i}{letra.lower()}{DOMINIO_PRUEBA}",
+                    'nombre': f'Jugador{i}{letra}',
+                    'apellido': f'Sim{i}{letra}',
+                })
+        jugadores = crear_jugadores(division, filas, password=PASSWORD_PRUEBA)
+
+        reportar(75, f"Creando e inscribiendo {num_equipos} equipos...")
+        equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        inscribir_equipos(torneo, equipos)
+
+    reportar(100, f"Torneo de prueba creado con {num_equipos} equipos.")
+    return torneo
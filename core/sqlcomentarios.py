@@ -0,0 +1,132 @@
+"""
+Comentarios estilo sqlcommenter en cada consulta SQL.
+
+    SELECT ... /*controller='torneos.views.AdminTorneoManageView',framework='django',
+                 route='torneos%3Aadmin_manage',template_tag='get_team_info'*/
+
+Así los logs de consultas lentas y pg_stat_statements (o el trace de
+SQLite) se pueden agrupar por vista, tarea o template tag de origen.
+
+- ComentariosSQLMiddleware deja la request en una ContextVar; la ruta y la
+  vista se leen de request.resolver_match recién al ejecutar la consulta.
+- Las tareas en segundo plano usan `origen(tarea=...)` (ver core.tareas).
+- Los template tags que consultan la base se decoran con @etiqueta_sql.
+
+El wrapper se agrega a cada conexión al abrirse (señal connection_created);
+el comentario se arma una sola vez por origen y se reutiliza.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from urllib.parse import quote
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_origen = ContextVar('origen_sql', default=None)
+
+
+def formatear(campos):
+    """key='valor' ordenados por clave y con los valores url-encoded (formato sqlcommenter)."""
+    pares = ",".join(
+        f"{clave}='{quote(str(valor), safe='')}'"
+        for clave, valor in sorted(campos.items()) if valor
+    )
+    return f" /*{pares}*/" if pares else ""
+
+
+class Origen:
+    __slots__ = ('request', 'campos', '_comentario', '_derivados')
+
+    def __init__(self, request=None, **campos):
+        self.request = request
+        self.campos = {'framework': 'django', **campos}
+        self._comentario = None
+        self._derivados = {}
+
+    def comentario(self):
+        if self._comentario is not None:
+            return self._comentario
+        campos = self.campos
+        match = getattr(self.request, 'resolver_match', None)
+        if match is not None:
+            campos = {'route': match.view_name, 'controller': match._func_path, **campos}
+        elif self.request is not None:
+            # Antes de resolver la URL (Ej: sesión en un middleware): no se cachea
+            return formatear(campos)
+        self._comentario = formatear(campos)
+        return self._comentario
+
+    def con(self, **campos):
+        """Origen derivado (Ej: un template tag dentro de la vista), reutilizado por clave."""
+        clave = tuple(sorted(campos.items()))
+        if clave not in self._derivados:
+            self._derivados[clave] = Origen(self.request, **{**self.campos, **campos})
+        return self._derivados[clave]
+
+
+@contextmanager
+def origen(request=None, **campos):
+    """Marca las consultas del bloque con `campos` (se suman a los del origen actual)."""
+    actual = _origen.get()
+    nuevo = actual.con(**campos) if actual and request is None else Origen(request, **campos)
+    token = _origen.set(nuevo)
+    try:
+        yield nuevo
+    finally:
+        _origen.reset(token)
+
+
+def etiqueta_sql(funcion):
+    """Decorador para template tags: sus consultas llevan template_tag='<nombre>'."""
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with origen(template_tag=funcion.__name__):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+
+def comentar(execute, sql, params, many, context):
+    actual = _origen.get()
+    if actual is not None:
+        comentario = actual.comentario()
+        if params is not None:
+            # Con parámetros el driver formatea la consulta: el '%' del url-encoding
+            # (Ej: 'torneos%3Adetail') se escapa para que no se tome como marcador
+            comentario = comentario.replace('%', '%%')
+        sql += comentario
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def instalar(sender, connection, **kwargs):
+    if comentar not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, comentar)
+
+
+class ComentariosSQLMiddleware:
+    """Va primero en MIDDLEWARE para cubrir también sesión y autenticación."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _origen.set(Origen(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _origen.reset(token)
+
+    async def __acall__(self, request):
+        token = _origen.set(Origen(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _origen.reset(token)
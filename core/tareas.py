@@ -0,0 +1,172 @@
+"""
+Cola de tareas en segundo plano respaldada por la base de datos.
+
+Cada app registra sus funciones en un módulo `tareas.py` (se autodescubren en
+CoreConfig.ready) con el decorador `@registrar`. La función recibe la Tarea
+como primer argumento, puede informar avance con `reportar()` y devuelve
+opcionalmente la URL a la que redirigir al terminar.
+
+`encolar()` solo inserta la fila (`encolar_una_vez()` la inserta una sola vez
+por clave de idempotencia); el comando `procesar_tareas` las toma y
+ejecuta. No hace falta broker externo: la toma se hace con un UPDATE
+condicional (estado=PENDIENTE), así dos workers nunca ejecutan la misma tarea.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Tarea
+from .sqlcomentarios import origen
+
+logger = logging.getLogger(__name__)
+
+REGISTRO = {}
+
+# Espera antes de cada reintento: 5s, 20s, 80s...
+ESPERA_BASE_REINTENTO = 5
+
+# Una tarea EN_CURSO sin novedades en este tiempo se da por colgada (worker caído)
+MINUTOS_TAREA_COLGADA = 15
+
+
+class ErrorSinReintento(Exception):
+    """Error de negocio (datos inválidos): la tarea falla sin reintentarse."""
+
+
+def registrar(nombre):
+    def decorador(funcion):
+        REGISTRO[nombre] = funcion
+        return funcion
+
+    return decorador
+
+
+def identificador_worker():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def reportar(tarea, porcentaje, mensaje=''):
+    """Actualiza el progreso con un UPDATE directo (sin tocar el resto de campos)."""
+    tarea.progreso = porcentaje
+    tarea.mensaje = mensaje[:255]
+    Tarea.objects.filter(pk=tarea.pk).update(
+        progreso=porcentaje, mensaje=tarea.mensaje, actualizada=timezone.now()
+    )
+
+
+def encolar(nombre, usuario=None, max_intentos=3, **parametros):
+    """Inserta la Tarea en la cola y la devuelve al instante."""
+    tarea, _ = _encolar(nombre, usuario, max_intentos, parametros)
+    return tarea
+
+
+def encolar_una_vez(clave, nombre, usuario=None, max_intentos=3, **parametros):
+    """
+    Como encolar(), pero con una clave de idempotencia (Ej: la del formulario
+    que se envió). Un reenvío con la misma clave, como un doble clic, no
+    encola nada: devuelve la tarea del primer envío. Devuelve (tarea, creada).
+    """
+    return _encolar(nombre, usuario, max_intentos, parametros, clave=clave)
+
+
+def _encolar(nombre, usuario, max_intentos, parametros, clave=None):
+    if nombre not in REGISTRO:
+        raise KeyError(f"Tarea no registrada: {nombre}")
+    try:
+        # El índice único de `clave` decide entre envíos simultáneos
+        with transaction.atomic():
+            tarea = Tarea.objects.create(
+                nombre=nombre, parametros=parametros, creada_por=usuario,
+                max_intentos=max_intentos, clave=clave,
+            )
+    except IntegrityError:
+        if clave is None:
+            raise
+        return Tarea.objects.get(clave=clave), False
+    if getattr(settings, 'TAREAS_EN_HILO', False):
+        # Despliegues sin worker (Ej: un único servicio web): se procesa en un hilo
+        threading.Thread(
+            target=_procesar_en_hilo, args=(tarea.pk,), name=f"tarea-{tarea.pk}", daemon=True
+        ).start()
+    return tarea, True
+
+
+def _procesar_en_hilo(tarea_id):
+    close_old_connections()
+    try:
+        tarea = tomar(identificador_worker(), tarea_id=tarea_id)
+        if tarea:
+            ejecutar(tarea)
+    finally:
+        connections.close_all()
+
+
+def tomar(worker, tarea_id=None):
+    """
+    Reserva la próxima tarea pendiente (o una concreta) para `worker`.
+    Devuelve la Tarea o None si no hay nada disponible.
+    """
+    candidatas = Tarea.objects.filter(
+        estado=Tarea.Estado.PENDIENTE, disponible_desde__lte=timezone.now()
+    )
+    if tarea_id is not None:
+        candidatas = candidatas.filter(pk=tarea_id)
+    for pk in candidatas.order_by('disponible_desde', 'pk').values_list('pk', flat=True)[:10]:
+        tomada = Tarea.objects.filter(pk=pk, estado=Tarea.Estado.PENDIENTE).update(
+            estado=Tarea.Estado.EN_CURSO,
+            worker=worker[:100],
+            intentos=F('intentos') + 1,
+            actualizada=timezone.now(),
+        )
+        if tomada:
+            return Tarea.objects.get(pk=pk)
+    return None
+
+
+def ejecutar(tarea):
+    """Ejecuta una tarea ya tomada y deja registrado el resultado, el error o el reintento."""
+    funcion = REGISTRO.get(tarea.nombre)
+    try:
+        if funcion is None:
+            raise ErrorSinReintento(f"Tarea no registrada: {tarea.nombre}")
+        with origen(tarea=tarea.nombre):
+            resultado_url = funcion(tarea, **tarea.parametros)
+    except ErrorSinReintento as exc:
+        tarea.estado = Tarea.Estado.FALLIDA
+        tarea.mensaje = str(exc)[:255]
+    except Exception as exc:
+        logger.exception("La tarea %s (%s) falló", tarea.pk, tarea.nombre)
+        tarea.mensaje = str(exc)[:255]
+        if tarea.intentos < tarea.max_intentos:
+            tarea.estado = Tarea.Estado.PENDIENTE
+            tarea.disponible_desde = timezone.now() + timedelta(
+                seconds=ESPERA_BASE_REINTENTO * 4 ** (tarea.intentos - 1)
+            )
+        else:
+            tarea.estado = Tarea.Estado.FALLIDA
+    else:
+        tarea.estado = Tarea.Estado.COMPLETADA
+        tarea.progreso = 100
+        tarea.resultado_url = resultado_url or ''
+    tarea.save(update_fields=[
+        'estado', 'progreso', 'mensaje', 'resultado_url', 'disponible_desde', 'actualizada'
+    ])
+    return tarea
+
+
+def liberar_colgadas():
+    """Devuelve a la cola (o da por fallidas) las tareas de workers caídos."""
+    limite = timezone.now() - timedelta(minutes=MINUTOS_TAREA_COLGADA)
+    colgadas = Tarea.objects.filter(estado=Tarea.Estado.EN_CURSO, actualizada__lt=limite)
+    fallidas = colgadas.filter(intentos__gte=F('max_intentos')).update(
+        estado=Tarea.Estado.FALLIDA, mensaje="El worker dejó de responder."
+    )
+    reencoladas = colgadas.update(estado=Tarea.Estado.PENDIENTE, disponible_desde=timezone.now())
+    return reencoladas + fallidas
@@ -1,8 +1,12 @@
 from django.urls import path
 from . import views
+from .replicas import en_replica
 
 app_name = 'core'
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', en_replica(views.home), name='home'),
+    # Tareas en segundo plano (progreso vía HTMX)
+    path('tareas/<int:pk>/', views.tarea_detalle, name='tarea_detalle'),
+    path('tareas/<int:pk>/estado/', views.tarea_estado, name='tarea_estado'),
 ]
@@ -1,27 +1,69 @@
-from django.shortcuts import render
-from torneos.models import Torneo
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from . import portada
+from .condicional import armar_validadores, get_condicional, parte_usuario
+from .models import Tarea
 
 
-def home(request):
+async def version_portada(request):
+    """Versión de la Home, consultada una sola vez por request (ETag y datos)."""
+    if not hasattr(request, '_version_portada'):
+        request._version_portada = await portada.version()
+    return request._version_portada
+
+
+async def validadores_home(request):
+    request.user = user = await request.auser()
+    equipo = await user.aequipo() if user.is_authenticated else None
+    etag = f"home-{await version_portada(request)}-{parte_usuario(user, equipo)}"
+    return armar_validadores(etag, user)
+
+
+@get_condicional(validadores_home)
+async def home(request):
     """
     Vista principal (Home). Muestra los torneos abiertos y en juego.
-    """
-    # CORRECCIÓN: Usamos las constantes del modelo (AB, EJ) en lugar de strings crudos
-    torneos_abiertos = Torneo.objects.filter(estado=Torneo.Estado.ABIERTO).order_by(
-        'fecha_inicio'
-    )
 
-    torneos_en_juego = Torneo.objects.filter(estado=Torneo.Estado.EN_JUEGO).order_by(
-        'fecha_inicio'
+    Vista async: los datos salen de core.portada (una consulta anotada, con la
+    parte común en caché) y solo el render del template corre en un hilo.
+    """
+    # Se reemplaza el usuario perezoso para que el template no lo vuelva a consultar
+    request.user = user = await request.auser()
+    torneos_abiertos, torneos_en_juego = await portada.datos_portada(
+        user, await version_portada(request)
     )
-
     context = {
         'torneos_abiertos': torneos_abiertos,
         'torneos_en_juego': torneos_en_juego,
     }
+    return await sync_to_async(render)(request, 'core/home.html', context)
+
+
+# --- Tareas en segundo plano ---
+
+
+@login_required
+def tarea_detalle(request, pk):
+    """Página de progreso de una tarea (solo admins)."""
+    if request.user.tipo_usuario != 'ADMIN':
+        messages.error(request, "Acceso denegado: solo administradores.")
+        return redirect('core:home')
+    tarea = get_object_or_404(Tarea, pk=pk)
+    return render(request, 'core/tarea_detalle.html', {'tarea': tarea})
+
 
-    if request.user.is_authenticated and hasattr(request.user, 'equipo') and request.user.equipo:
-        from torneos.models import Inscripcion
-        inscripciones = Inscripcion.objects.filter(equipo=request.user.equipo)
-        context['torneos_inscritos_ids'] = set(inscripciones.values_list('torneo_id', flat=True))
-    return render(request, 'core/home.html', context)
+@login_required
+def tarea_estado(request, pk):
+    """Fragmento HTMX con el estado de la tarea; redirige al resultado al terminar."""
+    if request.user.tipo_usuario != 'ADMIN':
+        return HttpResponse(status=403)
+    tarea = get_object_or_404(Tarea, pk=pk)
+    response = render(request, 'core/tarea_estado.html', {'tarea': tarea})
+    if tarea.estado == Tarea.Estado.COMPLETADA and tarea.resultado_url:
+        response['HX-Redirect'] = tarea.resultado_url
+        if tarea.mensaje:
+            messages.success(request, tarea.mensaje)
+    return response
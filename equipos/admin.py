@@ -1,4 +1,5 @@
 from django.contrib import admin
+from core.paginacion import PaginadorConteoEstimado
 from .models import Division, Equipo
 
 
@@ -12,7 +13,10 @@ class DivisionAdmin(admin.ModelAdmin):
 class EquipoAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'jugador1', 'jugador2', 'division', 'fecha_creacion')
     list_filter = ('division',)
+    list_select_related = ('jugador1', 'jugador2', 'division')
     search_fields = ('nombre', 'jugador1__email', 'jugador2__email')
+    paginator = PaginadorConteoEstimado
+    show_full_result_count = False
     raw_id_fields = ('jugador1', 'jugador2')  # Para búsqueda de usuarios
 
     def get_readonly_fields(self, request, obj=None):
@@ -41,7 +41,7 @@ class EquipoCreateForm(forms.ModelForm):
 
             # 2. Filtramos el queryset para el campo jugador2:
             self.fields['jugador2'].queryset = (
-                CustomUser.objects.filter(division=user.division, tipo_usuario='PLAYER')
+                CustomUser.objects.filter(division_id=user.division_id, tipo_usuario='PLAYER')
                 .exclude(id=user.id)
                 .exclude(id__in=usuarios_con_equipo_ids)
                 .order_by('apellido', 'nombre')
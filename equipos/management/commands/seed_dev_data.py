@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from accounts.models import CustomUser, Division
 from equipos.models import Equipo
+from core.siembra import crear_jugadores
 from django.contrib.auth.models import Group, Permission
 
 
@@ -41,31 +42,21 @@ class Command(BaseCommand):
             # Limpiar jugadores antiguos de la división para asegurar 32 nuevos
             CustomUser.objects.filter(division=division, tipo_usuario='PLAYER').delete()
 
-            jugadores = []
+            filas = []
             for i in range(1, NUM_JUGADORES + 1):
                 nombre_base = f"Jugador{i}"
-                jugadores.append(
-                    CustomUser(
-                        email=f"jugador{i}@ejemplo.com",
-                        nombre=nombre_base,
-                        apellido=f"Apellido{i}",
-                        numero_telefono=f"555-010-{i:02d}",
-                        genero=random.choice([c[0] for c in CustomUser.Genero.choices]),
-                        division=division,
-                        tipo_usuario=CustomUser.TipoUsuario.PLAYER,
-                        is_active=True,
-                    )
+                filas.append(
+                    {
+                        'email': f"jugador{i}@ejemplo.com",
+                        'nombre': nombre_base,
+                        'apellido': f"Apellido{i}",
+                        'numero_telefono': f"555-010-{i:02d}",
+                        'genero': random.choice([c[0] for c in CustomUser.Genero.choices]),
+                    }
                 )
 
-            # Usar bulk_create para eficiencia
-            CustomUser.objects.bulk_create(jugadores)
-
-            # Setear contraseñas después de bulk_create
-            for user in CustomUser.objects.filter(
-                division=division, tipo_usuario='PLAYER'
-            ):
-                user.set_password(PASSWORD_JUGADOR)
-                user.save()
+            # bulk_create con la contraseña hasheada una sola vez
+            crear_jugadores(division, filas, password=PASSWORD_JUGADOR)
 
             self.stdout.write(self.style.SUCCESS(f"Creados {NUM_JUGADORES} jugadores."))
 
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_customuser_options'),
+        ('equipos', '0002_alter_equipo_division_alter_equipo_nombre'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipo',
+            index=models.Index(fields=['division', 'nombre', 'id'], name='equipo_division_nombre_idx'),
+        ),
+    ]
@@ -23,18 +23,27 @@ class Equipo(models.Model):
     class Meta:
         # Evita que los mismos dos jugadores formen otro equipo
         unique_together = ('jugador1', 'jugador2')
+        indexes = [
+            # Listado de admin filtrado por división: paginación keyset por (nombre, id)
+            models.Index(fields=['division', 'nombre', 'id'], name='equipo_division_nombre_idx'),
+        ]
+
+    @staticmethod
+    def generar_nombre(jugador1, jugador2):
+        """Nombre del equipo a partir de sus jugadores (Ej: "Gomez/Perez")."""
+        # 1. Usamos 'apellido' (nuestro campo) en lugar de 'last_name'
+        # Si no tienen apellido, usamos el email como fallback
+        j1_nombre = jugador1.apellido or jugador1.email.split('@')[0]
+        j2_nombre = jugador2.apellido or jugador2.email.split('@')[0]
+
+        # 2. Ordenamos alfabéticamente para consistencia
+        nombres_ordenados = sorted([j1_nombre, j2_nombre])
+        return f"{nombres_ordenados[0]}/{nombres_ordenados[1]}"
 
     def save(self, *args, **kwargs):
         # Lógica adaptada de tu proyecto anterior:
         if self.jugador1 and self.jugador2:
-            # 1. Usamos 'apellido' (nuestro campo) en lugar de 'last_name'
-            # Si no tienen apellido, usamos el email como fallback
-            j1_nombre = self.jugador1.apellido or self.jugador1.email.split('@')[0]
-            j2_nombre = self.jugador2.apellido or self.jugador2.email.split('@')[0]
-
-            # 2. Ordenamos alfabéticamente para consistencia
-            nombres_ordenados = sorted([j1_nombre, j2_nombre])
-            self.nombre = f"{nombres_ordenados[0]}/{nombres_ordenados[1]}"
+            self.nombre = self.generar_nombre(self.jugador1, self.jugador2)
 
             # 3. Asignar división automáticamente basada en el jugador 1 (si no se pasó)
             # Esto mantiene la integridad de datos
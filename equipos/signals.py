@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Equipo
+
+
+@receiver(post_save, sender=Equipo)
+@receiver(post_delete, sender=Equipo)
+def olvidar_equipo_de_jugadores(sender, instance, **kwargs):
+    """
+    `CustomUser.equipo` se calcula una vez por instancia: los jugadores ya
+    cargados en memoria (Ej: request.user al crear o disolver su equipo) lo
+    vuelven a buscar la próxima vez.
+    """
+    for campo in (Equipo.jugador1, Equipo.jugador2):
+        if campo.is_cached(instance):
+            getattr(instance, campo.field.name).olvidar_equipo()
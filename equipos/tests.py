@@ -1,3 +1,45 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import Division
+from core.siembra import crear_equipos, crear_jugadores
+from torneos.estadisticas import historial
+
+User = get_user_model()
+
+
+class HistorialJugadorTests(TestCase):
+    """El historial de jugador es público: solo jugadores con equipo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        cls.con_equipo, companero, cls.sin_equipo = crear_jugadores(division, [
+            {'email': f"jugador{i}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}"}
+            for i in range(1, 4)
+        ])
+        cls.equipo, = crear_equipos([(cls.con_equipo, companero)], division)
+        cls.admin = User.objects.create_superuser(
+            email='admin@ejemplo.com', password='admin123', nombre='Admin', apellido='Test'
+        )
+
+    def test_jugador_con_equipo(self):
+        for nombre in ('equipos:historial_jugador', 'equipos:historial_jugador_json'):
+            with self.subTest(url=nombre):
+                respuesta = self.client.get(reverse(nombre, args=[self.con_equipo.pk]))
+                self.assertEqual(respuesta.status_code, 200)
+
+    def test_admins_y_jugadores_sin_equipo_no_se_exponen(self):
+        for usuario in (self.admin, self.sin_equipo):
+            for nombre in ('equipos:historial_jugador', 'equipos:historial_jugador_json'):
+                with self.subTest(usuario=usuario.email, url=nombre):
+                    respuesta = self.client.get(reverse(nombre, args=[usuario.pk]))
+                    self.assertEqual(respuesta.status_code, 404)
+
+    def test_una_consulta_por_pagina_sin_conteo(self):
+        with self.assertNumQueries(1):
+            pagina = historial([self.equipo.pk], tamano=20)
+        self.assertIsNone(pagina.total_aproximado)
+        respuesta = self.client.get(reverse('equipos:historial_jugador_json', args=[self.con_equipo.pk]))
+        self.assertNotIn('total', respuesta.json())
@@ -1,4 +1,6 @@
 from django.urls import path
+from core.replicas import en_replica
+
 from . import views
 
 app_name = 'equipos'
@@ -7,13 +9,30 @@ urlpatterns = [
     # Vistas de Autocompletado (NUEVA)
     path(
         'autocomplete/jugadores/',
-        views.JugadorAutocomplete.as_view(),
+        en_replica(views.JugadorAutocomplete.as_view()),
         name='jugador_autocomplete',
     ),
     # Vistas de Jugador
     path('mi-equipo/', views.MiEquipoDetailView.as_view(), name='mi_equipo'),
     path('crear/', views.EquipoCreateView.as_view(), name='crear'),
     path('disolver/', views.EquipoDeleteView.as_view(), name='disolver'),
+    # Historial de partidos (público) y su versión JSON
+    path('<int:pk>/historial/', views.HistorialEquipoView.as_view(), name='historial'),
+    path(
+        '<int:pk>/historial/json/',
+        views.HistorialEquipoView.as_view(formato='json'),
+        name='historial_json',
+    ),
+    path(
+        'jugador/<int:pk>/historial/',
+        views.HistorialJugadorView.as_view(),
+        name='historial_jugador',
+    ),
+    path(
+        'jugador/<int:pk>/historial/json/',
+        views.HistorialJugadorView.as_view(formato='json'),
+        name='historial_jugador_json',
+    ),
     # Vistas de Admin
     path('admin/listado/', views.AdminEquipoListView.as_view(), name='admin_list'),
 ]
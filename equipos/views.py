@@ -1,11 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DetailView, DeleteView, ListView
+from django.views.generic import CreateView, DetailView, DeleteView, ListView, TemplateView
+from django.http import Http404, JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from .models import Equipo
 from accounts.models import Division, CustomUser
 from .forms import EquipoCreateForm
+from core.paginacion import PARAM_ANTES, PARAM_DESPUES, CursorInvalido, KeysetPaginationMixin
+from torneos.estadisticas import historial
 from django.db.models import Q  # Importamos Q de forma limpia
 from django.db import models  # <--- ¡CORRECCIÓN! Importamos models desde django.db
 
@@ -92,7 +95,7 @@ class JugadorAutocomplete(autocomplete.Select2QuerySetView):
 
         # 1. Base Query: Mismos filtros que en EquipoCreateForm (División y tipo)
         qs = CustomUser.objects.filter(
-            division=user.division, tipo_usuario='PLAYER'
+            division_id=user.division_id, tipo_usuario='PLAYER'
         ).exclude(
             id=user.id  # Excluirse a sí mismo
         )
@@ -190,14 +193,112 @@ class EquipoDeleteView(PlayerOwnsTeamMixin, DeleteView):
         return super().form_valid(form)
 
 
+# --- Historial de partidos (público) ---
+
+
+class HistorialEquipoView(TemplateView):
+    """
+    Partidos de grupos y bracket de un equipo, del más reciente al más viejo.
+    Una consulta UNION ALL por página (torneos.estadisticas.historial), con
+    paginación keyset. Con formato='json' es la API del mismo listado.
+    """
+    template_name = 'equipos/historial.html'
+    paginate_by = 20
+    formato = 'html'
+
+    def get_titular(self):
+        return get_object_or_404(Equipo.objects.select_related('division'), pk=self.kwargs['pk'])
+
+    def get_equipos(self, titular):
+        return [titular.pk]
+
+    def get_titulo(self, titular):
+        return titular.nombre
+
+    def get(self, request, *args, **kwargs):
+        titular = self.get_titular()
+        try:
+            pagina = historial(
+                self.get_equipos(titular),
+                self.paginate_by,
+                despues=request.GET.get(PARAM_DESPUES),
+                antes=request.GET.get(PARAM_ANTES),
+            )
+        except CursorInvalido:
+            raise Http404("Cursor de paginación inválido.")
+
+        if self.formato == 'json':
+            return JsonResponse(self.datos_json(titular, pagina))
+        context = self.get_context_data(
+            titular=titular,
+            titulo=self.get_titulo(titular),
+            partidos=pagina.object_list,
+            page_obj=pagina,
+            is_paginated=pagina.has_other_pages(),
+        )
+        return self.render_to_response(context)
+
+    def datos_json(self, titular, pagina):
+        def enlace(parametro, cursor):
+            return f"{self.request.path}?{parametro}={cursor}" if cursor else None
+
+        return {
+            'titulo': self.get_titulo(titular),
+            'siguiente': enlace(PARAM_DESPUES, pagina.cursor_siguiente),
+            'anterior': enlace(PARAM_ANTES, pagina.cursor_anterior),
+            'partidos': [
+                {
+                    'tipo': 'grupo' if partido.es_grupo else 'eliminatoria',
+                    'id': partido.id,
+                    'fecha': partido.fecha,
+                    'torneo_id': partido.torneo_id,
+                    'torneo': partido.torneo,
+                    'fase': partido.fase,
+                    'equipo_id': partido.equipo_id,
+                    'rival_id': partido.rival_id,
+                    'rival': partido.rival,
+                    'rival_codigo': partido.rival_codigo,
+                    'sets': partido.pares,
+                    'jugado': partido.jugado,
+                    'gano': partido.gano,
+                }
+                for partido in pagina
+            ],
+        }
+
+
+class HistorialJugadorView(HistorialEquipoView):
+    """Historial de un jugador: los partidos de todos los equipos que integró."""
+
+    def get_titular(self):
+        # Es público: solo jugadores que integran algún equipo (nada de admins
+        # ni cuentas sueltas)
+        jugadores = CustomUser.objects.filter(
+            models.Exists(Equipo.objects.filter(
+                Q(jugador1=models.OuterRef('pk')) | Q(jugador2=models.OuterRef('pk'))
+            )),
+            tipo_usuario=CustomUser.TipoUsuario.PLAYER,
+        )
+        return get_object_or_404(jugadores, pk=self.kwargs['pk'])
+
+    def get_equipos(self, titular):
+        return Equipo.objects.filter(
+            Q(jugador1=titular) | Q(jugador2=titular)
+        ).values_list('pk', flat=True)
+
+    def get_titulo(self, titular):
+        return titular.full_name
+
+
 # --- Vistas de Admin ---
 
 
-class AdminEquipoListView(AdminRequiredMixin, ListView):
+class AdminEquipoListView(AdminRequiredMixin, KeysetPaginationMixin, ListView):
     model = Equipo
     template_name = 'equipos/admin_equipo_list.html'
     context_object_name = 'equipos'
     paginate_by = 20
+    orden_keyset = ('nombre', 'id')
 
     def get_queryset(self):
         queryset = Equipo.objects.all().select_related(
@@ -214,7 +315,7 @@ class AdminEquipoListView(AdminRequiredMixin, ListView):
         if search_query:
             queryset = queryset.filter(nombre__icontains=search_query)
 
-        return queryset.order_by('nombre')
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -0,0 +1,10 @@
+"""
+Pruebas de carga con escenarios de un día de torneo (solo librería estándar).
+
+1. Sembrar la base:      python manage.py preparar_carga --equipos 200
+2. Levantar el servidor con la configuración a medir (WEB_CONCURRENCY, workers).
+3. Correr:               python -m loadtest http://127.0.0.1:8000 --inscripciones 200
+
+Ver loadtest/escenarios.py para lo que hace cada usuario virtual y
+loadtest/__main__.py para las opciones (líneas de base y comparación).
+"""
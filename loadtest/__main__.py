@@ -0,0 +1,92 @@
+"""
+Corre los escenarios en simultáneo contra un servidor local y reporta por endpoint.
+
+    python manage.py preparar_carga --equipos 200
+    gunicorn padel_project.asgi:application -w 4 -k uvicorn_worker.UvicornWorker
+    python -m loadtest http://127.0.0.1:8000 --duracion 60 \\
+        --inscripciones 200 --espectadores 300 --admins 3 --tipeo 20 \\
+        --guardar loadtest/baselines/w4.json --comparar loadtest/baselines/w2.json
+
+Las líneas de base se versionan en loadtest/baselines/ para comparar entre
+releases. Sale con código 1 si hay regresiones respecto de --comparar.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .escenarios import ESCENARIOS, Contexto
+from .metricas import Metricas, comparar, guardar_base, imprimir
+
+
+def parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description=__doc__.split('\n')[1])
+    parser.add_argument('url', help='Base del servidor, Ej: http://127.0.0.1:8000')
+    parser.add_argument('--plan', default='loadtest/plan.json', help='Plan generado por preparar_carga')
+    parser.add_argument('--duracion', type=float, default=60, help='Segundos de prueba')
+    parser.add_argument('--inscripciones', type=int, default=0, help='Jugadores del pico de inscripción')
+    parser.add_argument('--espectadores', type=int, default=100, help='Espectadores refrescando el detalle')
+    parser.add_argument('--admins', type=int, default=2, help='Admins cargando resultados')
+    parser.add_argument('--tipeo', type=int, default=10, help='Jugadores usando el autocompletado')
+    parser.add_argument('--pausa', type=float, default=1.0,
+                        help='Factor de los tiempos de espera (0 = carga máxima, sin pausas)')
+    parser.add_argument('--guardar', help='Guardar el resultado como línea de base JSON')
+    parser.add_argument('--comparar', help='Línea de base JSON contra la cual comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Aumento de p95 aceptado antes de marcar regresión (0.2 = 20%%)')
+    return parser.parse_args(argv)
+
+
+async def correr(args, plan):
+    metricas = Metricas()
+    loop = asyncio.get_running_loop()
+    ctx = Contexto(args.url.rstrip('/'), plan, metricas, loop.time() + args.duracion, args.pausa)
+    usuarios = {
+        'inscripcion': args.inscripciones,
+        'espectador': args.espectadores,
+        'admin': args.admins,
+        'tipeo': args.tipeo,
+    }
+    tareas = [
+        ESCENARIOS[nombre](ctx, indice)
+        for nombre, cantidad in usuarios.items()
+        for indice in range(cantidad)
+    ]
+    await asyncio.gather(*tareas)
+    return metricas
+
+
+def main(argv=None):
+    args = parsear_argumentos(argv)
+    with open(args.plan, encoding='utf-8') as archivo:
+        plan = json.load(archivo)
+
+    print(
+        f"{args.url} durante {args.duracion:.0f}s: {args.inscripciones} inscripciones, "
+        f"{args.espectadores} espectadores, {args.admins} admins, {args.tipeo} tipeando"
+    )
+    inicio = time.perf_counter()
+    metricas = asyncio.run(correr(args, plan))
+    duracion = time.perf_counter() - inicio
+
+    endpoints = metricas.resumen(duracion)
+    if not endpoints:
+        print("No se hizo ningún pedido.")
+        return 1
+    imprimir(endpoints)
+
+    if args.guardar:
+        parametros = {k: v for k, v in vars(args).items() if k not in ('guardar', 'comparar', 'plan')}
+        guardar_base(args.guardar, endpoints, parametros)
+        print(f"\nLínea de base guardada en {args.guardar}")
+    if args.comparar:
+        regresiones = comparar(args.comparar, endpoints, args.tolerancia)
+        if regresiones:
+            print(f"\n{len(regresiones)} endpoint(s) con regresión.")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
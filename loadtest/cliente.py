@@ -0,0 +1,122 @@
+"""
+Cliente HTTP/1.1 asíncrono mínimo (solo librería estándar) con keep-alive y
+cookies, suficiente para navegar la app como un usuario: login con CSRF,
+formularios, HTMX y GET condicionales. No sigue redirecciones.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from urllib.parse import urlencode, urlsplit
+
+
+@dataclass
+class Respuesta:
+    status: int
+    headers: dict
+    cuerpo: bytes
+    latencia: float
+
+
+class Sesion:
+    """Un navegador: una conexión persistente y su jar de cookies."""
+
+    def __init__(self, base_url, timeout=30):
+        partes = urlsplit(base_url)
+        self.host = partes.hostname
+        self.puerto = partes.port or 80
+        self.host_header = partes.netloc
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = self._writer = None
+
+    async def cerrar(self):
+        if self._writer:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, ruta, headers=None):
+        return await self.pedir('GET', ruta, headers=headers)
+
+    async def post(self, ruta, datos, headers=None):
+        """POST de formulario; agrega el token CSRF de la cookie."""
+        datos = {'csrfmiddlewaretoken': self.cookies.get('csrftoken', ''), **datos}
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': self.cookies.get('csrftoken', ''),
+            **(headers or {}),
+        }
+        return await self.pedir('POST', ruta, cuerpo=urlencode(datos).encode(), headers=headers)
+
+    async def pedir(self, metodo, ruta, cuerpo=b'', headers=None):
+        inicio = time.perf_counter()
+        for intento in (1, 2):
+            try:
+                if self._writer is None:
+                    self._reader, self._writer = await asyncio.open_connection(self.host, self.puerto)
+                self._writer.write(self._armar(metodo, ruta, cuerpo, headers or {}))
+                await self._writer.drain()
+                status, encabezados, contenido = await asyncio.wait_for(
+                    self._leer(), self.timeout
+                )
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Conexión keep-alive cerrada por el servidor: se reintenta una vez
+                await self.cerrar()
+                if intento == 2:
+                    raise
+        if encabezados.get('connection') == 'close':
+            await self.cerrar()
+        return Respuesta(status, encabezados, contenido, time.perf_counter() - inicio)
+
+    def _armar(self, metodo, ruta, cuerpo, headers):
+        lineas = [f"{metodo} {ruta} HTTP/1.1", f"Host: {self.host_header}", "Connection: keep-alive"]
+        if self.cookies:
+            lineas.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if cuerpo:
+            lineas.append(f"Content-Length: {len(cuerpo)}")
+        lineas += [f"{nombre}: {valor}" for nombre, valor in headers.items()]
+        return ("\r\n".join(lineas) + "\r\n\r\n").encode('latin-1') + cuerpo
+
+    async def _leer(self):
+        linea_estado = await self._reader.readline()
+        if not linea_estado:
+            raise ConnectionError("Conexión cerrada por el servidor")
+        status = int(linea_estado.split()[1])
+        encabezados = {}
+        while True:
+            linea = await self._reader.readline()
+            if linea in (b'\r\n', b''):
+                break
+            nombre, _, valor = linea.decode('latin-1').partition(':')
+            nombre, valor = nombre.strip().lower(), valor.strip()
+            if nombre == 'set-cookie':
+                self._guardar_cookie(valor)
+            else:
+                encabezados[nombre] = valor
+
+        if 'chunked' in encabezados.get('transfer-encoding', '').lower():
+            partes = []
+            while True:
+                tamano = int((await self._reader.readline()).strip() or b'0', 16)
+                partes.append(await self._reader.readexactly(tamano + 2))
+                if tamano == 0:
+                    break
+            contenido = b''.join(p[:-2] for p in partes)
+        elif 'content-length' in encabezados:
+            contenido = await self._reader.readexactly(int(encabezados['content-length']))
+        elif status in (204, 304) or status < 200:
+            contenido = b''
+        else:
+            # Sin largo ni chunked: el cuerpo termina al cerrar la conexión
+            contenido = await self._reader.read()
+            encabezados['connection'] = 'close'
+        return status, encabezados, contenido
+
+    def _guardar_cookie(self, valor):
+        par, _, atributos = valor.partition(';')
+        nombre, _, contenido = par.strip().partition('=')
+        borrar = not contenido or 'max-age=0' in atributos.lower().replace(' ', '')
+        if borrar:
+            self.cookies.pop(nombre, None)
+        else:
+            self.cookies[nombre] = contenido
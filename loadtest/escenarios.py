@@ -0,0 +1,150 @@
+"""
+Escenarios de un día de torneo. Cada función es un usuario virtual: recibe el
+Contexto compartido y su índice, y navega hasta que se cumple la duración.
+
+- inscripcion: pico de apertura. Todos arrancan a la vez, inician sesión y se
+  inscriben una sola vez en el torneo abierto (torneos:inscribirse).
+- espectador: anónimo que refresca torneos:detail cada pocos segundos con
+  If-None-Match (como un navegador con la página abierta).
+- admin: carga resultados de grupo (cargar_resultado_grupo) y de bracket
+  (admin_partido_resultado) por HTMX, con tiempo de tipeo entre GET y POST.
+- tipeo: jugador sin equipo escribiendo en el autocompletado de compañero,
+  una petición por tecla.
+"""
+import asyncio
+import random
+from dataclasses import dataclass
+from urllib.parse import quote
+
+from .cliente import Sesion
+from .metricas import Metricas
+
+HTMX = {'HX-Request': 'true'}
+
+
+@dataclass
+class Contexto:
+    base_url: str
+    plan: dict
+    metricas: Metricas
+    fin: float
+    # Multiplica los tiempos de espera de los usuarios (0 = sin pausas)
+    pausa: float = 1.0
+
+    def activo(self):
+        return asyncio.get_running_loop().time() < self.fin
+
+    async def esperar(self, minimo, maximo):
+        if self.pausa:
+            await asyncio.sleep(random.uniform(minimo, maximo) * self.pausa)
+
+
+async def pedir(ctx, sesion, endpoint, metodo, ruta, esperados, datos=None, headers=None):
+    """Hace la petición y la registra; cualquier status fuera de `esperados` es error."""
+    try:
+        if metodo == 'POST':
+            respuesta = await sesion.post(ruta, datos or {}, headers=headers)
+        else:
+            respuesta = await sesion.get(ruta, headers=headers)
+    except (OSError, asyncio.TimeoutError, ValueError):
+        await sesion.cerrar()
+        ctx.metricas.registrar(endpoint, 0, sesion.timeout, ok=False)
+        return None
+    ctx.metricas.registrar(endpoint, respuesta.status, respuesta.latencia, respuesta.status in esperados)
+    return respuesta
+
+
+async def iniciar_sesion(ctx, sesion, email):
+    login = ctx.plan['urls']['login']
+    await pedir(ctx, sesion, 'accounts:login GET', 'GET', login, {200})
+    respuesta = await pedir(
+        ctx, sesion, 'accounts:login POST', 'POST', login, {302},
+        datos={'username': email, 'password': ctx.plan['password']},
+    )
+    return respuesta is not None and respuesta.status == 302
+
+
+async def inscripcion(ctx, indice):
+    jugadores = ctx.plan['jugadores']
+    if indice >= len(jugadores):
+        return
+    sesion = Sesion(ctx.base_url)
+    try:
+        if not await iniciar_sesion(ctx, sesion, jugadores[indice]):
+            return
+        ruta = ctx.plan['urls']['inscribirse']
+        await pedir(ctx, sesion, 'torneos:inscribirse GET', 'GET', ruta, {200, 302})
+        await pedir(ctx, sesion, 'torneos:inscribirse POST', 'POST', ruta, {302})
+    finally:
+        await sesion.cerrar()
+
+
+async def espectador(ctx, indice):
+    sesion = Sesion(ctx.base_url)
+    detalles = ctx.plan['urls']['detalle']
+    ruta = detalles[indice % len(detalles)]
+    etag = None
+    await ctx.esperar(0, 5)  # no todos abren la página en el mismo segundo
+    try:
+        while ctx.activo():
+            headers = {'If-None-Match': etag} if etag else None
+            respuesta = await pedir(ctx, sesion, 'torneos:detail', 'GET', ruta, {200, 304}, headers=headers)
+            if respuesta is not None and respuesta.status == 200:
+                etag = respuesta.headers.get('etag')
+            await ctx.esperar(3, 7)
+    finally:
+        await sesion.cerrar()
+
+
+async def admin(ctx, indice):
+    sesion = Sesion(ctx.base_url)
+    urls = ctx.plan['urls']
+    try:
+        if not await iniciar_sesion(ctx, sesion, ctx.plan['admin']):
+            return
+        while ctx.activo():
+            if urls['resultado_grupo'] and (not urls['resultado_bracket'] or random.random() < 0.7):
+                endpoint, ruta = 'torneos:cargar_resultado_grupo', random.choice(urls['resultado_grupo'])
+                e1, e2 = random.choice([(6, 3), (3, 6), (6, 4)])
+                datos = {'e1_set1': e1, 'e2_set1': e2, 'e1_set2': e1, 'e2_set2': e2}
+            elif urls['resultado_bracket']:
+                endpoint, ruta = 'torneos:admin_partido_resultado', random.choice(urls['resultado_bracket'])
+                datos = {'set1_local': 6, 'set1_visitante': 3, 'set2_local': 6, 'set2_visitante': 4}
+            else:
+                return
+            await pedir(ctx, sesion, f'{endpoint} GET', 'GET', ruta, {200}, headers=HTMX)
+            await ctx.esperar(2, 5)
+            await pedir(ctx, sesion, f'{endpoint} POST', 'POST', ruta, {200}, datos=datos, headers=HTMX)
+            await ctx.esperar(1, 3)
+    finally:
+        await sesion.cerrar()
+
+
+async def tipeo(ctx, indice):
+    sueltos = ctx.plan['sueltos']
+    if not sueltos:
+        return
+    sesion = Sesion(ctx.base_url)
+    try:
+        if not await iniciar_sesion(ctx, sesion, sueltos[indice % len(sueltos)]):
+            return
+        ruta = ctx.plan['urls']['autocompletar']
+        while ctx.activo():
+            termino = random.choice(ctx.plan['busquedas'])
+            for largo in range(1, len(termino) + 1):
+                await pedir(
+                    ctx, sesion, 'equipos:jugador_autocomplete', 'GET',
+                    f"{ruta}?q={quote(termino[:largo])}", {200},
+                )
+                await ctx.esperar(0.1, 0.3)
+            await ctx.esperar(2, 4)
+    finally:
+        await sesion.cerrar()
+
+
+ESCENARIOS = {
+    'inscripcion': inscripcion,
+    'espectador': espectador,
+    'admin': admin,
+    'tipeo': tipeo,
+}
@@ -0,0 +1,93 @@
+"""
+Métricas por endpoint (throughput, p50/p95/p99, tasa de error) y líneas de
+base en JSON para comparar entre versiones.
+"""
+import json
+import platform
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+class Metricas:
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def registrar(self, endpoint, status, latencia, ok):
+        self.latencias[endpoint].append(latencia)
+        self.statuses[endpoint][str(status)] += 1
+        if not ok:
+            self.errores[endpoint] += 1
+
+    def resumen(self, duracion):
+        endpoints = {}
+        for endpoint in sorted(self.latencias):
+            latencias = self.latencias[endpoint]
+            total = len(latencias)
+            endpoints[endpoint] = {
+                'pedidos': total,
+                'por_segundo': round(total / duracion, 2),
+                'tasa_error': round(self.errores[endpoint] / total, 4),
+                'p50_ms': round(percentil(latencias, 50) * 1000, 1),
+                'p95_ms': round(percentil(latencias, 95) * 1000, 1),
+                'p99_ms': round(percentil(latencias, 99) * 1000, 1),
+                'statuses': dict(self.statuses[endpoint]),
+            }
+        return endpoints
+
+
+def imprimir(endpoints, salida=print):
+    salida(f"{'endpoint':<40}{'pedidos':>8}{'req/s':>8}{'error':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for nombre, datos in endpoints.items():
+        salida(
+            f"{nombre:<40}{datos['pedidos']:>8}{datos['por_segundo']:>8}"
+            f"{datos['tasa_error']:>8.1%}{datos['p50_ms']:>10.1f}"
+            f"{datos['p95_ms']:>10.1f}{datos['p99_ms']:>10.1f}"
+        )
+
+
+def guardar_base(ruta, endpoints, parametros):
+    contenido = {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parametros': parametros,
+        'endpoints': endpoints,
+    }
+    Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(contenido, archivo, indent=2, ensure_ascii=False)
+
+
+def comparar(ruta_base, endpoints, tolerancia, salida=print):
+    """
+    Compara contra una línea de base guardada. Devuelve la lista de regresiones:
+    p95 más de `tolerancia` (fracción) por encima, o más errores que antes.
+    """
+    with open(ruta_base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    salida(f"\nComparación con {ruta_base} ({base['fecha']}):")
+    regresiones = []
+    for nombre, actual in endpoints.items():
+        anterior = base['endpoints'].get(nombre)
+        if anterior is None:
+            salida(f"  {nombre:<40} (nuevo)")
+            continue
+        cambio_p95 = (actual['p95_ms'] - anterior['p95_ms']) / max(anterior['p95_ms'], 0.1)
+        cambio_rps = (actual['por_segundo'] - anterior['por_segundo']) / max(anterior['por_segundo'], 0.01)
+        marca = ''
+        if cambio_p95 > tolerancia or actual['tasa_error'] > anterior['tasa_error'] + 0.001:
+            marca = '  <-- REGRESIÓN'
+            regresiones.append(nombre)
+        salida(
+            f"  {nombre:<40} p95 {anterior['p95_ms']:.1f} -> {actual['p95_ms']:.1f}ms ({cambio_p95:+.0%})"
+            f"  req/s {cambio_rps:+.0%}  error {anterior['tasa_error']:.2%} -> {actual['tasa_error']:.2%}{marca}"
+        )
+    return regresiones
@@ -6,6 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
+    # Los tests corren con sus propios ajustes (hasher rápido, etc.)
+    if sys.argv[1:2] == ['test']:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padel_project.settings_test')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'padel_project.settings')
     try:
         from django.core.management import execute_from_command_line
@@ -66,6 +66,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Comentario sqlcommenter (ruta, vista) en cada consulta; primero para cubrir todo
+    'core.sqlcomentarios.ComentariosSQLMiddleware',
+    # Réplica de lectura para las vistas públicas (ver core/replicas.py)
+    'core.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Whitenoise
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -74,6 +78,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Perfilador a pedido (?_perfilar=1, solo admins); sin el parámetro no hace nada
+    'core.perfilador.PerfiladorMiddleware',
 ]
 
 ROOT_URLCONF = 'padel_project.urls'
@@ -101,7 +107,30 @@ WSGI_APPLICATION = 'padel_project.wsgi.application'
 # Usa PostgreSQL en producción (Render) y SQLite localmente
 
 if 'DATABASE_URL' in os.environ:
-    DATABASES = {'default': dj_database_url.config(conn_max_age=600, ssl_require=True)}
+    # Pool nativo de psycopg 3 (Django 5.1+): cada proceso (worker de gunicorn)
+    # mantiene DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE conexiones abiertas y las presta
+    # por request, sin pagar el handshake TCP+TLS+auth en cada una.
+    # Total en el servidor = WEB_CONCURRENCY * DB_POOL_MAX_SIZE (+ worker de tareas).
+    DB_POOL = os.environ.get('DB_POOL', 'True') == 'True'
+    DATABASES = {
+        'default': dj_database_url.config(
+            # Con pool, Django exige CONN_MAX_AGE=0: la conexión vuelve al pool al cerrar
+            conn_max_age=0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            # Descarta conexiones muertas (Ej: reinicio de la base) antes de usarlas.
+            # Con pool, Django lo traduce a ConnectionPool.check_connection.
+            conn_health_checks=True,
+            ssl_require=True,
+        )
+    }
+    if DB_POOL:
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+            # Segundos de espera por una conexión libre antes de fallar
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            # Se recicla cada conexión pasado este tiempo (evita cortes del proxy)
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+        }
 else:
     # --- ¡ERROR CORREGIDO AQUÍ! ---
     DATABASES = {
@@ -111,6 +140,58 @@ else:
         }
     }
 
+# Réplica de lectura opcional para las vistas públicas (ver core/replicas.py).
+# Para probarla en local con SQLite: `cp db.sqlite3 replica.sqlite3` y
+# REPLICA_DATABASE_URL=sqlite:///replica.sqlite3 (la copia hace de réplica atrasada).
+if 'REPLICA_DATABASE_URL' in os.environ:
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ['REPLICA_DATABASE_URL'],
+        conn_max_age=DATABASES['default'].get('CONN_MAX_AGE', 0),
+        conn_health_checks=True,
+        ssl_require='DATABASE_URL' in os.environ,
+    )
+    pool = DATABASES['default'].get('OPTIONS', {}).get('pool')
+    if pool:
+        DATABASES['replica'].setdefault('OPTIONS', {})['pool'] = pool
+    # En los tests la réplica es la misma base que default
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.replicas.RouterReplica']
+# Después de escribir, ese navegador lee de la primaria durante estos segundos
+REPLICA_FIJAR_SEGUNDOS = int(os.environ.get('REPLICA_FIJAR_SEGUNDOS', 10))
+
+
+# --- Caché ---
+# Caché en disco: la comparten los workers de gunicorn de la misma instancia
+# (LocMemCache sería una por proceso), pero no el worker de tareas ni otras
+# instancias. Por eso nada depende de invalidarla desde otro proceso: las
+# claves llevan la versión de lo que guardan (Ej: core.portada, torneos.bracket).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', '/tmp/padel_cache'),
+        'TIMEOUT': 300,
+    }
+}
+
+
+# --- Sesiones y mensajes ---
+# Sesiones leídas desde la caché (la tabla django_session solo se toca al
+# escribir, Ej: login) y mensajes flash en una cookie firmada, así mostrar un
+# messages.success() no reescribe la sesión en la base.
+# Las sesiones vencidas se purgan con `manage.py clearsessions` (cron en render.yaml).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
+# --- Autenticación ---
+# El primero carga usuario + división + equipo en una sola consulta por request.
+# ModelBackend queda para las sesiones iniciadas antes del cambio.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.BackendUsuarioConEquipo',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -147,6 +228,12 @@ STATIC_URL = '/static/'
 # Directorio donde `collectstatic` pondrá los archivos para producción
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Páginas y JSON de torneos finalizados ya renderizados (ver torneos/congelado.py)
+CONGELADOS_ROOT = Path(os.environ.get('CONGELADOS_ROOT', BASE_DIR / 'congelados'))
+
+# Fuente TrueType de las imágenes para compartir (ver torneos/compartir.py)
+FUENTE_COMPARTIR = os.environ.get('FUENTE_COMPARTIR', 'DejaVuSans.ttf')
+
 # Configuración de Whitenoise
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -170,3 +257,13 @@ INTERNAL_IPS = [
 ]
 CRISPY_ALLOWED_TEMPLATE_PACKS = "tailwind"
 CRISPY_TEMPLATE_PACK = "tailwind"
+
+# Cola de tareas (core.tareas): en producción las ejecuta el worker
+# `manage.py procesar_tareas`. Sin worker, TAREAS_EN_HILO=True las procesa
+# en un hilo del propio proceso web (útil en desarrollo).
+TAREAS_EN_HILO = os.environ.get('TAREAS_EN_HILO', str(DEBUG)) == 'True'
+
+# Perfilador a pedido (core/perfilador.py): intervalo de muestreo en segundos
+# y cantidad de perfiles que se conservan
+PERFILADOR_INTERVALO = float(os.environ.get('PERFILADOR_INTERVALO', '0.001'))
+PERFILADOR_MAXIMO = int(os.environ.get('PERFILADOR_MAXIMO', '50'))
@@ -0,0 +1,13 @@
+"""
+Ajustes de `manage.py test` (manage.py los elige solo para ese comando; a
+mano: --settings=padel_project.settings_test).
+"""
+from .settings import *  # noqa: F401,F403
+
+# El hash de contraseñas no aporta nada en tests: un hasher rápido en lugar de
+# PBKDF2 (600k iteraciones por usuario creado).
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Réplica que espeja a `default` (la misma base de tests): así las vistas
+# envueltas con en_replica corren con el ruteo real de core.replicas.
+DATABASES.setdefault('replica', {**DATABASES['default']})['TEST'] = {'MIRROR': 'default'}
@@ -0,0 +1,124 @@
+"""
+Benchmark de concurrencia para comparar el despliegue WSGI (sync) contra ASGI.
+
+Abre N clientes concurrentes (keep-alive) contra las vistas públicas de lectura
+y reporta throughput y latencias p50/p95/p99. Solo usa la librería estándar.
+
+1. Levantar el servidor en el modo a medir (mismo WEB_CONCURRENCY en ambos):
+     gunicorn padel_project.wsgi:application -w 4                                   # sync
+     gunicorn padel_project.asgi:application -w 4 -k uvicorn_worker.UvicornWorker  # ASGI
+2. Correr el benchmark:
+     python scripts/bench_concurrencia.py http://127.0.0.1:8000 --clientes 500 --duracion 30 \
+         --ruta / --ruta /torneos/1/
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def leer_respuesta(reader):
+    """Lee una respuesta HTTP/1.1 completa y devuelve (status, cerrar_conexion)."""
+    linea_estado = await reader.readline()
+    if not linea_estado:
+        raise ConnectionError("Conexión cerrada por el servidor")
+    status = int(linea_estado.split()[1])
+    largo, chunked, cerrar = 0, False, False
+    while True:
+        linea = await reader.readline()
+        if linea in (b'\r\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        nombre, valor = nombre.strip().lower(), valor.strip().lower()
+        if nombre == 'content-length':
+            largo = int(valor)
+        elif nombre == 'transfer-encoding' and 'chunked' in valor:
+            chunked = True
+        elif nombre == 'connection' and valor == 'close':
+            cerrar = True
+    if chunked:
+        while True:
+            tamano = int((await reader.readline()).strip() or b'0', 16)
+            await reader.readexactly(tamano + 2)
+            if tamano == 0:
+                break
+    elif largo:
+        await reader.readexactly(largo)
+    return status, cerrar
+
+
+async def cliente(host, puerto, rutas, fin, resultados, inicio_offset):
+    reader = writer = None
+    i = inicio_offset
+    while time.monotonic() < fin:
+        ruta = rutas[i % len(rutas)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, puerto)
+            writer.write(
+                f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status, cerrar = await leer_respuesta(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            resultados['errores'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+        resultados['latencias'].append((time.perf_counter() - inicio) * 1000)
+        if status >= 400:
+            resultados['errores'] += 1
+        if cerrar:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def correr(url, rutas, clientes, duracion):
+    partes = urlsplit(url)
+    host, puerto = partes.hostname, partes.port or 80
+    resultados = {'latencias': [], 'errores': 0}
+    inicio = time.monotonic()
+    fin = inicio + duracion
+    await asyncio.gather(*(
+        cliente(host, puerto, rutas, fin, resultados, n) for n in range(clientes)
+    ))
+    return resultados, time.monotonic() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url', help='Base del servidor, Ej: http://127.0.0.1:8000')
+    parser.add_argument('--ruta', action='append', dest='rutas', help='Ruta a pedir (repetible)')
+    parser.add_argument('--clientes', type=int, default=500)
+    parser.add_argument('--duracion', type=float, default=30.0, help='Segundos')
+    args = parser.parse_args()
+
+    rutas = args.rutas or ['/']
+    resultados, transcurrido = asyncio.run(correr(args.url, rutas, args.clientes, args.duracion))
+    latencias = resultados['latencias']
+    if not latencias:
+        print(f"Sin respuestas ({resultados['errores']} errores).")
+        return
+
+    print(f"{args.clientes} clientes, {transcurrido:.1f}s, rutas: {', '.join(rutas)}")
+    print(f"  requests: {len(latencias)} | errores: {resultados['errores']} "
+          f"| throughput: {len(latencias) / transcurrido:.1f} req/s")
+    print(f"  media {statistics.fmean(latencias):.1f} ms | p50 {percentil(latencias, 50):.1f} ms"
+          f" | p95 {percentil(latencias, 95):.1f} ms | p99 {percentil(latencias, 99):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,55 @@
+from django import forms
 from django.contrib import admin
+from django.db.models import Max, OuterRef, Subquery
+
+from core.paginacion import PaginadorConteoEstimado
 from .models import Torneo, Inscripcion, Partido, Grupo, PartidoGrupo, EquipoGrupo
 
+
+# --- FILTROS ---
+
+
+class FiltroTorneo(admin.RelatedFieldListFilter):
+    """Filtro por torneo que carga la división en la misma query (Torneo.__str__ la usa)."""
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin) or ('-fecha_inicio',)
+        return [
+            (torneo.pk, str(torneo))
+            for torneo in Torneo.objects.select_related('division').order_by(*ordering)
+        ]
+
+
+class AdminTablaGrande(admin.ModelAdmin):
+    """Base para tablas que crecen con cada torneo: sin COUNT(*) completo por página."""
+
+    paginator = PaginadorConteoEstimado
+    show_full_result_count = False
+
 # --- INLINES ---
 
 
+class InscripcionInlineForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            # La fila ya muestra el equipo en su encabezado; el widget de autocompletado
+            # haría una query por fila para pintar la opción seleccionada.
+            self.fields['equipo'].widget = forms.HiddenInput()
+            self.fields['equipo'].disabled = True
+
+
 class InscripcionInline(admin.TabularInline):
     model = Inscripcion
+    form = InscripcionInlineForm
     extra = 0
     autocomplete_fields = ['equipo']  # Usamos autocomplete si hay muchos equipos
     readonly_fields = ('fecha_inscripcion',)
 
+    def get_queryset(self, request):
+        # `torneo` también: el encabezado de cada fila usa __str__
+        return super().get_queryset(request).select_related('equipo', 'torneo')
+
 
 class EquipoGrupoInline(admin.TabularInline):
     """Muestra la tabla de posiciones dentro del detalle del Grupo"""
@@ -29,17 +69,41 @@ class EquipoGrupoInline(admin.TabularInline):
     )
     can_delete = False
     ordering = ('-partidos_ganados',)
+    # La tabla se calcula con los resultados: el equipo no se edita desde aquí
+    fields = ('equipo', 'numero') + readonly_fields
+    readonly_fields = ('equipo',) + readonly_fields
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('equipo', 'grupo__torneo')
+
+
+class PartidoGrupoInlineForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            # La fila ya muestra el cruce en su encabezado; el widget raw_id haría
+            # una query por equipo para pintar su etiqueta.
+            for campo in ('equipo1', 'equipo2'):
+                self.fields[campo].widget = forms.HiddenInput()
+                self.fields[campo].disabled = True
 
 
 class PartidoGrupoInline(admin.TabularInline):
     """Muestra los partidos del grupo dentro del detalle del Grupo"""
 
     model = PartidoGrupo
+    form = PartidoGrupoInlineForm
     extra = 0
     fields = ('equipo1', 'equipo2', 'ganador', 'e1_sets_ganados', 'e2_sets_ganados')
     readonly_fields = ('ganador', 'e1_sets_ganados', 'e2_sets_ganados')
+    raw_id_fields = ('equipo1', 'equipo2')
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'grupo__torneo', 'equipo1', 'equipo2', 'ganador'
+        )
+
 
 # --- ADMINS PRINCIPALES ---
 
@@ -55,7 +119,9 @@ class TorneoAdmin(admin.ModelAdmin):
         'cupos_totales',
     )
     list_filter = ('estado', 'tipo_torneo', 'division')
+    list_select_related = ('division',)
     search_fields = ('nombre',)
+    autocomplete_fields = ('ganador_del_torneo',)
     inlines = [InscripcionInline]
 
     # Configuración de campos para el formulario
@@ -80,9 +146,12 @@ class TorneoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Grupo)
-class GrupoAdmin(admin.ModelAdmin):
+class GrupoAdmin(AdminTablaGrande):
     list_display = ('nombre', 'torneo')
-    list_filter = ('torneo',)
+    list_filter = (('torneo', FiltroTorneo),)
+    list_select_related = ('torneo__division',)
+    search_fields = ('nombre', 'torneo__nombre')
+    autocomplete_fields = ('torneo',)
     inlines = [
         EquipoGrupoInline,
         PartidoGrupoInline,
@@ -90,12 +159,13 @@ class GrupoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Partido)
-class PartidoAdmin(admin.ModelAdmin):
+class PartidoAdmin(AdminTablaGrande):
     """Admin para partidos de eliminación (Bracket)"""
 
     # Actualizado con los campos NUEVOS (equipo1, equipo2, ronda, etc.)
-    list_display = ('__str__', 'torneo', 'ronda', 'ganador', 'resultado')
-    list_filter = ('torneo', 'ronda')
+    list_display = ('enfrentamiento', 'torneo', 'ronda', 'ganador', 'resultado')
+    list_filter = (('torneo', FiltroTorneo), 'ronda')
+    list_select_related = ('torneo__division', 'equipo1', 'equipo2', 'ganador')
     search_fields = ('equipo1__nombre', 'equipo2__nombre')
 
     # Usamos raw_id_fields para evitar cargar todos los equipos en el select
@@ -111,14 +181,32 @@ class PartidoAdmin(admin.ModelAdmin):
         ('Resultado', {'fields': ('ganador', 'resultado')}),
     )
 
+    def get_queryset(self, request):
+        # Se anota la ronda máxima del torneo para que nombre_ronda no haga
+        # un aggregate por fila.
+        max_ronda = (
+            Partido.objects.filter(torneo=OuterRef('torneo'))
+            .values('torneo')
+            .annotate(maximo=Max('ronda'))
+            .values('maximo')
+        )
+        return super().get_queryset(request).annotate(max_ronda_torneo=Subquery(max_ronda))
+
+    @admin.display(description='Partido')
+    def enfrentamiento(self, obj):
+        return str(obj)
+
 
 @admin.register(PartidoGrupo)
-class PartidoGrupoAdmin(admin.ModelAdmin):
+class PartidoGrupoAdmin(AdminTablaGrande):
     """Admin para partidos de fase de grupos"""
 
     list_display = ('__str__', 'grupo', 'ganador')
-    list_filter = ('grupo__torneo', 'grupo')
-    search_fields = ('equipo1__nombre', 'equipo2__nombre')
+    # Sin filtro por grupo: serían miles de opciones. Se filtra por torneo y se busca.
+    list_filter = (('grupo__torneo', FiltroTorneo),)
+    list_select_related = ('grupo__torneo', 'equipo1', 'equipo2', 'ganador')
+    search_fields = ('equipo1__nombre', 'equipo2__nombre', 'grupo__nombre')
+    autocomplete_fields = ('grupo', 'equipo1', 'equipo2', 'ganador')
     # Campos detallados de sets
     fieldsets = (
         ('Grupo', {'fields': ('grupo',)}),
@@ -137,6 +225,18 @@ class PartidoGrupoAdmin(admin.ModelAdmin):
     )
 
 
-# Registramos modelos simples
-admin.site.register(Inscripcion)
-admin.site.register(EquipoGrupo)  # Opcional, ya se ve dentro de Grupo
+@admin.register(Inscripcion)
+class InscripcionAdmin(AdminTablaGrande):
+    list_display = ('__str__', 'fecha_inscripcion')
+    list_select_related = ('equipo', 'torneo')
+    list_filter = (('torneo', FiltroTorneo),)
+    search_fields = ('equipo__nombre', 'torneo__nombre')
+    autocomplete_fields = ('equipo', 'torneo')
+
+
+@admin.register(EquipoGrupo)  # Opcional, ya se ve dentro de Grupo
+class EquipoGrupoAdmin(AdminTablaGrande):
+    list_display = ('__str__', 'numero', 'partidos_ganados')
+    list_select_related = ('equipo', 'grupo__torneo')
+    search_fields = ('equipo__nombre', 'grupo__nombre')
+    autocomplete_fields = ('grupo', 'equipo')
@@ -0,0 +1,196 @@
+"""
+Estructura del cuadro de eliminación lista para dibujar.
+
+Los templates del detalle y de la gestión solo recorren `Bracket.rondas`: el
+nombre de cada ronda, los dos lugares de cada partido con el código del
+equipo (Ej: "A1") y si ganó, y la posición en la grilla (fila, alto y
+conector hacia el partido siguiente). Se arma con dos consultas (partidos con
+sus equipos y códigos de grupo) y se guarda en caché por versión del torneo:
+cualquier cambio sube la versión (Torneo.registrar_cambio), así que no hace
+falta invalidar.
+
+Grilla: la primera ronda ocupa una fila por partido; en la ronda r cada
+partido ocupa 2**(r-1) filas, centrado entre los dos que lo alimentan. El
+conector sale del centro de la tarjeta y baja (partido impar) o sube (par)
+hasta el borde de su celda, que es donde se encuentra con su pareja.
+"""
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+from .models import EquipoGrupo, Partido
+
+# La clave lleva la versión del torneo; el TTL solo limpia versiones viejas
+TTL_CACHE = 60 * 60 * 24
+
+NOMBRES_CORTOS = {
+    'Cuartos de Final': 'Cuartos',
+    'Octavos de Final': 'Octavos',
+    '16vos de Final': '16vos',
+}
+
+
+@dataclass
+class Lugar:
+    """Uno de los dos equipos de un partido (vacío si todavía no se definió)."""
+    equipo_id: int | None = None
+    codigo: str = ''
+    nombre: str = ''
+    gano: bool = False
+
+    @property
+    def definido(self):
+        return self.equipo_id is not None
+
+
+@dataclass
+class PartidoCuadro:
+    id: int
+    orden: int
+    lugares: tuple
+    sets: list
+    resultado: str
+    ganador: Lugar | None
+    fila: int
+    alto: int
+    # 'abajo' / 'arriba' hacia el partido siguiente; None en la final
+    conector: str | None
+    # Tiene un partido previo que llega por la izquierda
+    entrada: bool
+
+    @property
+    def equipo1(self):
+        return self.lugares[0]
+
+    @property
+    def equipo2(self):
+        return self.lugares[1]
+
+    @property
+    def jugable(self):
+        return self.equipo1.definido and self.equipo2.definido
+
+
+@dataclass
+class Ronda:
+    numero: int
+    nombre: str
+    columna: int
+    partidos: list = field(default_factory=list)
+
+    @property
+    def nombre_corto(self):
+        return NOMBRES_CORTOS.get(self.nombre, self.nombre)
+
+    @property
+    def es_final(self):
+        return self.nombre == 'Final'
+
+
+@dataclass
+class Bracket:
+    rondas: list
+    filas: int
+
+    def __bool__(self):
+        return bool(self.rondas)
+
+
+def clave_cache(torneo):
+    return f'bracket:{torneo.pk}:v{torneo.version}'
+
+
+def _partidos(torneo):
+    return (
+        Partido.objects.filter(torneo_id=torneo.pk)
+        .select_related('equipo1', 'equipo2')
+        .only(
+            'id', 'ronda', 'orden_partido', 'ganador_id', 'resultado',
+            'equipo1__nombre', 'equipo2__nombre', 'siguiente_partido_id',
+            *(f'e{lado}_set{i}' for lado in (1, 2) for i in range(1, 4)),
+        )
+        .order_by('ronda', 'orden_partido')
+    )
+
+
+def _codigos(torneo):
+    return EquipoGrupo.objects.filter(grupo__torneo_id=torneo.pk).values_list(
+        'equipo_id', 'grupo__nombre', 'numero'
+    )
+
+
+def armar(partidos, codigos):
+    """Arma el Bracket a partir de los partidos (ordenados por ronda) y los códigos de grupo."""
+    codigo_de = {
+        equipo_id: EquipoGrupo.codigo(nombre_grupo, numero)
+        for equipo_id, nombre_grupo, numero in codigos
+    }
+    if not partidos:
+        return Bracket([], 0)
+
+    primera = partidos[0].ronda
+    ultima = partidos[-1].ronda
+    filas = sum(1 for p in partidos if p.ronda == primera)
+    rondas = {}
+
+    for partido in partidos:
+        ronda = rondas.get(partido.ronda)
+        if ronda is None:
+            ronda = rondas[partido.ronda] = Ronda(
+                numero=partido.ronda,
+                nombre=Partido.nombre_de_ronda(partido.ronda, ultima),
+                columna=partido.ronda - primera + 1,
+            )
+
+        lugares = []
+        for equipo in (partido.equipo1, partido.equipo2):
+            if equipo is None:
+                lugares.append(Lugar())
+            else:
+                lugares.append(Lugar(
+                    equipo_id=equipo.pk,
+                    codigo=codigo_de.get(equipo.pk) or equipo.nombre,
+                    nombre=equipo.nombre,
+                    gano=partido.ganador_id == equipo.pk,
+                ))
+        ganador = next((lugar for lugar in lugares if lugar.gano), None)
+
+        alto = 2 ** (partido.ronda - primera)
+        conector = None
+        if partido.siguiente_partido_id:
+            conector = 'abajo' if partido.orden_partido % 2 == 1 else 'arriba'
+        ronda.partidos.append(PartidoCuadro(
+            id=partido.pk,
+            orden=partido.orden_partido,
+            lugares=tuple(lugares),
+            sets=partido.sets,
+            resultado=partido.resultado or '',
+            ganador=ganador,
+            fila=(partido.orden_partido - 1) * alto + 1,
+            alto=alto,
+            conector=conector,
+            entrada=partido.ronda > primera,
+        ))
+
+    return Bracket(list(rondas.values()), filas)
+
+
+def bracket(torneo):
+    """Bracket del torneo, desde la caché si ya se armó para esta versión."""
+    clave = clave_cache(torneo)
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = armar(list(_partidos(torneo)), list(_codigos(torneo)))
+        cache.set(clave, resultado, TTL_CACHE)
+    return resultado
+
+
+async def abracket(torneo):
+    clave = clave_cache(torneo)
+    resultado = await cache.aget(clave)
+    if resultado is None:
+        resultado = armar(
+            [p async for p in _partidos(torneo)], [c async for c in _codigos(torneo)]
+        )
+        await cache.aset(clave, resultado, TTL_CACHE)
+    return resultado
@@ -0,0 +1,299 @@
+"""
+Imágenes PNG para compartir: resultado de un partido, tabla de un grupo y el
+cuadro completo.
+
+Se generan la primera vez que alguien las pide y quedan en disco con la
+versión del torneo en el nombre
+(CONGELADOS_ROOT/torneos/<pk>/compartir/<imagen>.v<version>.png). La URL
+también lleva la versión, así que el contenido de una URL nunca cambia: se
+sirve con Cache-Control immutable y, si el archivo ya existe, sin tocar la
+base ni Pillow. Un cambio en el torneo sube la versión y la página pasa a
+enlazar otra URL.
+"""
+import unicodedata
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.http import Http404
+from PIL import Image, ImageDraw, ImageFont
+
+from . import congelado
+from .bracket import bracket
+from .estadisticas import posiciones, victorias_entre
+from .models import EquipoGrupo, PartidoGrupo
+
+ANCHO = 1200
+MARGEN = 60
+
+FONDO = (29, 35, 42)
+TARJETA = (42, 50, 60)
+LINEA = (70, 80, 92)
+TEXTO = (230, 233, 238)
+TENUE = (150, 158, 170)
+EXITO = (54, 211, 153)
+PRIMARIO = (116, 128, 255)
+
+# Cuadro: columnas por ronda y filas de la primera ronda (ver bracket.py)
+ANCHO_COLUMNA = 300
+SEPARACION = 60
+ALTO_FILA = 110
+ALTO_TARJETA = 86
+
+
+@lru_cache(maxsize=None)
+def fuente(tamano):
+    try:
+        return ImageFont.truetype(settings.FUENTE_COMPARTIR, tamano)
+    except OSError:
+        # Sin la fuente configurada: la que trae Pillow (no tiene acentos, ver `legible`)
+        return ImageFont.load_default(size=tamano)
+
+
+@lru_cache(maxsize=1)
+def con_acentos():
+    try:
+        ImageFont.truetype(settings.FUENTE_COMPARTIR, 10)
+    except OSError:
+        return False
+    return True
+
+
+def legible(texto):
+    """Con la fuente de Pillow se sacan los acentos (Ej: "Simulación" -> "Simulacion")."""
+    if con_acentos():
+        return texto
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def directorio(torneo_id):
+    return congelado.directorio(torneo_id) / 'compartir'
+
+
+def nombre_imagen(tipo, objeto_pk=None):
+    return tipo if objeto_pk is None else f"{tipo}-{objeto_pk}"
+
+
+def ruta(torneo_id, version, tipo, objeto_pk=None):
+    return directorio(torneo_id) / f"{nombre_imagen(tipo, objeto_pk)}.v{version}.png"
+
+
+def guardar(torneo, tipo, objeto_pk, contenido):
+    """Escribe la imagen de la versión actual y borra la de versiones anteriores."""
+    nombre = nombre_imagen(tipo, objeto_pk)
+    return congelado.escribir(
+        ruta(torneo.pk, torneo.version, tipo, objeto_pk), contenido, f"{nombre}.v*.png"
+    )
+
+
+def generar(torneo, tipo, objeto_pk=None):
+    """PNG (bytes) de la imagen pedida; Http404 si el objeto no es de este torneo."""
+    generadores = {
+        'cuadro': imagen_cuadro,
+        'grupo': imagen_grupo,
+        'partido': imagen_partido,
+        'partido-grupo': imagen_partido_grupo,
+    }
+    if tipo not in generadores:
+        raise Http404("Imagen desconocida.")
+    argumentos = (torneo,) if objeto_pk is None else (torneo, objeto_pk)
+    imagen = generadores[tipo](*argumentos)
+    salida = BytesIO()
+    imagen.save(salida, 'PNG', optimize=True)
+    return salida.getvalue()
+
+
+# --- Dibujo ---
+
+
+def recortar(dibujo, texto, tamano, ancho):
+    """Corta `texto` con '…' para que no pase de `ancho` píxeles."""
+    texto = legible(texto)
+    if dibujo.textlength(texto, font=fuente(tamano)) <= ancho:
+        return texto
+    while texto and dibujo.textlength(texto + '…', font=fuente(tamano)) > ancho:
+        texto = texto[:-1]
+    return texto + '…'
+
+
+def lienzo(medidas, torneo, subtitulo):
+    """Imagen de `medidas` (ancho, alto) con el encabezado: torneo, división y `subtitulo`."""
+    imagen = Image.new('RGB', medidas, FONDO)
+    dibujo = ImageDraw.Draw(imagen)
+    ancho = imagen.width - 2 * MARGEN
+    dibujo.text((MARGEN, 40), recortar(dibujo, torneo.nombre, 48, ancho), font=fuente(48), fill=TEXTO)
+    dibujo.text(
+        (MARGEN, 100),
+        recortar(dibujo, f"{torneo.division.nombre} · {subtitulo}", 28, ancho),
+        font=fuente(28), fill=TENUE,
+    )
+    return imagen, dibujo
+
+
+def dibujar_equipos(dibujo, caja, lugares, sets, tamano=32):
+    """
+    Dos renglones (uno por equipo) dentro de `caja` (x, y, ancho, alto):
+    código, nombre y los games de cada set a la derecha. `lugares` son
+    tuplas (codigo, nombre, gano); `sets` la lista de "6-4".
+    """
+    x, y, ancho, alto = caja
+    dibujo.rounded_rectangle((x, y, x + ancho, y + alto), radius=12, fill=TARJETA)
+    renglon = alto / 2
+    ancho_set = tamano * 1.3
+    columna_sets = x + ancho - 16 - ancho_set * len(sets)
+    for i, (codigo, nombre, gano) in enumerate(lugares):
+        centro = y + renglon * i + renglon / 2
+        color = EXITO if gano else TEXTO
+        if gano:
+            dibujo.rectangle((x, y + renglon * i + 8, x + 5, y + renglon * (i + 1) - 8), fill=EXITO)
+        texto = f"{codigo}  {nombre}" if nombre and nombre != codigo else codigo or '…'
+        dibujo.text(
+            (x + 20, centro), recortar(dibujo, texto, tamano, columna_sets - x - 32),
+            font=fuente(tamano), fill=color, anchor='lm',
+        )
+        for j, marcador in enumerate(sets):
+            games = marcador.split('-')[i]
+            dibujo.text(
+                (columna_sets + ancho_set * j + ancho_set / 2, centro), games,
+                font=fuente(tamano), fill=color, anchor='mm',
+            )
+    dibujo.line((x + 12, y + renglon, x + ancho - 12, y + renglon), fill=LINEA, width=1)
+
+
+def tarjeta_partido(torneo, subtitulo, lugares, sets, resultado):
+    imagen, dibujo = lienzo((ANCHO, 630), torneo, subtitulo)
+    dibujar_equipos(dibujo, (MARGEN, 190, ANCHO - 2 * MARGEN, 300), lugares, sets, tamano=44)
+    if not sets:
+        dibujo.text(
+            (ANCHO / 2, 540), resultado or 'Pendiente', font=fuente(32), fill=TENUE, anchor='mm'
+        )
+    return imagen
+
+
+# --- Imágenes ---
+
+
+def imagen_partido(torneo, partido_pk):
+    """Resultado de un partido de la fase eliminatoria (sale del bracket en caché)."""
+    for ronda in bracket(torneo).rondas:
+        for partido in ronda.partidos:
+            if partido.id == partido_pk:
+                lugares = [
+                    (lugar.codigo, lugar.nombre, lugar.gano) if lugar.definido else ('', '', False)
+                    for lugar in partido.lugares
+                ]
+                return tarjeta_partido(
+                    torneo, ronda.nombre, lugares, partido.sets, partido.resultado
+                )
+    raise Http404("El partido no es de este torneo.")
+
+
+def imagen_partido_grupo(torneo, partido_pk):
+    partido = (
+        PartidoGrupo.objects.select_related('grupo', 'equipo1', 'equipo2')
+        .filter(pk=partido_pk, grupo__torneo_id=torneo.pk)
+        .first()
+    )
+    if partido is None:
+        raise Http404("El partido no es de este torneo.")
+    numeros = dict(
+        EquipoGrupo.objects.filter(
+            grupo_id=partido.grupo_id, equipo_id__in=[partido.equipo1_id, partido.equipo2_id]
+        ).values_list('equipo_id', 'numero')
+    )
+    lugares = [
+        (
+            EquipoGrupo.codigo(partido.grupo.nombre, numeros.get(equipo.pk)) or equipo.nombre,
+            equipo.nombre,
+            partido.ganador_id == equipo.pk,
+        )
+        for equipo in (partido.equipo1, partido.equipo2)
+    ]
+    return tarjeta_partido(torneo, partido.grupo.nombre, lugares, partido.sets, partido.resultado)
+
+
+def imagen_grupo(torneo, grupo_pk):
+    """Tabla de posiciones del grupo, con el mismo desempate que la página."""
+    grupo = torneo.grupos.filter(pk=grupo_pk).prefetch_related('tabla__equipo').first()
+    if grupo is None:
+        raise Http404("El grupo no es de este torneo.")
+    filas = posiciones(grupo.tabla.all(), victorias_entre(torneo.pk))
+
+    alto_fila = 64
+    arriba = 200
+    imagen, dibujo = lienzo(
+        (ANCHO, arriba + alto_fila * (len(filas) + 1) + MARGEN), torneo, grupo.nombre
+    )
+    columnas = ['PJ', 'PG', 'PP', 'DS', 'DG']
+    x_columnas = [ANCHO - MARGEN - 90 * (len(columnas) - i) + 45 for i in range(len(columnas))]
+
+    y = arriba + alto_fila / 2
+    dibujo.text((MARGEN + 20, y), 'Equipo', font=fuente(26), fill=TENUE, anchor='lm')
+    for x, titulo in zip(x_columnas, columnas):
+        dibujo.text((x, y), titulo, font=fuente(26), fill=TENUE, anchor='mm')
+
+    for posicion, fila in enumerate(filas, start=1):
+        top = arriba + alto_fila * posicion
+        dibujo.rounded_rectangle(
+            (MARGEN, top + 4, ANCHO - MARGEN, top + alto_fila - 4), radius=10, fill=TARJETA
+        )
+        # Los dos primeros pasan a la fase eliminatoria (como en la página)
+        color = EXITO if posicion <= 2 else TEXTO
+        y = top + alto_fila / 2
+        codigo = EquipoGrupo.codigo(grupo.nombre, fila.numero) or fila.equipo.nombre
+        texto = f"{posicion}.  {codigo}  {fila.equipo.nombre}"
+        dibujo.text(
+            (MARGEN + 20, y), recortar(dibujo, texto, 30, x_columnas[0] - MARGEN - 80),
+            font=fuente(30), fill=color, anchor='lm',
+        )
+        valores = [
+            fila.partidos_jugados, fila.partidos_ganados, fila.partidos_perdidos,
+            fila.diferencia_sets, fila.diferencia_games,
+        ]
+        for x, valor in zip(x_columnas, valores):
+            dibujo.text((x, y), str(valor), font=fuente(30), fill=color, anchor='mm')
+    return imagen
+
+
+def imagen_cuadro(torneo):
+    """El cuadro completo, con la misma grilla y conectores que la página."""
+    cuadro = bracket(torneo)
+    if not cuadro:
+        raise Http404("El torneo todavía no tiene fase eliminatoria.")
+
+    columnas = len(cuadro.rondas)
+    arriba = 220
+    ancho = 2 * MARGEN + columnas * ANCHO_COLUMNA + (columnas - 1) * SEPARACION
+    alto = arriba + cuadro.filas * ALTO_FILA + MARGEN
+    imagen, dibujo = lienzo((max(ancho, ANCHO), alto), torneo, 'Cuadro final')
+    medio = SEPARACION / 2
+
+    for ronda in cuadro.rondas:
+        x = MARGEN + (ronda.columna - 1) * (ANCHO_COLUMNA + SEPARACION)
+        dibujo.text(
+            (x + ANCHO_COLUMNA / 2, arriba - 30), ronda.nombre_corto.upper(),
+            font=fuente(22), fill=PRIMARIO, anchor='mm',
+        )
+        for partido in ronda.partidos:
+            celda = arriba + (partido.fila - 1) * ALTO_FILA
+            alto_celda = partido.alto * ALTO_FILA
+            centro = celda + alto_celda / 2
+            lugares = [
+                (lugar.codigo, '', lugar.gano) if lugar.definido else ('', '', False)
+                for lugar in partido.lugares
+            ]
+            dibujar_equipos(
+                dibujo, (x, centro - ALTO_TARJETA / 2, ANCHO_COLUMNA, ALTO_TARJETA),
+                lugares, partido.sets, tamano=24,
+            )
+            derecha = x + ANCHO_COLUMNA
+            if partido.entrada:
+                dibujo.line((x - medio, centro, x, centro), fill=LINEA, width=2)
+            if partido.conector:
+                borde = celda + alto_celda if partido.conector == 'abajo' else celda
+                dibujo.line(
+                    [(derecha, centro), (derecha + medio, centro), (derecha + medio, borde)],
+                    fill=LINEA, width=2,
+                )
+    return imagen
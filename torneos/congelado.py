@@ -0,0 +1,165 @@
+"""
+Congelado de torneos finalizados.
+
+Un torneo FINALIZADO ya no cambia: su página pública (versión anónima) y su
+JSON se escriben una vez a disco y después se sirven como archivo, sin armar
+el contexto (decenas de consultas) en cada visita.
+
+Los archivos llevan la versión del torneo en el nombre
+(CONGELADOS_ROOT/torneos/<pk>/v<version>.html), así cualquier corrección
+posterior (que sube la versión, ver Torneo.registrar_cambio) deja de servir el
+archivo viejo sin tener que borrarlo desde cada servidor.
+
+El disco es de cada instancia web (el worker de tareas tiene el suyo), así que
+cada una congela en su primera visita anónima (TorneoDetailView, torneo_json)
+o con `manage.py congelar_torneos`. Se congela un render propio, anónimo y sin
+mensajes flash, nunca la respuesta de la visita.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import RequestFactory
+from django.urls import reverse
+
+from .estadisticas import ordenar_grupos, victorias_entre
+from .models import Torneo
+
+
+def directorio(torneo_id):
+    return Path(settings.CONGELADOS_ROOT) / 'torneos' / str(torneo_id)
+
+
+def ruta(torneo_id, version, extension):
+    return directorio(torneo_id) / f"v{version}.{extension}"
+
+
+def escribir(destino, contenido, patron_viejos):
+    """
+    Escribe `destino` de forma atómica (otro proceso nunca lee un archivo a
+    medias) y borra los archivos de su carpeta que coinciden con `patron_viejos`.
+    """
+    carpeta = destino.parent
+    carpeta.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as archivo:
+        archivo.write(contenido if isinstance(contenido, bytes) else contenido.encode())
+    # mkstemp crea el archivo con permisos 0600
+    os.chmod(temporal, 0o644)
+    os.replace(temporal, destino)
+    for viejo in carpeta.glob(patron_viejos):
+        if viejo != destino:
+            viejo.unlink(missing_ok=True)
+    return destino
+
+
+def guardar(torneo_id, version, extension, contenido):
+    """Escribe el archivo de la versión y borra las versiones anteriores."""
+    return escribir(ruta(torneo_id, version, extension), contenido, f"v*.{extension}")
+
+
+def datos_torneo(torneo):
+    """Resumen JSON del torneo: grupos con su tabla y partidos, y el bracket."""
+    grupos = torneo.grupos.order_by('nombre').prefetch_related(
+        'tabla__equipo', 'partidos_grupo__equipo1', 'partidos_grupo__equipo2',
+        'partidos_grupo__ganador',
+    )
+    partidos = torneo.partidos.select_related('equipo1', 'equipo2', 'ganador')
+
+    def nombre(equipo):
+        return equipo.nombre if equipo else None
+
+    return {
+        'id': torneo.pk,
+        'nombre': torneo.nombre,
+        'division': torneo.division.nombre,
+        'estado': torneo.estado,
+        'tipo_torneo': torneo.tipo_torneo,
+        'fecha_inicio': torneo.fecha_inicio,
+        'version': torneo.version,
+        'ganador': nombre(torneo.ganador_del_torneo),
+        'grupos': [
+            {
+                'nombre': grupo.nombre,
+                'tabla': [
+                    {
+                        'equipo': fila.equipo.nombre,
+                        'partidos_jugados': fila.partidos_jugados,
+                        'partidos_ganados': fila.partidos_ganados,
+                        'partidos_perdidos': fila.partidos_perdidos,
+                        'diferencia_sets': fila.diferencia_sets,
+                        'diferencia_games': fila.diferencia_games,
+                    }
+                    for fila in grupo.posiciones
+                ],
+                'partidos': [
+                    {
+                        'equipo1': nombre(partido.equipo1),
+                        'equipo2': nombre(partido.equipo2),
+                        'resultado': partido.resultado,
+                        'ganador': nombre(partido.ganador),
+                    }
+                    for partido in grupo.partidos_grupo.all()
+                ],
+            }
+            for grupo in ordenar_grupos(list(grupos), victorias_entre(torneo.pk))
+        ],
+        'eliminacion': [
+            {
+                'ronda': partido.ronda,
+                'orden': partido.orden_partido,
+                'equipo1': nombre(partido.equipo1),
+                'equipo2': nombre(partido.equipo2),
+                'resultado': partido.resultado,
+                'ganador': nombre(partido.ganador),
+            }
+            for partido in partidos
+        ],
+    }
+
+
+def json_torneo(torneo):
+    return json.dumps(datos_torneo(torneo), cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+async def ahtml_torneo(torneo_id):
+    """Renderiza el detalle público tal como lo ve un visitante anónimo."""
+    from .views import TorneoDetailView
+
+    # Request propia: sin cookies, así no arrastra mensajes ni sesión de nadie
+    request = RequestFactory().get(reverse('torneos:detail', args=[torneo_id]))
+    request.user = AnonymousUser()
+
+    async def auser():
+        return request.user
+
+    request.auser = auser
+    vista = TorneoDetailView.as_view(servir_congelado=False)
+    respuesta = await vista(request, pk=torneo_id)
+    return (await sync_to_async(respuesta.render)()).content
+
+
+def html_torneo(torneo):
+    return async_to_sync(ahtml_torneo)(torneo.pk)
+
+
+async def acongelar_html(torneo_id, version):
+    """Congela la página de `version` del torneo y devuelve su ruta."""
+    contenido = await ahtml_torneo(torneo_id)
+    return await sync_to_async(guardar)(torneo_id, version, 'html', contenido)
+
+
+def congelar(torneo):
+    """Escribe HTML y JSON del torneo finalizado; devuelve las rutas o [] si no aplica."""
+    if torneo.estado != Torneo.Estado.FINALIZADO:
+        return []
+    return [
+        guardar(torneo.pk, torneo.version, 'html', html_torneo(torneo)),
+        guardar(torneo.pk, torneo.version, 'json', json_torneo(torneo)),
+    ]
+
@@ -0,0 +1,438 @@
+"""
+Estadísticas e historial de equipos sumando partidos de grupos y de bracket.
+
+Los dos tipos de partido comparten el marcador (MarcadorSets), así que se
+pueden apilar con UNION ALL y resolver en una sola consulta, sin traer
+partidos a Python.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connection, transaction
+
+from core.paginacion import CursorInvalido, PaginaKeyset, codificar_valores, decodificar_valores
+from equipos.models import Equipo
+
+from .models import Enfrentamiento, EquipoGrupo, Grupo, Partido, PartidoGrupo, Torneo
+
+# Partidos con resultado de ambos tipos, con el mismo juego de columnas.
+# Los byes (un solo equipo) y los pendientes (sin ganador) no cuentan.
+_PARTIDOS = """
+    SELECT p.equipo1_id, p.equipo2_id, p.ganador_id,
+           p.e1_sets_ganados, p.e2_sets_ganados, p.e1_games_ganados, p.e2_games_ganados
+    FROM {partido_grupo} p
+    JOIN {grupo} g ON g.id = p.grupo_id
+    JOIN {torneo} t ON t.id = g.torneo_id
+    WHERE p.ganador_id IS NOT NULL AND {filtro}
+    UNION ALL
+    SELECT p.equipo1_id, p.equipo2_id, p.ganador_id,
+           p.e1_sets_ganados, p.e2_sets_ganados, p.e1_games_ganados, p.e2_games_ganados
+    FROM {partido} p
+    JOIN {torneo} t ON t.id = p.torneo_id
+    WHERE p.ganador_id IS NOT NULL
+      AND p.equipo1_id IS NOT NULL AND p.equipo2_id IS NOT NULL AND {filtro}
+"""
+
+# Cada partido aporta dos filas (una por equipo, desde su lado) y se agrupa por equipo
+_TOTALES = """
+    WITH partidos AS ({partidos}),
+    lados AS (
+        SELECT equipo1_id AS equipo_id,
+               CASE WHEN ganador_id = equipo1_id THEN 1 ELSE 0 END AS ganado,
+               e1_sets_ganados AS sets_a_favor, e2_sets_ganados AS sets_en_contra,
+               e1_games_ganados AS games_a_favor, e2_games_ganados AS games_en_contra
+        FROM partidos
+        UNION ALL
+        SELECT equipo2_id,
+               CASE WHEN ganador_id = equipo2_id THEN 1 ELSE 0 END,
+               e2_sets_ganados, e1_sets_ganados,
+               e2_games_ganados, e1_games_ganados
+        FROM partidos
+    )
+    SELECT e.*,
+           COUNT(*) AS partidos_jugados,
+           SUM(l.ganado) AS partidos_ganados,
+           SUM(l.sets_a_favor) AS sets_a_favor,
+           SUM(l.sets_en_contra) AS sets_en_contra,
+           SUM(l.games_a_favor) AS games_a_favor,
+           SUM(l.games_en_contra) AS games_en_contra
+    FROM lados l
+    JOIN {equipo} e ON e.id = l.equipo_id
+    GROUP BY e.id
+    ORDER BY partidos_ganados DESC,
+             SUM(l.sets_a_favor) - SUM(l.sets_en_contra) DESC,
+             SUM(l.games_a_favor) - SUM(l.games_en_contra) DESC,
+             e.id
+"""
+
+
+def totales_temporada(anio, division_id=None):
+    """
+    Equipos con sus totales de la temporada `anio` (por fecha de inicio del
+    torneo), en una sola consulta. Cada Equipo trae los atributos
+    partidos_jugados, partidos_ganados, sets_a_favor, sets_en_contra,
+    games_a_favor y games_en_contra, ordenados como una tabla de posiciones.
+    """
+    # Rango de fechas (y no EXTRACT(year)) para poder usar índices sobre fecha_inicio
+    filtro = "t.fecha_inicio >= %s AND t.fecha_inicio < %s"
+    params = [date(anio, 1, 1), date(anio + 1, 1, 1)]
+    if division_id is not None:
+        filtro += " AND t.division_id = %s"
+        params.append(division_id)
+
+    partidos = _PARTIDOS.format(
+        partido_grupo=PartidoGrupo._meta.db_table,
+        partido=Partido._meta.db_table,
+        grupo=Grupo._meta.db_table,
+        torneo=Torneo._meta.db_table,
+        filtro=filtro,
+    )
+    sql = _TOTALES.format(partidos=partidos, equipo=Equipo._meta.db_table)
+    # El filtro aparece dos veces (grupos y bracket)
+    return Equipo.objects.raw(sql, params * 2)
+
+
+# --- Historial de partidos ---
+
+# Orden del historial, del más reciente al más viejo. `orden` es 0 en grupos y
+# la ronda en el bracket, así (fecha, torneo, orden, id) es única entre tablas.
+CLAVE_HISTORIAL = ('fecha', 'torneo_id', 'orden', 'id')
+
+# Una rama por tabla y por lado, cada una sobre su índice *_hist_idx: solo se
+# leen claves (sin tocar las filas de partidos) y el torneo por PK.
+_CLAVES_GRUPO = """
+    SELECT 'G' AS tipo, p.id AS id, {lado} AS lado, t.fecha_inicio AS fecha,
+           t.id AS torneo_id, 0 AS orden
+    FROM {partido_grupo} p
+    JOIN {grupo} g ON g.id = p.grupo_id
+    JOIN {torneo} t ON t.id = g.torneo_id
+    WHERE p.equipo{lado}_id IN ({equipos}){keyset}
+"""
+_CLAVES_BRACKET = """
+    SELECT 'E', p.id, {lado}, t.fecha_inicio, t.id, p.ronda
+    FROM {partido} p
+    JOIN {torneo} t ON t.id = p.torneo_id
+    WHERE p.equipo{lado}_id IN ({equipos}) AND p.equipo{rival}_id IS NOT NULL{keyset}
+"""
+
+# Después del LIMIT se completan solo las filas de la página: marcador, fase,
+# torneo, rival y su código en el torneo (Ej: "A1"), y la ronda final del bracket.
+_HISTORIAL = """
+    WITH claves AS ({claves}),
+    pagina AS (
+        SELECT * FROM claves
+        ORDER BY fecha {sentido}, torneo_id {sentido}, orden {sentido}, id {sentido}
+        LIMIT %s
+    ),
+    filas AS (
+        SELECT pagina.*, p.equipo1_id, p.equipo2_id, p.ganador_id,
+               p.e1_set1, p.e2_set1, p.e1_set2, p.e2_set2, p.e1_set3, p.e2_set3,
+               g.nombre AS grupo
+        FROM pagina
+        JOIN {partido_grupo} p ON p.id = pagina.id
+        JOIN {grupo} g ON g.id = p.grupo_id
+        WHERE pagina.tipo = 'G'
+        UNION ALL
+        SELECT pagina.*, p.equipo1_id, p.equipo2_id, p.ganador_id,
+               p.e1_set1, p.e2_set1, p.e1_set2, p.e2_set2, p.e1_set3, p.e2_set3,
+               NULL
+        FROM pagina
+        JOIN {partido} p ON p.id = pagina.id
+        WHERE pagina.tipo = 'E'
+    )
+    SELECT f.tipo, f.id, f.lado, f.fecha, f.torneo_id, f.orden,
+           f.equipo1_id, f.equipo2_id, f.ganador_id,
+           f.e1_set1, f.e2_set1, f.e1_set2, f.e2_set2, f.e1_set3, f.e2_set3, f.grupo,
+           t.nombre, r.id, r.nombre, rg.nombre, eg.numero,
+           CASE WHEN f.tipo = 'E'
+                THEN (SELECT MAX(m.ronda) FROM {partido} m WHERE m.torneo_id = f.torneo_id)
+           END
+    FROM filas f
+    JOIN {torneo} t ON t.id = f.torneo_id
+    JOIN {equipo} r ON r.id = CASE WHEN f.lado = 1 THEN f.equipo2_id ELSE f.equipo1_id END
+    LEFT JOIN ({equipo_grupo} eg JOIN {grupo} rg ON rg.id = eg.grupo_id)
+        ON eg.equipo_id = r.id AND rg.torneo_id = f.torneo_id
+    ORDER BY f.fecha {sentido}, f.torneo_id {sentido}, f.orden {sentido}, f.id {sentido}
+"""
+
+@dataclass
+class PartidoHistorial:
+    """Un partido del historial visto desde el equipo propio."""
+    tipo: str
+    id: int
+    lado: int
+    fecha: date
+    torneo_id: int
+    orden: int
+    equipo_id: int
+    ganador_id: int | None
+    pares: list
+    grupo: str | None
+    torneo: str
+    rival_id: int
+    rival: str
+    rival_grupo: str | None
+    rival_numero: int | None
+    max_ronda: int | None
+
+    @property
+    def es_grupo(self):
+        return self.tipo == 'G'
+
+    @property
+    def fase(self):
+        if self.es_grupo:
+            return self.grupo
+        return Partido.nombre_de_ronda(self.orden, self.max_ronda)
+
+    @property
+    def jugado(self):
+        return self.ganador_id is not None
+
+    @property
+    def gano(self):
+        return self.ganador_id == self.equipo_id
+
+    @property
+    def marcador(self):
+        """Sets desde el lado propio (Ej: '6-4 3-6 6-2')."""
+        return " ".join(f"{propio}-{rival}" for propio, rival in self.pares)
+
+    @property
+    def rival_codigo(self):
+        """Código del rival en el torneo (Ej: "A1"), como el template tag get_team_code."""
+        return EquipoGrupo.codigo(self.rival_grupo, self.rival_numero) or self.rival
+
+    @property
+    def cursor(self):
+        return codificar_valores([getattr(self, campo) for campo in CLAVE_HISTORIAL])
+
+    @classmethod
+    def desde_fila(cls, fila):
+        (tipo, id_, lado, fecha, torneo_id, orden, equipo1_id, equipo2_id, ganador_id,
+         e1_set1, e2_set1, e1_set2, e2_set2, e1_set3, e2_set3, grupo,
+         torneo, rival_id, rival, rival_grupo, rival_numero, max_ronda) = fila
+        pares = [
+            (e1, e2) for e1, e2 in ((e1_set1, e2_set1), (e1_set2, e2_set2), (e1_set3, e2_set3))
+            if e1 is not None and e2 is not None
+        ]
+        if lado == 2:
+            pares = [(e2, e1) for e1, e2 in pares]
+        if isinstance(fecha, str):  # SQLite devuelve texto en columnas de un UNION
+            fecha = date.fromisoformat(fecha)
+        return cls(
+            tipo, id_, lado, fecha, torneo_id, orden,
+            equipo1_id if lado == 1 else equipo2_id, ganador_id, pares, grupo,
+            torneo, rival_id, rival, rival_grupo, rival_numero, max_ronda,
+        )
+
+
+def _filtro_keyset(columnas, valores, hacia_atras):
+    """(a, b, c) < (x, y, z) expandido (sirve en cualquier motor); > si hacia_atras."""
+    operador = '>' if hacia_atras else '<'
+    sql, params = '', []
+    for columna, valor in reversed(list(zip(columnas, valores))):
+        if sql:
+            sql = f"{columna} {operador} %s OR ({columna} = %s AND ({sql}))"
+            params = [valor, valor] + params
+        else:
+            sql = f"{columna} {operador} %s"
+            params = [valor]
+    return f" AND ({sql})", params
+
+
+def _claves(equipos, valores=None, hacia_atras=False):
+    """Las cuatro ramas UNION ALL (grupos/bracket x lado 1/2) con sus parámetros."""
+    marcadores = ", ".join(["%s"] * len(equipos))
+    tablas = {
+        'partido_grupo': PartidoGrupo._meta.db_table,
+        'partido': Partido._meta.db_table,
+        'grupo': Grupo._meta.db_table,
+        'torneo': Torneo._meta.db_table,
+    }
+    ramas, params = [], []
+    for plantilla, orden in ((_CLAVES_GRUPO, '0'), (_CLAVES_BRACKET, 'p.ronda')):
+        for lado, rival in ((1, 2), (2, 1)):
+            keyset, params_keyset = '', []
+            if valores is not None:
+                columnas = ('t.fecha_inicio', 't.id', orden, 'p.id')
+                keyset, params_keyset = _filtro_keyset(columnas, valores, hacia_atras)
+            ramas.append(plantilla.format(
+                lado=lado, rival=rival, equipos=marcadores, keyset=keyset, **tablas
+            ))
+            params += list(equipos) + params_keyset
+    return " UNION ALL ".join(ramas), params
+
+
+def historial(equipos, tamano=20, despues=None, antes=None):
+    """
+    Página del historial de partidos (grupos y bracket) de los equipos `equipos`
+    (ids; varios para el historial de un jugador), del más reciente al más viejo.
+
+    Es una sola consulta por página: keyset sobre (fecha, torneo, orden, id) en
+    cada rama del UNION ALL, así una página profunda cuesta lo mismo que la
+    primera. No hay total (un COUNT sobre el UNION entero costaría más que la
+    página): devuelve una PaginaKeyset de PartidoHistorial con total_aproximado=None.
+    """
+    equipos = list(equipos)
+    if not equipos:
+        return PaginaKeyset([], CLAVE_HISTORIAL, False, False, None)
+
+    cursor = antes or despues
+    valores = None
+    if cursor:
+        valores = decodificar_valores(cursor, len(CLAVE_HISTORIAL))
+        try:
+            valores[0] = date.fromisoformat(valores[0])
+            valores[1:] = [int(v) for v in valores[1:]]
+        except (TypeError, ValueError) as exc:
+            raise CursorInvalido(cursor) from exc
+
+    claves, params = _claves(equipos, valores, hacia_atras=bool(antes))
+    sql = _HISTORIAL.format(
+        claves=claves,
+        sentido='ASC' if antes else 'DESC',
+        partido_grupo=PartidoGrupo._meta.db_table,
+        partido=Partido._meta.db_table,
+        grupo=Grupo._meta.db_table,
+        torneo=Torneo._meta.db_table,
+        equipo=Equipo._meta.db_table,
+        equipo_grupo=EquipoGrupo._meta.db_table,
+    )
+    with connection.cursor() as c:
+        c.execute(sql, params + [tamano + 1])
+        filas = [PartidoHistorial.desde_fila(fila) for fila in c.fetchall()]
+
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    if antes:
+        return PaginaKeyset(filas[::-1], CLAVE_HISTORIAL, True, hay_mas, None,
+                            codificar=lambda fila: fila.cursor)
+    return PaginaKeyset(filas, CLAVE_HISTORIAL, hay_mas, bool(despues), None,
+                        codificar=lambda fila: fila.cursor)
+
+
+# --- Head-to-head y desempate ---
+
+
+def victorias_entre(torneo_id, fase=Enfrentamiento.Fase.GRUPOS):
+    """{(ganador_id, perdedor_id): victorias} de los enfrentamientos del torneo en esa fase."""
+    return _victorias(
+        Enfrentamiento.objects.filter(torneo_id=torneo_id, fase=fase).values_list(
+            'equipo_menor_id', 'equipo_mayor_id', 'victorias_menor', 'victorias_mayor'
+        )
+    )
+
+
+async def avictorias_entre(torneo_id, fase=Enfrentamiento.Fase.GRUPOS):
+    filas = Enfrentamiento.objects.filter(torneo_id=torneo_id, fase=fase).values_list(
+        'equipo_menor_id', 'equipo_mayor_id', 'victorias_menor', 'victorias_mayor'
+    )
+    return _victorias([fila async for fila in filas])
+
+
+def _victorias(filas):
+    victorias = {}
+    for menor, mayor, victorias_menor, victorias_mayor in filas:
+        victorias[(menor, mayor)] = victorias_menor
+        victorias[(mayor, menor)] = victorias_mayor
+    return victorias
+
+
+def posiciones(tabla, victorias):
+    """
+    Ordena las filas de EquipoGrupo de un grupo: partidos ganados y, si empatan
+    exactamente dos equipos, gana el que ganó el partido entre ellos
+    (head-to-head). Con tres o más empatados, o sin partido entre ellos, queda
+    el orden de EquipoGrupo.Meta (sets a favor y en contra).
+    """
+    filas = sorted(tabla, key=lambda fila: -fila.partidos_ganados)
+    i = 0
+    while i < len(filas):
+        j = i
+        while j + 1 < len(filas) and filas[j + 1].partidos_ganados == filas[i].partidos_ganados:
+            j += 1
+        if j == i + 1:
+            a, b = filas[i].equipo_id, filas[j].equipo_id
+            if victorias.get((b, a), 0) > victorias.get((a, b), 0):
+                filas[i], filas[j] = filas[j], filas[i]
+        i = j + 1
+    return filas
+
+
+def ordenar_grupos(grupos, victorias):
+    """Deja en cada grupo `posiciones` (la tabla ya ordenada con el desempate)."""
+    for grupo in grupos:
+        grupo.posiciones = posiciones(grupo.tabla.all(), victorias)
+    return grupos
+
+
+# Recalcula todos los enfrentamientos (o los de algunos torneos) en un solo
+# INSERT ... SELECT: cada partido con resultado, visto desde el par ordenado.
+_ENFRENTAMIENTOS = """
+    INSERT INTO {enfrentamiento} (
+        equipo_menor_id, equipo_mayor_id, torneo_id, fase, partidos,
+        victorias_menor, victorias_mayor, sets_menor, sets_mayor, games_menor, games_mayor
+    )
+    SELECT menor, mayor, torneo_id, fase, COUNT(*),
+           SUM(CASE WHEN ganador_id = menor THEN 1 ELSE 0 END),
+           SUM(CASE WHEN ganador_id = mayor THEN 1 ELSE 0 END),
+           SUM(CASE WHEN equipo1_id = menor THEN e1_sets_ganados ELSE e2_sets_ganados END),
+           SUM(CASE WHEN equipo1_id = menor THEN e2_sets_ganados ELSE e1_sets_ganados END),
+           SUM(CASE WHEN equipo1_id = menor THEN e1_games_ganados ELSE e2_games_ganados END),
+           SUM(CASE WHEN equipo1_id = menor THEN e2_games_ganados ELSE e1_games_ganados END)
+    FROM (
+        SELECT CASE WHEN p.equipo1_id < p.equipo2_id THEN p.equipo1_id ELSE p.equipo2_id END AS menor,
+               CASE WHEN p.equipo1_id < p.equipo2_id THEN p.equipo2_id ELSE p.equipo1_id END AS mayor,
+               g.torneo_id, 'G' AS fase, p.equipo1_id, p.ganador_id,
+               p.e1_sets_ganados, p.e2_sets_ganados, p.e1_games_ganados, p.e2_games_ganados
+        FROM {partido_grupo} p
+        JOIN {grupo} g ON g.id = p.grupo_id
+        WHERE p.ganador_id IS NOT NULL{filtro_grupo}
+        UNION ALL
+        SELECT CASE WHEN p.equipo1_id < p.equipo2_id THEN p.equipo1_id ELSE p.equipo2_id END,
+               CASE WHEN p.equipo1_id < p.equipo2_id THEN p.equipo2_id ELSE p.equipo1_id END,
+               p.torneo_id, 'E', p.equipo1_id, p.ganador_id,
+               p.e1_sets_ganados, p.e2_sets_ganados, p.e1_games_ganados, p.e2_games_ganados
+        FROM {partido} p
+        WHERE p.ganador_id IS NOT NULL
+          AND p.equipo1_id IS NOT NULL AND p.equipo2_id IS NOT NULL{filtro_bracket}
+    ) partidos
+    GROUP BY menor, mayor, torneo_id, fase
+"""
+
+
+def reconstruir_enfrentamientos(torneo_ids=None):
+    """
+    Borra y vuelve a calcular los enfrentamientos (todos, o los de `torneo_ids`)
+    desde los partidos. Es para cargas masivas que no disparan señales (Ej:
+    bulk_create de las simulaciones) y para poblar la tabla la primera vez.
+    Devuelve la cantidad de filas creadas.
+    """
+    filtro_grupo = filtro_bracket = ''
+    params = []
+    existentes = Enfrentamiento.objects.all()
+    if torneo_ids is not None:
+        torneo_ids = list(torneo_ids)
+        if not torneo_ids:
+            return 0
+        marcadores = ", ".join(["%s"] * len(torneo_ids))
+        filtro_grupo = f" AND g.torneo_id IN ({marcadores})"
+        filtro_bracket = f" AND p.torneo_id IN ({marcadores})"
+        params = torneo_ids * 2
+        existentes = existentes.filter(torneo_id__in=torneo_ids)
+
+    sql = _ENFRENTAMIENTOS.format(
+        enfrentamiento=Enfrentamiento._meta.db_table,
+        partido_grupo=PartidoGrupo._meta.db_table,
+        partido=Partido._meta.db_table,
+        grupo=Grupo._meta.db_table,
+        filtro_grupo=filtro_grupo,
+        filtro_bracket=filtro_bracket,
+    )
+    with transaction.atomic():
+        # Sin dependientes ni señales: Django lo resuelve con un solo DELETE
+        existentes.delete()
+        with connection.cursor() as c:
+            c.execute(sql, params)
+            return c.rowcount
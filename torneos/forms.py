@@ -52,7 +52,26 @@ class TorneoAdminForm(forms.ModelForm):
                 )
 
 
-class CargarResultadoGrupoForm(forms.ModelForm):
+class ResultadoConVersionForm(forms.ModelForm):
+    """
+    Base de los modales de resultado: lleva oculta la versión del partido que
+    vio el admin y guarda con guardar_resultado(), que lanza
+    ResultadoDesactualizado si otro lo cargó mientras tanto.
+    """
+    version = forms.IntegerField(widget=forms.HiddenInput())
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.initial['version'] = self.instance.version
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        if commit:
+            instance.guardar_resultado(self.cleaned_data['version'])
+        return instance
+
+
+class CargarResultadoGrupoForm(ResultadoConVersionForm):
     class Meta:
         model = PartidoGrupo
         fields = ['e1_set1', 'e2_set1', 'e1_set2', 'e2_set2', 'e1_set3', 'e2_set3']
@@ -64,6 +83,8 @@ class CargarResultadoGrupoForm(forms.ModelForm):
         estilo_input = 'input input-bordered input-sm w-full text-center font-extrabold text-lg p-0 h-10 bg-base-100 text-base-content focus:border-primary'
 
         for field_name in self.fields:
+            if field_name == 'version':
+                continue
             field = self.fields[field_name]
             field.label = ""
             field.widget.attrs.update(
@@ -78,37 +99,16 @@ class CargarResultadoGrupoForm(forms.ModelForm):
 
     def clean(self):
         cleaned_data = super().clean()
-        e1_sets = 0
-        e2_sets = 0
-        e1_games = 0
-        e2_games = 0
-        for i in range(1, 4):
-            s1 = cleaned_data.get(f'e1_set{i}')
-            s2 = cleaned_data.get(f'e2_set{i}')
-            if s1 is not None and s2 is not None:
-                e1_games += s1
-                e2_games += s2
-                if s1 > s2:
-                    e1_sets += 1
-                elif s2 > s1:
-                    e2_sets += 1
-
-        self.instance.e1_sets_ganados = e1_sets
-        self.instance.e2_sets_ganados = e2_sets
-        self.instance.e1_games_ganados = e1_games
-        self.instance.e2_games_ganados = e2_games
-
-        if e1_sets > e2_sets:
-            self.instance.ganador = self.instance.equipo1
-        elif e2_sets > e1_sets:
-            self.instance.ganador = self.instance.equipo2
-        else:
-            self.instance.ganador = None
+        self.instance.cargar_sets(
+            (cleaned_data.get(f'e1_set{i}'), cleaned_data.get(f'e2_set{i}'))
+            for i in range(1, 4)
+        )
+        self.instance.ganador = self.instance.ganador_por_sets()
 
         return cleaned_data
 
 
-class PartidoResultadoForm(forms.ModelForm):
+class PartidoResultadoForm(ResultadoConVersionForm):
     set1_local = forms.IntegerField(required=False, min_value=0)
     set1_visitante = forms.IntegerField(required=False, min_value=0)
     set2_local = forms.IntegerField(required=False, min_value=0)
@@ -138,19 +138,14 @@ class PartidoResultadoForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if hasattr(self.instance, 'sets_local') and self.instance.sets_local:
-            for i, games in enumerate(self.instance.sets_local):
-                if i < 3:
-                    self.initial[f'set{i+1}_local'] = games
-        if hasattr(self.instance, 'sets_visitante') and self.instance.sets_visitante:
-            for i, games in enumerate(self.instance.sets_visitante):
-                if i < 3:
-                    self.initial[f'set{i+1}_visitante'] = games
+        for i, (local, visitante) in enumerate(self.instance.pares(), start=1):
+            self.initial[f'set{i}_local'] = local
+            self.initial[f'set{i}_visitante'] = visitante
 
         estilo_input = 'input input-bordered input-secondary input-sm w-full text-center font-extrabold text-lg p-0 h-10 bg-base-100 text-base-content focus:border-secondary'
 
         for field_name in self.fields:
-            if 'resultado' not in field_name:
+            if 'resultado' not in field_name and field_name != 'version':
                 field = self.fields[field_name]
                 field.label = ""
                 field.widget.attrs.update(
@@ -159,30 +154,23 @@ class PartidoResultadoForm(forms.ModelForm):
 
     def clean(self):
         cleaned_data = super().clean()
-        sets_local = 0
-        sets_visitante = 0
-        games_l = []
-        games_v = []
+        pares = []
         for i in range(1, 4):
             l = cleaned_data.get(f'set{i}_local')
             v = cleaned_data.get(f'set{i}_visitante')
             if l is not None and v is not None:
-                games_l.append(l)
-                games_v.append(v)
-                if l > v:
-                    sets_local += 1
-                elif v > l:
-                    sets_visitante += 1
+                pares.append((l, v))
             elif (l is not None and v is None) or (l is None and v is not None):
                 self.add_error(f'set{i}_local', "Cargar ambos.")
 
+        self.instance.cargar_sets(pares)
+        sets_local = self.instance.e1_sets_ganados
+        sets_visitante = self.instance.e2_sets_ganados
         if sets_local > 2 or sets_visitante > 2:
             raise forms.ValidationError("Máximo 2 sets.")
 
         cleaned_data['resultado_local'] = sets_local
         cleaned_data['resultado_visitante'] = sets_visitante
-        self.instance.sets_local = games_l
-        self.instance.sets_visitante = games_v
         return cleaned_data
 
     def save(self, commit=True):
@@ -191,25 +179,14 @@ class PartidoResultadoForm(forms.ModelForm):
         """
         instance = super().save(commit=False)
         
-        # Determinar ganador basado en sets ganados
-        sets_local = self.cleaned_data.get('resultado_local', 0)
-        sets_visitante = self.cleaned_data.get('resultado_visitante', 0)
-        
-        if sets_local > sets_visitante:
-            instance.ganador = instance.equipo1
-        elif sets_visitante > sets_local:
-            instance.ganador = instance.equipo2
-        else:
-            instance.ganador = None
-        
+        # Determinar ganador basado en sets ganados (totales calculados en clean)
+        instance.ganador = instance.ganador_por_sets()
+
         # Generar string de resultado (ej: "6-4, 6-2")
-        resultado_parts = []
-        for i in range(len(instance.sets_local)):
-            resultado_parts.append(f"{instance.sets_local[i]}-{instance.sets_visitante[i]}")
-        instance.resultado = ", ".join(resultado_parts) if resultado_parts else None
+        instance.resultado = instance.marcador(', ') or None
         
         if commit:
-            instance.save()
+            instance.guardar_resultado(self.cleaned_data['version'])
         
         return instance
 
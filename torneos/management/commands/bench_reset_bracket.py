@@ -0,0 +1,95 @@
+"""
+Benchmark del reset del bracket: `.delete()` del ORM contra borrar_bracket().
+Uso: python manage.py bench_reset_bracket --equipos 128 --repeticiones 5
+
+Arma un torneo EN_JUEGO con un cuadro de `--equipos` equipos (todas las
+rondas jugadas menos la final, con su head-to-head), lo borra por cada camino
+y cuenta sentencias SQL y tiempo. Lo que tiene que quedar después del borrado
+se comprueba en torneos/tests.py.
+
+Todo corre dentro de una transacción que se deshace al final: no deja datos.
+"""
+import time
+from statistics import mean
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import Division
+from core.auditoria import ContadorConsultas
+from core.siembra import crear_bracket_jugado, crear_equipos, crear_jugadores
+from torneos.models import Partido, Torneo
+from torneos.tareas import borrar_bracket
+
+DOMINIO_BENCH = '@bench-reset.invalid'
+
+
+class Deshacer(Exception):
+    """Sale de la transacción del benchmark para que se deshaga."""
+
+
+def borrar_con_orm(torneo_id):
+    Partido.objects.filter(torneo_id=torneo_id).delete()
+
+
+class Command(BaseCommand):
+    help = 'Compara el reset del bracket con .delete() del ORM y con borrar_bracket()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--equipos', type=int, default=128, help='Equipos del cuadro (potencia de 2)')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Borrados por camino')
+
+    def handle(self, *args, **options):
+        num_equipos = options['equipos']
+        if num_equipos < 2 or num_equipos & (num_equipos - 1):
+            raise CommandError('--equipos tiene que ser una potencia de 2.')
+
+        try:
+            with transaction.atomic():
+                torneo, equipos = self._preparar(num_equipos)
+                self.stdout.write(
+                    f"Cuadro de {num_equipos} equipos: {num_equipos - 1} partidos, "
+                    f"{options['repeticiones']} repeticiones"
+                )
+                for nombre, borrar in (('ORM .delete()', borrar_con_orm), ('borrar_bracket()', borrar_bracket)):
+                    self._medir(nombre, borrar, torneo, equipos, options['repeticiones'])
+                raise Deshacer
+        except Deshacer:
+            pass
+
+    def _preparar(self, num_equipos):
+        division, _ = Division.objects.get_or_create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"bench{i}{letra}{DOMINIO_BENCH}", 'nombre': 'Bench', 'apellido': f"Reset{i}{letra}"}
+            for i in range(1, num_equipos + 1)
+            for letra in ('a', 'b')
+        ])
+        equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        torneo = Torneo.objects.create(
+            nombre="Benchmark reset bracket",
+            division=division,
+            fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(),
+            cupos_totales=num_equipos,
+            estado=Torneo.Estado.EN_JUEGO,
+        )
+        return torneo, equipos
+
+    def _medir(self, nombre, borrar, torneo, equipos, repeticiones):
+        tiempos, sentencias = [], []
+        for _ in range(repeticiones):
+            crear_bracket_jugado(torneo, equipos)
+
+            contador = ContadorConsultas()
+            with connection.execute_wrapper(contador):
+                inicio = time.perf_counter()
+                with transaction.atomic():
+                    borrar(torneo.pk)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            sentencias.append(contador.total)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{nombre:<18} {mean(tiempos):8.1f} ms (mín {min(tiempos):.1f}) | "
+            f"{mean(sentencias):.0f} sentencias SQL"
+        ))
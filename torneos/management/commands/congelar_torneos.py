@@ -0,0 +1,53 @@
+"""
+Vuelve a congelar (HTML + JSON) los torneos finalizados.
+Uso: python manage.py congelar_torneos              # todos los finalizados
+     python manage.py congelar_torneos --torneo 12  # solo algunos
+
+Hay que correrlo después de cambiar templates: los archivos congelados
+llevan la versión del torneo, no la del template. También borra lo que quedó
+de torneos eliminados o que dejaron de estar finalizados.
+"""
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from torneos import congelado
+from torneos.models import Torneo
+
+
+class Command(BaseCommand):
+    help = 'Regenera las páginas y JSON congelados de los torneos finalizados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--torneo', type=int, action='append', help='ID del torneo (se puede repetir)'
+        )
+
+    def handle(self, *args, **options):
+        torneos = Torneo.objects.filter(estado=Torneo.Estado.FINALIZADO) \
+            .select_related('division', 'ganador_del_torneo').order_by('pk')
+        if options['torneo']:
+            torneos = torneos.filter(pk__in=options['torneo'])
+        else:
+            self._limpiar_sobrantes()
+
+        total = 0
+        for torneo in torneos.iterator():
+            congelado.congelar(torneo)
+            total += 1
+            if total % 50 == 0:
+                self.stdout.write(f"  {total} torneos congelados...")
+        self.stdout.write(self.style.SUCCESS(f"{total} torneos congelados en {settings.CONGELADOS_ROOT}"))
+
+    def _limpiar_sobrantes(self):
+        raiz = Path(settings.CONGELADOS_ROOT) / 'torneos'
+        if not raiz.exists():
+            return
+        finalizados = set(
+            Torneo.objects.filter(estado=Torneo.Estado.FINALIZADO).values_list('pk', flat=True)
+        )
+        for carpeta in raiz.iterdir():
+            if not (carpeta.name.isdigit() and int(carpeta.name) in finalizados):
+                shutil.rmtree(carpeta, ignore_errors=True)
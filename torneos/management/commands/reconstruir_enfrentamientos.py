@@ -0,0 +1,24 @@
+"""
+Recalcula la tabla de head-to-head (Enfrentamiento) desde los partidos.
+Uso: python manage.py reconstruir_enfrentamientos              # todos
+     python manage.py reconstruir_enfrentamientos --torneo 12  # solo algunos
+
+Las altas y cambios de resultados la mantienen al día solas (señales); hace
+falta correrlo la primera vez y después de cargas con bulk_create.
+"""
+from django.core.management.base import BaseCommand
+
+from torneos.estadisticas import reconstruir_enfrentamientos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los enfrentamientos (head-to-head) entre equipos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--torneo', type=int, action='append', help='ID del torneo (se puede repetir)'
+        )
+
+    def handle(self, *args, **options):
+        total = reconstruir_enfrentamientos(options['torneo'])
+        self.stdout.write(self.style.SUCCESS(f"{total} enfrentamientos recalculados"))
@@ -0,0 +1,234 @@
+"""
+Django management command para simular torneos completos en lote.
+Uso: python manage.py simulate_tournament --teams 64 --group-size 4 --tournaments 1000 --seed 42
+
+Genera todos los marcadores con NumPy (torneos/simulacion.py) y los escribe con
+bulk_create, sin save() por fila. Pensado para cargar volúmenes realistas de
+datos y hacer pruebas de carga sobre las vistas de lectura.
+"""
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Division
+from core.siembra import crear_jugadores, crear_equipos
+from equipos.models import Equipo
+from torneos.estadisticas import reconstruir_enfrentamientos
+from torneos.models import Torneo, Inscripcion, Grupo, EquipoGrupo, PartidoGrupo, Partido
+from torneos.simulacion import LETRAS_GRUPOS, MODELOS, MODELO_FUERZA, simular_lote
+
+User = get_user_model()
+
+
+def _sets_o_none(valor):
+    return None if valor < 0 else int(valor)
+
+
+class Command(BaseCommand):
+    help = 'Simula torneos completos (grupos + bracket) en lote con NumPy y bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=24, help='Equipos por torneo')
+        parser.add_argument('--group-size', type=int, default=3, help='Equipos por grupo')
+        parser.add_argument('--tournaments', type=int, default=1, help='Cantidad de torneos')
+        parser.add_argument('--seed', type=int, default=None, help='Semilla del generador')
+        parser.add_argument(
+            '--model', choices=MODELOS, default=MODELO_FUERZA,
+            help='Modelo de resultados: uniforme (50/50) o fuerza (Bradley-Terry)',
+        )
+        parser.add_argument('--division', default='Simulación', help='División del plantel')
+        parser.add_argument(
+            '--batch', type=int, default=50, help='Torneos por transacción'
+        )
+
+    def handle(self, *args, **options):
+        num_equipos = options['teams']
+        tamano_grupo = options['group_size']
+        num_torneos = options['tournaments']
+
+        if tamano_grupo < 2:
+            raise CommandError('--group-size debe ser al menos 2.')
+        num_grupos = -(-num_equipos // tamano_grupo)
+        if num_grupos > len(LETRAS_GRUPOS):
+            raise CommandError(f'Demasiados grupos ({num_grupos}); el máximo es {len(LETRAS_GRUPOS)}.')
+        if num_grupos * 2 < 4:
+            raise CommandError('Se necesitan al menos 4 clasificados (2 grupos).')
+
+        inicio = time.perf_counter()
+        rng = np.random.default_rng(options['seed'])
+        division, _ = Division.objects.get_or_create(nombre=options['division'])
+
+        plantel = self._preparar_plantel(division, num_equipos)
+        fuerzas = rng.normal(0.0, 1.0, num_equipos)
+        self.stdout.write(f"✓ Plantel listo: {len(plantel)} equipos en {division.nombre}")
+
+        creados = 0
+        while creados < num_torneos:
+            lote = min(options['batch'], num_torneos - creados)
+            datos = simular_lote(rng, lote, num_equipos, tamano_grupo, options['model'], fuerzas)
+            with transaction.atomic():
+                self._guardar_lote(rng, datos, plantel, division, tamano_grupo, creados)
+            creados += lote
+            self.stdout.write(f"✓ {creados}/{num_torneos} torneos simulados")
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ {num_torneos} torneos de {num_equipos} equipos simulados en {duracion:.1f}s"
+        ))
+
+    # --- Plantel ---
+
+    def _preparar_plantel(self, division, num_equipos):
+        """Crea (o reutiliza) num_equipos equipos simulados con bulk_create."""
+        emails = [
+            (f"sim{i:04d}a@simulacion.local", f"sim{i:04d}b@simulacion.local")
+            for i in range(1, num_equipos + 1)
+        ]
+        existentes = set(
+            User.objects.filter(email__endswith='@simulacion.local').values_list('email', flat=True)
+        )
+        # Sin contraseña: quedan con contraseña inutilizable y no se ejecuta PBKDF2
+        crear_jugadores(division, [
+            {'email': email, 'nombre': f'Sim{i}{letra}', 'apellido': f'Sim{i:04d}{letra}'}
+            for i, par in enumerate(emails, start=1)
+            for email, letra in zip(par, 'AB')
+            if email not in existentes
+        ])
+
+        usuarios = User.objects.filter(email__endswith='@simulacion.local').in_bulk(field_name='email')
+        equipos = {
+            e.jugador1_id: e
+            for e in Equipo.objects.filter(jugador1__email__endswith='@simulacion.local')
+        }
+        faltantes = [
+            (usuarios[email1], usuarios[email2])
+            for email1, email2 in emails
+            if usuarios[email1].pk not in equipos
+        ]
+        for equipo in crear_equipos(faltantes, division):
+            equipos[equipo.jugador1_id] = equipo
+        return [equipos[usuarios[email1].pk] for email1, _ in emails]
+
+    # --- Escritura en lote ---
+
+    def _guardar_lote(self, rng, datos, plantel, division, tamano_grupo, desplazamiento):
+        est = datos['estructura']
+        orden = datos['orden']
+        num_torneos, num_equipos = orden.shape
+        num_grupos = est['num_grupos']
+        hoy = timezone.now()
+        dias_atras = rng.integers(1, 730, num_torneos)
+
+        torneos = Torneo.objects.bulk_create([
+            Torneo(
+                nombre=f"Simulación {desplazamiento + t + 1} ({num_equipos} equipos)",
+                division=division,
+                fecha_inicio=(hoy - timedelta(days=int(dias_atras[t]))).date(),
+                fecha_limite_inscripcion=hoy - timedelta(days=int(dias_atras[t]) + 1),
+                cupos_totales=num_equipos,
+                equipos_por_grupo=tamano_grupo,
+                estado=Torneo.Estado.FINALIZADO,
+                tipo_torneo=Torneo.TipoTorneo.GRUPOS,
+                ganador_del_torneo=plantel[datos['campeon'][t]],
+            )
+            for t in range(num_torneos)
+        ])
+
+        Inscripcion.objects.bulk_create([
+            Inscripcion(torneo=torneos[t], equipo=plantel[orden[t, p]])
+            for t in range(num_torneos)
+            for p in range(num_equipos)
+        ], batch_size=2000)
+
+        grupos = Grupo.objects.bulk_create([
+            Grupo(torneo=torneos[t], nombre=f"Grupo {LETRAS_GRUPOS[g]}")
+            for t in range(num_torneos)
+            for g in range(num_grupos)
+        ], batch_size=2000)
+
+        tabla = datos['tabla']
+        EquipoGrupo.objects.bulk_create([
+            EquipoGrupo(
+                grupo=grupos[t * num_grupos + est['grupo_de_posicion'][p]],
+                equipo=plantel[orden[t, p]],
+                numero=int(est['numero_en_grupo'][p]),
+                partidos_jugados=int(tabla['jugados'][t, p]),
+                partidos_ganados=int(tabla['ganados'][t, p]),
+                partidos_perdidos=int(tabla['jugados'][t, p] - tabla['ganados'][t, p]),
+                sets_a_favor=int(tabla['sets_favor'][t, p]),
+                sets_en_contra=int(tabla['sets_contra'][t, p]),
+                games_a_favor=int(tabla['games_favor'][t, p]),
+                games_en_contra=int(tabla['games_contra'][t, p]),
+            )
+            for t in range(num_torneos)
+            for p in range(num_equipos)
+        ], batch_size=2000)
+
+        g = datos['grupos']
+        partidos_grupo = []
+        for t in range(num_torneos):
+            for m in range(est['pos1'].size):
+                e1, e2 = plantel[g['e1'][t, m]], plantel[g['e2'][t, m]]
+                s1, s2 = g['games_e1'][t, m], g['games_e2'][t, m]
+                partidos_grupo.append(PartidoGrupo(
+                    grupo=grupos[t * num_grupos + est['grupo_de_partido'][m]],
+                    equipo1=e1,
+                    equipo2=e2,
+                    e1_set1=_sets_o_none(s1[0]), e2_set1=_sets_o_none(s2[0]),
+                    e1_set2=_sets_o_none(s1[1]), e2_set2=_sets_o_none(s2[1]),
+                    e1_set3=_sets_o_none(s1[2]), e2_set3=_sets_o_none(s2[2]),
+                    ganador=e1 if g['gana_e1'][t, m] else e2,
+                    e1_sets_ganados=int(g['sets_e1'][t, m]),
+                    e2_sets_ganados=int(g['sets_e2'][t, m]),
+                    e1_games_ganados=int(g['total_games_e1'][t, m]),
+                    e2_games_ganados=int(g['total_games_e2'][t, m]),
+                ))
+        PartidoGrupo.objects.bulk_create(partidos_grupo, batch_size=2000)
+
+        # Bracket: se crea desde la final hacia atrás para enlazar siguiente_partido
+        # sin un UPDATE posterior.
+        siguientes = None
+        for num_ronda in range(len(datos['rondas']), 0, -1):
+            ronda = datos['rondas'][num_ronda - 1]
+            partidos = []
+            for t in range(num_torneos):
+                for i in range(ronda['e1'].shape[1]):
+                    partidos.append(self._partido_bracket(
+                        torneos[t], num_ronda, i, ronda, t, plantel,
+                        siguientes[t][i // 2] if siguientes else None,
+                    ))
+            creados = Partido.objects.bulk_create(partidos, batch_size=2000)
+            por_torneo = ronda['e1'].shape[1]
+            siguientes = [creados[t * por_torneo:(t + 1) * por_torneo] for t in range(num_torneos)]
+
+        # bulk_create no dispara las señales que mantienen el head-to-head
+        reconstruir_enfrentamientos([torneo.pk for torneo in torneos])
+
+    def _partido_bracket(self, torneo, num_ronda, i, ronda, t, plantel, siguiente):
+        idx1, idx2 = ronda['e1'][t, i], ronda['e2'][t, i]
+        ganador = ronda['ganador'][t, i]
+        partido = Partido(
+            torneo=torneo,
+            ronda=num_ronda,
+            orden_partido=i + 1,
+            equipo1=plantel[idx1] if idx1 >= 0 else None,
+            equipo2=plantel[idx2] if idx2 >= 0 else None,
+            ganador=plantel[ganador] if ganador >= 0 else None,
+            siguiente_partido=siguiente,
+        )
+        if not ronda['ambos'][t, i]:
+            partido.resultado = Partido.RESULTADO_BYE
+            return partido
+
+        partido.cargar_sets(
+            (int(l), int(v))
+            for l, v in zip(ronda['games_e1'][t, i], ronda['games_e2'][t, i])
+            if l >= 0 and v >= 0
+        )
+        partido.resultado = partido.marcador(', ')
+        return partido
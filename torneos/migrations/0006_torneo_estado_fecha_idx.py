@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_customuser_options'),
+        ('equipos', '0003_equipo_division_nombre_idx'),
+        ('torneos', '0005_equipogrupo_numero'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='partidogrupo',
+            name='ganador',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='partidos_grupo_ganados', to='equipos.equipo'),
+        ),
+        migrations.AddIndex(
+            model_name='torneo',
+            index=models.Index(fields=['estado', '-fecha_inicio', 'id'], name='torneo_estado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('torneos', '0006_torneo_estado_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='torneo',
+            name='actualizado',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='torneo',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
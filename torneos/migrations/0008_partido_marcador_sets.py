@@ -0,0 +1,138 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:36
+
+from django.db import migrations, models
+
+
+def _games(valor):
+    """Games de un set (int o texto como "6"); None si no se puede leer."""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor if valor >= 0 else None
+    if isinstance(valor, str) and valor.strip().isdigit():
+        return int(valor.strip())
+    return None
+
+
+def pares_de_sets(sets_local, sets_visitante):
+    """
+    [(e1, e2), ...] de los sets legibles, hasta 3. Los datos viejos pueden
+    venir a medias: listas de distinto largo (sobran sets sin rival), valores
+    vacíos o texto que no es un número, o algo que no es una lista. Esos sets
+    se descartan en lugar de cortar la migración.
+    """
+    if not isinstance(sets_local, list) or not isinstance(sets_visitante, list):
+        return []
+    pares = []
+    for e1, e2 in zip(sets_local, sets_visitante):
+        e1, e2 = _games(e1), _games(e2)
+        if e1 is not None and e2 is not None:
+            pares.append((e1, e2))
+    return pares[:3]
+
+
+def copiar_sets(apps, schema_editor):
+    """Pasa las listas JSON sets_local/sets_visitante a las columnas por set."""
+    Partido = apps.get_model('torneos', 'Partido')
+    partidos = []
+    for partido in Partido.objects.exclude(sets_local=[]).only('sets_local', 'sets_visitante'):
+        pares = pares_de_sets(partido.sets_local, partido.sets_visitante)
+        partido.e1_sets_ganados = partido.e2_sets_ganados = 0
+        partido.e1_games_ganados = partido.e2_games_ganados = 0
+        for i, (e1, e2) in enumerate(pares, start=1):
+            setattr(partido, f'e1_set{i}', e1)
+            setattr(partido, f'e2_set{i}', e2)
+            partido.e1_games_ganados += e1
+            partido.e2_games_ganados += e2
+            if e1 > e2:
+                partido.e1_sets_ganados += 1
+            elif e2 > e1:
+                partido.e2_sets_ganados += 1
+        partidos.append(partido)
+    Partido.objects.bulk_update(partidos, [
+        'e1_set1', 'e2_set1', 'e1_set2', 'e2_set2', 'e1_set3', 'e2_set3',
+        'e1_sets_ganados', 'e2_sets_ganados', 'e1_games_ganados', 'e2_games_ganados',
+    ], batch_size=500)
+
+
+def devolver_sets(apps, schema_editor):
+    Partido = apps.get_model('torneos', 'Partido')
+    partidos = []
+    for partido in Partido.objects.exclude(e1_set1=None):
+        columnas = [
+            (getattr(partido, f'e1_set{i}'), getattr(partido, f'e2_set{i}')) for i in range(1, 4)
+        ]
+        jugados = [(e1, e2) for e1, e2 in columnas if e1 is not None and e2 is not None]
+        partido.sets_local = [e1 for e1, _ in jugados]
+        partido.sets_visitante = [e2 for _, e2 in jugados]
+        partidos.append(partido)
+    Partido.objects.bulk_update(partidos, ['sets_local', 'sets_visitante'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('torneos', '0007_torneo_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partido',
+            name='e1_games_ganados',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e1_set1',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e1_set2',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e1_set3',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e1_sets_ganados',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e2_games_ganados',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e2_set1',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e2_set2',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e2_set3',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='e2_sets_ganados',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(copiar_sets, devolver_sets),
+        migrations.RemoveField(
+            model_name='partido',
+            name='sets_local',
+        ),
+        migrations.RemoveField(
+            model_name='partido',
+            name='sets_visitante',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0003_equipo_division_nombre_idx'),
+        ('torneos', '0008_partido_marcador_sets'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='partido',
+            index=models.Index(fields=['equipo1', 'torneo', 'ronda', 'id'], name='partido_e1_hist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partido',
+            index=models.Index(fields=['equipo2', 'torneo', 'ronda', 'id'], name='partido_e2_hist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partidogrupo',
+            index=models.Index(fields=['equipo1', 'grupo', 'id'], name='partidogrupo_e1_hist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partidogrupo',
+            index=models.Index(fields=['equipo2', 'grupo', 'id'], name='partidogrupo_e2_hist_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipos', '0003_equipo_division_nombre_idx'),
+        ('torneos', '0009_historial_equipo_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enfrentamiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fase', models.CharField(choices=[('G', 'Fase de Grupos'), ('E', 'Eliminatoria')], max_length=1)),
+                ('partidos', models.PositiveSmallIntegerField(default=0)),
+                ('victorias_menor', models.PositiveSmallIntegerField(default=0)),
+                ('victorias_mayor', models.PositiveSmallIntegerField(default=0)),
+                ('sets_menor', models.PositiveSmallIntegerField(default=0)),
+                ('sets_mayor', models.PositiveSmallIntegerField(default=0)),
+                ('games_menor', models.PositiveSmallIntegerField(default=0)),
+                ('games_mayor', models.PositiveSmallIntegerField(default=0)),
+                ('equipo_mayor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='equipos.equipo')),
+                ('equipo_menor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='equipos.equipo')),
+                ('torneo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enfrentamientos', to='torneos.torneo')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('equipo_menor', 'equipo_mayor', 'torneo', 'fase'), name='enfrentamiento_unico'), models.CheckConstraint(condition=models.Q(('equipo_menor__lt', models.F('equipo_mayor'))), name='enfrentamiento_par_ordenado')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('torneos', '0010_enfrentamiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partido',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='partidogrupo',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
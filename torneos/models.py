@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
-from django.db.models import F
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.utils import timezone
 from equipos.models import Equipo
 from accounts.models import Division
 
@@ -46,9 +47,66 @@ class Torneo(models.Model):
         Equipo, through='Inscripcion', related_name='torneos_participados'
     )
 
+    # Se incrementan con cada cambio del torneo o de sus inscripciones, grupos y
+    # partidos (ver registrar_cambio). Son la base del ETag/Last-Modified.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    actualizado = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Historial de finalizados: paginación keyset por (-fecha_inicio, id)
+            models.Index(
+                fields=['estado', '-fecha_inicio', 'id'], name='torneo_estado_fecha_idx'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.nombre} ({self.division.nombre})"
 
+    CAMPOS_DE_VERSION = ('version', 'actualizado')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Una instancia vieja no debe pisar la versión que subieron otras
+            # escrituras: esos dos campos solo se tocan en registrar_cambio().
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.CAMPOS_DE_VERSION
+            ]
+            super().save(*args, **kwargs)
+            Torneo.registrar_cambio(pk=self.pk)
+        else:
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def registrar_cambio(cls, **filtro):
+        """
+        Sube la versión de los torneos que cumplen `filtro` (Ej: pk=3, grupos=7).
+        Es un UPDATE atómico, sin leer el torneo. Devuelve cuántos cambió.
+        """
+        return cls.objects.filter(**filtro).update(
+            version=F('version') + 1, actualizado=timezone.now()
+        )
+
+    # Únicos cambios de estado que hacen las acciones de gestión
+    TRANSICIONES = {
+        Estado.EN_JUEGO: Estado.ABIERTO,
+        Estado.FINALIZADO: Estado.EN_JUEGO,
+    }
+
+    @classmethod
+    def pasar_a(cls, pk, estado, **campos):
+        """
+        Pasa el torneo a `estado` solo si está en el estado anterior
+        (TRANSICIONES), con un UPDATE condicional que también sube la versión
+        y escribe `campos` (Ej: ganador_del_torneo al finalizar).
+        Devuelve False si ya no estaba ahí (Ej: un doble envío ya lo cambió).
+        Dentro de una transacción, la fila queda tomada hasta el commit.
+        """
+        return bool(cls.objects.filter(pk=pk, estado=cls.TRANSICIONES[estado]).update(
+            estado=estado, version=F('version') + 1, actualizado=timezone.now(), **campos
+        ))
+
 
 class Inscripcion(models.Model):
     equipo = models.ForeignKey(
@@ -113,6 +171,12 @@ class EquipoGrupo(models.Model):
     def diferencia_games(self):
         return self.games_a_favor - self.games_en_contra
 
+    @staticmethod
+    def codigo(nombre_grupo, numero):
+        """Código del equipo en el torneo (Ej: "Grupo A", 1 -> "A1"); '' si no se puede armar."""
+        letra = (nombre_grupo or '').replace("Grupo ", "").strip()
+        return f"{letra}{numero}" if letra and numero else ''
+
     def __str__(self):
         return f"{self.equipo} en {self.grupo}"
 
@@ -125,7 +189,111 @@ class EquipoGrupo(models.Model):
         ]
 
 
-class PartidoGrupo(models.Model):
+class ResultadoDesactualizado(Exception):
+    """El partido cambió desde que se abrió el formulario (ver MarcadorSets.guardar_resultado)."""
+
+
+class MarcadorSets(models.Model):
+    """
+    Marcador de un partido de pádel (hasta 3 sets), común a grupos y bracket.
+
+    Cada set es un par de columnas enteras (e1_setN / e2_setN) y los totales de
+    sets y games quedan precalculados, así las estadísticas de un equipo se
+    suman en SQL sin importar el tipo de partido (ver torneos.estadisticas).
+    """
+    CANTIDAD_SETS = 3
+
+    e1_set1 = models.PositiveSmallIntegerField(null=True, blank=True)
+    e2_set1 = models.PositiveSmallIntegerField(null=True, blank=True)
+    e1_set2 = models.PositiveSmallIntegerField(null=True, blank=True)
+    e2_set2 = models.PositiveSmallIntegerField(null=True, blank=True)
+    e1_set3 = models.PositiveSmallIntegerField(null=True, blank=True)
+    e2_set3 = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    # Totales calculados (se llenan con cargar_sets / calcular_totales)
+    e1_sets_ganados = models.PositiveSmallIntegerField(default=0)
+    e2_sets_ganados = models.PositiveSmallIntegerField(default=0)
+    e1_games_ganados = models.PositiveSmallIntegerField(default=0)
+    e2_games_ganados = models.PositiveSmallIntegerField(default=0)
+
+    # Sube con cada resultado cargado desde los modales (guardar_resultado)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Igual que Torneo: la versión solo la sube guardar_resultado(), una
+            # instancia vieja (Ej: el siguiente partido del bracket) no la pisa.
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'version'
+            ]
+        super().save(*args, **kwargs)
+
+    def guardar_resultado(self, version):
+        """
+        Guarda el resultado solo si el partido sigue en `version` (la que vio
+        quien lo editó). El UPDATE condicional sube la versión y el save()
+        corre en la misma transacción; si otro lo guardó antes no cambia nada
+        y lanza ResultadoDesactualizado. Sin bloqueos mientras se edita.
+        """
+        with transaction.atomic():
+            actualizados = type(self).objects.filter(pk=self.pk, version=version).update(
+                version=F('version') + 1
+            )
+            if not actualizados:
+                raise ResultadoDesactualizado(self)
+            self.version = version + 1
+            self.save()
+
+    def pares(self):
+        """Sets jugados como [(games_e1, games_e2), ...]"""
+        pares = []
+        for i in range(1, self.CANTIDAD_SETS + 1):
+            e1, e2 = getattr(self, f'e1_set{i}'), getattr(self, f'e2_set{i}')
+            if e1 is not None and e2 is not None:
+                pares.append((e1, e2))
+        return pares
+
+    @property
+    def sets(self):
+        """Sets jugados como texto (Ej: ['6-4', '6-2']), para los templates."""
+        return [f"{e1}-{e2}" for e1, e2 in self.pares()]
+
+    def marcador(self, separador=' '):
+        return separador.join(self.sets)
+
+    def cargar_sets(self, pares):
+        """Guarda los sets [(e1, e2), ...] (None = no jugado) y recalcula los totales."""
+        pares = list(pares)[:self.CANTIDAD_SETS]
+        pares += [(None, None)] * (self.CANTIDAD_SETS - len(pares))
+        for i, (e1, e2) in enumerate(pares, start=1):
+            setattr(self, f'e1_set{i}', e1)
+            setattr(self, f'e2_set{i}', e2)
+        self.calcular_totales()
+
+    def calcular_totales(self):
+        self.e1_sets_ganados = self.e2_sets_ganados = 0
+        self.e1_games_ganados = self.e2_games_ganados = 0
+        for e1, e2 in self.pares():
+            self.e1_games_ganados += e1
+            self.e2_games_ganados += e2
+            if e1 > e2:
+                self.e1_sets_ganados += 1
+            elif e2 > e1:
+                self.e2_sets_ganados += 1
+
+    def ganador_por_sets(self):
+        if self.e1_sets_ganados > self.e2_sets_ganados:
+            return self.equipo1
+        if self.e2_sets_ganados > self.e1_sets_ganados:
+            return self.equipo2
+        return None
+
+
+class PartidoGrupo(MarcadorSets):
     """Partido dentro de la Fase de Grupos"""
 
     grupo = models.ForeignKey(
@@ -138,14 +306,6 @@ class PartidoGrupo(models.Model):
         Equipo, on_delete=models.CASCADE, related_name="partidos_grupo_e2"
     )
 
-    # Resultados detallados (Padel: hasta 3 sets)
-    e1_set1 = models.PositiveSmallIntegerField(null=True, blank=True)
-    e2_set1 = models.PositiveSmallIntegerField(null=True, blank=True)
-    e1_set2 = models.PositiveSmallIntegerField(null=True, blank=True)
-    e2_set2 = models.PositiveSmallIntegerField(null=True, blank=True)
-    e1_set3 = models.PositiveSmallIntegerField(null=True, blank=True)
-    e2_set3 = models.PositiveSmallIntegerField(null=True, blank=True)
-
     ganador = models.ForeignKey(
         Equipo, on_delete=models.SET_NULL, null=True, blank=True, related_name="partidos_grupo_ganados"
     )
@@ -153,30 +313,24 @@ class PartidoGrupo(models.Model):
     @property
     def resultado(self):
         """Devuelve el resultado formateado como string (Ej: '6-4 6-2')"""
-        if self.e1_set1 is None:
-            return ""
-        
-        res = f"{self.e1_set1}-{self.e2_set1}"
-        if self.e1_set2 is not None:
-            res += f" {self.e1_set2}-{self.e2_set2}"
-        if self.e1_set3 is not None:
-            res += f" {self.e1_set3}-{self.e2_set3}"
-        return res
-
-    # Totales calculados (se llenan al guardar)
-    e1_sets_ganados = models.PositiveSmallIntegerField(default=0)
-    e2_sets_ganados = models.PositiveSmallIntegerField(default=0)
-    e1_games_ganados = models.PositiveSmallIntegerField(default=0)
-    e2_games_ganados = models.PositiveSmallIntegerField(default=0)
+        return self.marcador()
 
     def __str__(self):
         return f"{self.grupo}: {self.equipo1} vs {self.equipo2}"
 
+    class Meta:
+        indexes = [
+            # Historial de un equipo (torneos.estadisticas.historial): filtro por
+            # equipo y join a grupo sin leer la tabla
+            models.Index(fields=['equipo1', 'grupo', 'id'], name='partidogrupo_e1_hist_idx'),
+            models.Index(fields=['equipo2', 'grupo', 'id'], name='partidogrupo_e2_hist_idx'),
+        ]
+
 
 # --- MODELOS FASE ELIMINATORIA (BRACKET) ---
 
 
-class Partido(models.Model):
+class Partido(MarcadorSets):
     """Partido de Eliminación Directa (Octavos, Cuartos, Final)"""
 
     torneo = models.ForeignKey(
@@ -208,12 +362,10 @@ class Partido(models.Model):
         related_name="partidos_bracket_ganados",
     )
 
-    # Resultado en texto (Ej: "6-4, 6-2")
-    resultado = models.CharField(max_length=100, blank=True, null=True)
+    RESULTADO_BYE = "Bye"
 
-    # NUEVOS CAMPOS: Para guardar el detalle de sets en el bracket
-    sets_local = models.JSONField(default=list, blank=True)
-    sets_visitante = models.JSONField(default=list, blank=True)
+    # Resultado en texto (Ej: "6-4, 6-2" o "Bye"); el detalle está en las columnas de sets
+    resultado = models.CharField(max_length=100, blank=True, null=True)
 
     # Enlace al siguiente partido en el bracket
     siguiente_partido = models.ForeignKey(
@@ -226,7 +378,9 @@ class Partido(models.Model):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.__original_ganador = self.ganador
+        # Se guarda el ID (no la instancia) para no hacer una query por cada
+        # partido cargado; además es seguro en vistas async.
+        self.__original_ganador_id = self.ganador_id
 
     @property
     def nombre_ronda(self):
@@ -235,13 +389,23 @@ class Partido(models.Model):
         # Intentar obtener el max_ronda del torneo
         # Nota: Esto hace una query extra por cada partido si no se optimiza,
         # pero es necesario para la visualización correcta en formularios individuales.
-        max_ronda = self.torneo.partidos.aggregate(Max('ronda'))['ronda__max']
+        # Si el queryset ya anotó `max_ronda_torneo` (Ej: changelist del admin) se evita.
+        max_ronda = getattr(self, 'max_ronda_torneo', None)
+        if max_ronda is None:
+            max_ronda = Partido.objects.filter(torneo_id=self.torneo_id).aggregate(
+                Max('ronda')
+            )['ronda__max']
         
+        return self.nombre_de_ronda(self.ronda, max_ronda)
+
+    @staticmethod
+    def nombre_de_ronda(ronda, max_ronda):
+        """Nombre legible de `ronda` en un bracket cuya final es `max_ronda`."""
         if not max_ronda:
-            return f"Ronda {self.ronda}"
-            
-        diff = max_ronda - self.ronda
-        
+            return f"Ronda {ronda}"
+
+        diff = max_ronda - ronda
+
         if diff == 0:
             return 'Final'
         elif diff == 1:
@@ -253,17 +417,22 @@ class Partido(models.Model):
         elif diff == 4:
             return '16vos de Final'
         else:
-            return f"Ronda {self.ronda}"
+            return f"Ronda {ronda}"
 
     def save(self, *args, **kwargs):
         # Lógica de avance automático
-        if self.ganador != self.__original_ganador and self.ganador is not None:
+        if self.ganador_id != self.__original_ganador_id and self.ganador_id is not None:
 
             if self.siguiente_partido is None:  # Es la Final
-                torneo = self.torneo
-                torneo.estado = 'FN'  # FINALIZADO
-                torneo.ganador_del_torneo = self.ganador
-                torneo.save()
+                finalizado = Torneo.pasar_a(
+                    self.torneo_id, Torneo.Estado.FINALIZADO, ganador_del_torneo=self.ganador
+                )
+                if not finalizado:
+                    # Ya estaba finalizado (Ej: se corrige la final): solo cambia el
+                    # campeón; la versión la sube el post_save del partido
+                    Torneo.objects.filter(
+                        pk=self.torneo_id, estado=Torneo.Estado.FINALIZADO
+                    ).update(ganador_del_torneo=self.ganador)
 
             elif self.siguiente_partido:  # Avanza
                 siguiente = self.siguiente_partido
@@ -274,7 +443,7 @@ class Partido(models.Model):
                 siguiente.save()
 
         super().save(*args, **kwargs)
-        self.__original_ganador = self.ganador
+        self.__original_ganador_id = self.ganador_id
 
     def __str__(self):
         e1 = self.equipo1.nombre if self.equipo1 else "TBD"
@@ -283,3 +452,113 @@ class Partido(models.Model):
 
     class Meta:
         ordering = ['ronda', 'orden_partido']
+        indexes = [
+            # Historial de un equipo (torneos.estadisticas.historial)
+            models.Index(fields=['equipo1', 'torneo', 'ronda', 'id'], name='partido_e1_hist_idx'),
+            models.Index(fields=['equipo2', 'torneo', 'ronda', 'id'], name='partido_e2_hist_idx'),
+        ]
+
+
+# --- HEAD-TO-HEAD ---
+
+
+class Enfrentamiento(models.Model):
+    """
+    Resumen de los partidos entre dos equipos (head-to-head) en un torneo y fase.
+
+    El par se guarda ordenado (equipo_menor.id < equipo_mayor.id) para que haya
+    una sola fila por par. Se actualiza al guardar o borrar cada resultado (ver
+    signals) y se reconstruye con `manage.py reconstruir_enfrentamientos`. El
+    historial completo de un par es la suma de sus filas (ver resumen()).
+    """
+    class Fase(models.TextChoices):
+        GRUPOS = 'G', 'Fase de Grupos'
+        ELIMINATORIA = 'E', 'Eliminatoria'
+
+    equipo_menor = models.ForeignKey(Equipo, on_delete=models.CASCADE, related_name='+')
+    equipo_mayor = models.ForeignKey(Equipo, on_delete=models.CASCADE, related_name='+')
+    torneo = models.ForeignKey(Torneo, on_delete=models.CASCADE, related_name='enfrentamientos')
+    fase = models.CharField(max_length=1, choices=Fase.choices)
+
+    partidos = models.PositiveSmallIntegerField(default=0)
+    victorias_menor = models.PositiveSmallIntegerField(default=0)
+    victorias_mayor = models.PositiveSmallIntegerField(default=0)
+    sets_menor = models.PositiveSmallIntegerField(default=0)
+    sets_mayor = models.PositiveSmallIntegerField(default=0)
+    games_menor = models.PositiveSmallIntegerField(default=0)
+    games_mayor = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # También es el índice de búsqueda por par
+            models.UniqueConstraint(
+                fields=['equipo_menor', 'equipo_mayor', 'torneo', 'fase'],
+                name='enfrentamiento_unico',
+            ),
+            models.CheckConstraint(
+                condition=Q(equipo_menor__lt=F('equipo_mayor')),
+                name='enfrentamiento_par_ordenado',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.equipo_menor} vs {self.equipo_mayor} ({self.torneo}, {self.get_fase_display()})"
+
+    @staticmethod
+    def par(equipo_a_id, equipo_b_id):
+        return (equipo_a_id, equipo_b_id) if equipo_a_id < equipo_b_id else (equipo_b_id, equipo_a_id)
+
+    @classmethod
+    def recalcular(cls, equipo_a_id, equipo_b_id, torneo_id, fase):
+        """
+        Recalcula la fila del par en ese torneo y fase a partir de sus partidos
+        con resultado (una agregación sobre los índices *_hist_idx y un upsert).
+        """
+        menor, mayor = cls.par(equipo_a_id, equipo_b_id)
+        if fase == cls.Fase.GRUPOS:
+            partidos = PartidoGrupo.objects.filter(grupo__torneo_id=torneo_id)
+        else:
+            partidos = Partido.objects.filter(torneo_id=torneo_id)
+        partidos = partidos.filter(
+            Q(equipo1_id=menor, equipo2_id=mayor) | Q(equipo1_id=mayor, equipo2_id=menor),
+            ganador__isnull=False,
+        )
+
+        def desde_menor(campo_e1, campo_e2):
+            return Sum(Case(When(equipo1_id=menor, then=F(campo_e1)), default=F(campo_e2)))
+
+        totales = partidos.aggregate(
+            partidos=Count('pk'),
+            victorias_menor=Count('pk', filter=Q(ganador_id=menor)),
+            victorias_mayor=Count('pk', filter=Q(ganador_id=mayor)),
+            sets_menor=desde_menor('e1_sets_ganados', 'e2_sets_ganados'),
+            sets_mayor=desde_menor('e2_sets_ganados', 'e1_sets_ganados'),
+            games_menor=desde_menor('e1_games_ganados', 'e2_games_ganados'),
+            games_mayor=desde_menor('e2_games_ganados', 'e1_games_ganados'),
+        )
+        clave = dict(equipo_menor_id=menor, equipo_mayor_id=mayor, torneo_id=torneo_id, fase=fase)
+        if not totales['partidos']:
+            cls.objects.filter(**clave).delete()
+            return None
+        return cls.objects.update_or_create(**clave, defaults=totales)[0]
+
+    @classmethod
+    def resumen(cls, equipo_id, rival_id, **filtro):
+        """
+        Totales de `equipo_id` contra `rival_id` desde el lado de `equipo_id`
+        (todas las filas del par, o las que cumplan `filtro`, Ej: torneo_id=3).
+        """
+        menor, mayor = cls.par(equipo_id, rival_id)
+        propio, ajeno = ('menor', 'mayor') if equipo_id == menor else ('mayor', 'menor')
+        totales = cls.objects.filter(
+            equipo_menor_id=menor, equipo_mayor_id=mayor, **filtro
+        ).aggregate(
+            partidos=Sum('partidos'),
+            victorias=Sum(f'victorias_{propio}'),
+            derrotas=Sum(f'victorias_{ajeno}'),
+            sets_a_favor=Sum(f'sets_{propio}'),
+            sets_en_contra=Sum(f'sets_{ajeno}'),
+            games_a_favor=Sum(f'games_{propio}'),
+            games_en_contra=Sum(f'games_{ajeno}'),
+        )
+        return {clave: valor or 0 for clave, valor in totales.items()}
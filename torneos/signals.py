@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db.models import Q
-from .models import PartidoGrupo, EquipoGrupo
+from accounts.models import Division
+from equipos.models import Equipo
+from .models import Torneo, Inscripcion, Grupo, Partido, PartidoGrupo, EquipoGrupo, Enfrentamiento
 
 @receiver(post_save, sender=PartidoGrupo)
 def actualizar_tabla_de_posiciones(sender, instance, **kwargs):
@@ -11,7 +13,8 @@ def actualizar_tabla_de_posiciones(sender, instance, **kwargs):
     grupo = instance.grupo
 
     # Recalculamos para todos los equipos de este grupo
-    for equipo_grupo in EquipoGrupo.objects.filter(grupo=grupo):
+    tabla = list(EquipoGrupo.objects.filter(grupo=grupo))
+    for equipo_grupo in tabla:
         equipo = equipo_grupo.equipo
 
         # Obtenemos todos los partidos JUGADOS y FINALIZADOS de este equipo en este grupo
@@ -47,5 +50,65 @@ def actualizar_tabla_de_posiciones(sender, instance, **kwargs):
                 equipo_grupo.games_a_favor += partido.e2_games_ganados
                 equipo_grupo.games_en_contra += partido.e1_games_ganados
 
-        # Guardamos la tabla de posiciones actualizada
-        equipo_grupo.save()
\ No newline at end of file
+    # Guardamos la tabla de posiciones actualizada. bulk_update no dispara
+    # post_save: la versión del torneo la sube una sola vez el post_save de
+    # este partido (versionar_por_grupo), no una vez por fila de la tabla.
+    EquipoGrupo.objects.bulk_update(tabla, [
+        'partidos_jugados', 'partidos_ganados', 'partidos_perdidos',
+        'sets_a_favor', 'sets_en_contra', 'games_a_favor', 'games_en_contra',
+    ])
+
+
+# --- Head-to-head ---
+
+
+def _recalcular_enfrentamiento(instance, torneo_id, fase, created=False):
+    if not (instance.equipo1_id and instance.equipo2_id):
+        return
+    # Un partido recién creado sin resultado (Ej: al generar el fixture) no suma nada
+    if created and instance.ganador_id is None:
+        return
+    Enfrentamiento.recalcular(instance.equipo1_id, instance.equipo2_id, torneo_id, fase)
+
+
+@receiver([post_save, post_delete], sender=PartidoGrupo)
+def actualizar_enfrentamiento_grupo(sender, instance, created=False, **kwargs):
+    _recalcular_enfrentamiento(
+        instance, instance.grupo.torneo_id, Enfrentamiento.Fase.GRUPOS, created
+    )
+
+
+@receiver([post_save, post_delete], sender=Partido)
+def actualizar_enfrentamiento_bracket(sender, instance, created=False, **kwargs):
+    _recalcular_enfrentamiento(
+        instance, instance.torneo_id, Enfrentamiento.Fase.ELIMINATORIA, created
+    )
+
+
+# --- Versión del torneo (ETag de las páginas públicas) ---
+
+
+@receiver([post_save, post_delete], sender=Inscripcion)
+@receiver([post_save, post_delete], sender=Grupo)
+@receiver([post_save, post_delete], sender=Partido)
+def versionar_por_torneo(sender, instance, **kwargs):
+    Torneo.registrar_cambio(pk=instance.torneo_id)
+
+
+@receiver([post_save, post_delete], sender=EquipoGrupo)
+@receiver([post_save, post_delete], sender=PartidoGrupo)
+def versionar_por_grupo(sender, instance, **kwargs):
+    Torneo.registrar_cambio(grupos=instance.grupo_id)
+
+
+@receiver(post_save, sender=Division)
+def versionar_por_division(sender, instance, **kwargs):
+    # El nombre de la división se muestra en el detalle y en los listados
+    Torneo.registrar_cambio(division=instance)
+
+
+@receiver(post_save, sender=Equipo)
+def versionar_por_equipo(sender, instance, created, **kwargs):
+    # Un equipo nuevo todavía no aparece en ningún torneo
+    if not created:
+        Torneo.registrar_cambio(inscripciones__equipo=instance)
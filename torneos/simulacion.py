@@ -0,0 +1,226 @@
+"""
+Simulación vectorizada de torneos (fase de grupos + bracket).
+
+Todos los marcadores se generan con NumPy en lote: una llamada por fase o por
+ronda para TODOS los torneos simulados a la vez. La escritura en la base de
+datos se hace después con ``bulk_create``, sin pasar por ``save()`` ni por las
+señales, por eso las tablas de posiciones se calculan aquí mismo.
+"""
+import math
+from itertools import combinations
+
+import numpy as np
+
+LETRAS_GRUPOS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Clasifican los 2 primeros de cada grupo (igual que la tarea generar_bracket)
+CLASIFICADOS_POR_GRUPO = 2
+
+# Modelos de resultados disponibles para --model
+MODELO_UNIFORME = 'uniforme'
+MODELO_FUERZA = 'fuerza'
+MODELOS = (MODELO_UNIFORME, MODELO_FUERZA)
+
+
+def probabilidad_set(fuerzas, idx1, idx2, modelo):
+    """
+    Probabilidad de que el equipo idx1 gane un set contra idx2.
+    - uniforme: 50/50 siempre.
+    - fuerza: modelo Bradley-Terry sobre una fuerza latente por equipo.
+    """
+    if modelo == MODELO_UNIFORME:
+        return np.full(np.shape(idx1), 0.5)
+    return 1.0 / (1.0 + np.exp(fuerzas[idx2] - fuerzas[idx1]))
+
+
+def _games_de_sets(rng, n):
+    """Games del ganador y del perdedor para n sets (6-0..6-4, 7-5 o 7-6)."""
+    tipo = rng.random(n)
+    ganador = np.full(n, 6, dtype=np.int16)
+    perdedor = rng.integers(0, 5, n, dtype=np.int16)
+    renido = tipo < 0.25
+    ganador[renido] = 7
+    perdedor[renido] = 5
+    perdedor[tipo < 0.10] = 6  # Tie-break
+    return ganador, perdedor
+
+
+def simular_partidos(rng, prob_e1):
+    """
+    Simula partidos al mejor de 3 sets.
+
+    Recibe un array con la probabilidad de que el equipo 1 gane cada set.
+    Devuelve un diccionario de arrays: games por set de cada equipo
+    (forma (n, 3), -1 si el set no se jugó), sets y games totales, y
+    ``gana_e1`` (bool).
+    """
+    prob_e1 = np.asarray(prob_e1, dtype=float).ravel()
+    n = prob_e1.size
+    gana_set_e1 = rng.random((n, 3)) < prob_e1[:, None]
+
+    g_ganador, g_perdedor = _games_de_sets(rng, n * 3)
+    g_ganador = g_ganador.reshape(n, 3)
+    g_perdedor = g_perdedor.reshape(n, 3)
+    games_e1 = np.where(gana_set_e1, g_ganador, g_perdedor)
+    games_e2 = np.where(gana_set_e1, g_perdedor, g_ganador)
+
+    # El tercer set solo se juega si los dos primeros quedaron repartidos
+    sin_tercero = gana_set_e1[:, 0] == gana_set_e1[:, 1]
+    games_e1[sin_tercero, 2] = -1
+    games_e2[sin_tercero, 2] = -1
+    jugado = games_e1 >= 0
+
+    sets_e1 = (gana_set_e1 & jugado).sum(axis=1)
+    sets_e2 = (~gana_set_e1 & jugado).sum(axis=1)
+    return {
+        'games_e1': games_e1,
+        'games_e2': games_e2,
+        'sets_e1': sets_e1,
+        'sets_e2': sets_e2,
+        'total_games_e1': np.where(jugado, games_e1, 0).sum(axis=1),
+        'total_games_e2': np.where(jugado, games_e2, 0).sum(axis=1),
+        'gana_e1': sets_e1 > sets_e2,
+    }
+
+
+def estructura_grupos(num_equipos, tamano_grupo):
+    """
+    Reparte posiciones 0..num_equipos-1 en grupos consecutivos (el último
+    puede quedar más chico, igual que la tarea iniciar_torneo) y arma el
+    fixture de todos contra todos.
+    """
+    num_grupos = math.ceil(num_equipos / tamano_grupo)
+    grupo_de_posicion = np.arange(num_equipos) // tamano_grupo
+    numero_en_grupo = np.arange(num_equipos) % tamano_grupo + 1
+
+    pos1, pos2 = [], []
+    for g in range(num_grupos):
+        posiciones = range(g * tamano_grupo, min((g + 1) * tamano_grupo, num_equipos))
+        for a, b in combinations(posiciones, 2):
+            pos1.append(a)
+            pos2.append(b)
+    pos1 = np.array(pos1, dtype=np.int64)
+    pos2 = np.array(pos2, dtype=np.int64)
+    return {
+        'num_grupos': num_grupos,
+        'grupo_de_posicion': grupo_de_posicion,
+        'numero_en_grupo': numero_en_grupo,
+        'pos1': pos1,
+        'pos2': pos2,
+        'grupo_de_partido': grupo_de_posicion[pos1],
+    }
+
+
+def simular_lote(rng, num_torneos, num_equipos, tamano_grupo, modelo, fuerzas):
+    """
+    Simula ``num_torneos`` torneos completos sobre un plantel de
+    ``num_equipos`` equipos (índices 0..num_equipos-1 del plantel).
+
+    Devuelve arrays de índices del plantel y marcadores, listos para
+    convertirse en filas de la base de datos.
+    """
+    est = estructura_grupos(num_equipos, tamano_grupo)
+    num_grupos = est['num_grupos']
+
+    # Sorteo de grupos: una permutación del plantel por torneo
+    orden = rng.permuted(np.tile(np.arange(num_equipos), (num_torneos, 1)), axis=1)
+
+    # --- Fase de grupos ---
+    e1 = orden[:, est['pos1']]
+    e2 = orden[:, est['pos2']]
+    grupos = simular_partidos(rng, probabilidad_set(fuerzas, e1, e2, modelo))
+    partidos_por_torneo = est['pos1'].size
+
+    def por_torneo(valores):
+        return valores.reshape(num_torneos, partidos_por_torneo)
+
+    gana_e1 = por_torneo(grupos['gana_e1'])
+    sets_e1, sets_e2 = por_torneo(grupos['sets_e1']), por_torneo(grupos['sets_e2'])
+    games_e1 = por_torneo(grupos['total_games_e1'])
+    games_e2 = por_torneo(grupos['total_games_e2'])
+
+    # Tabla de posiciones por (torneo, posición)
+    filas = np.arange(num_torneos)[:, None]
+    forma = (num_torneos, num_equipos)
+    jugados = np.zeros(forma, dtype=np.int64)
+    ganados = np.zeros(forma, dtype=np.int64)
+    sets_favor = np.zeros(forma, dtype=np.int64)
+    sets_contra = np.zeros(forma, dtype=np.int64)
+    games_favor = np.zeros(forma, dtype=np.int64)
+    games_contra = np.zeros(forma, dtype=np.int64)
+    for pos, propios, ajenos, g_propios, g_ajenos, gano in (
+        (est['pos1'], sets_e1, sets_e2, games_e1, games_e2, gana_e1),
+        (est['pos2'], sets_e2, sets_e1, games_e2, games_e1, ~gana_e1),
+    ):
+        np.add.at(jugados, (filas, pos), 1)
+        np.add.at(ganados, (filas, pos), gano)
+        np.add.at(sets_favor, (filas, pos), propios)
+        np.add.at(sets_contra, (filas, pos), ajenos)
+        np.add.at(games_favor, (filas, pos), g_propios)
+        np.add.at(games_contra, (filas, pos), g_ajenos)
+
+    # Orden dentro de cada grupo: mismo criterio que EquipoGrupo.Meta.ordering
+    grupo_global = np.arange(num_torneos)[:, None] * num_grupos + est['grupo_de_posicion']
+    merito = np.lexsort(
+        (sets_contra.ravel(), -sets_favor.ravel(), -ganados.ravel(), grupo_global.ravel())
+    )
+    tamanos = np.bincount(est['grupo_de_posicion'], minlength=num_grupos)
+    inicio_grupo = np.concatenate(([0], np.cumsum(tamanos)[:-1]))
+
+    # Clasificados en orden de grupo: A1º, A2º, B1º, B2º... (como generar_octavos)
+    columnas = np.concatenate([
+        inicio_grupo[g] + np.arange(min(CLASIFICADOS_POR_GRUPO, tamanos[g]))
+        for g in range(num_grupos)
+    ])
+    por_merito = merito.reshape(num_torneos, num_equipos)[:, columnas]
+    clasificados = orden.ravel()[por_merito]
+
+    # --- Bracket ---
+    num_clasificados = clasificados.shape[1]
+    tamano_bracket = 2 ** math.ceil(math.log2(max(num_clasificados, 2)))
+    actual = np.full((num_torneos, tamano_bracket), -1, dtype=np.int64)
+    actual[:, :num_clasificados] = clasificados
+
+    rondas = []
+    while actual.shape[1] > 1:
+        b1, b2 = actual[:, 0::2], actual[:, 1::2]
+        ambos = (b1 >= 0) & (b2 >= 0)
+        prob = probabilidad_set(fuerzas, np.maximum(b1, 0), np.maximum(b2, 0), modelo)
+        res = simular_partidos(rng, prob)
+        gana = res['gana_e1'].reshape(b1.shape)
+        ganador = np.where(ambos, np.where(gana, b1, b2), np.maximum(b1, b2))
+        rondas.append({
+            'e1': b1,
+            'e2': b2,
+            'ambos': ambos,
+            'ganador': ganador,
+            'games_e1': res['games_e1'].reshape(b1.shape + (3,)),
+            'games_e2': res['games_e2'].reshape(b1.shape + (3,)),
+        })
+        actual = ganador
+
+    return {
+        'estructura': est,
+        'orden': orden,
+        'grupos': {
+            'e1': e1,
+            'e2': e2,
+            'games_e1': grupos['games_e1'].reshape(num_torneos, partidos_por_torneo, 3),
+            'games_e2': grupos['games_e2'].reshape(num_torneos, partidos_por_torneo, 3),
+            'sets_e1': sets_e1,
+            'sets_e2': sets_e2,
+            'total_games_e1': games_e1,
+            'total_games_e2': games_e2,
+            'gana_e1': gana_e1,
+        },
+        'tabla': {
+            'jugados': jugados,
+            'ganados': ganados,
+            'sets_favor': sets_favor,
+            'sets_contra': sets_contra,
+            'games_favor': games_favor,
+            'games_contra': games_contra,
+        },
+        'rondas': rondas,
+        'campeon': actual[:, 0],
+    }
@@ -0,0 +1,126 @@
+"""
+Tablero de torneos en juego para los admins.
+
+Una sola consulta agrupada por torneo: apila partidos de grupos y de bracket
+de los torneos EN_JUEGO (UNION ALL) y suma pendientes, ronda actual y total
+de cada fase. El resultado se guarda unos segundos en caché; la página lo
+vuelve a pedir por HTMX cada REFRESCO segundos.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.cache import cache
+
+from accounts.models import Division
+
+from .models import Grupo, Partido, PartidoGrupo, Torneo
+
+CLAVE_CACHE = 'tablero:en_juego'
+TTL_CACHE = 10
+# Cada cuánto refresca la página (segundos)
+REFRESCO = 15
+
+_TABLERO = """
+    WITH partidos AS (
+        SELECT g.torneo_id, 1 AS de_grupo,
+               CASE WHEN p.ganador_id IS NULL THEN 1 ELSE 0 END AS pendiente,
+               0 AS jugable, NULL AS ronda
+        FROM {partido_grupo} p
+        JOIN {grupo} g ON g.id = p.grupo_id
+        JOIN {torneo} t ON t.id = g.torneo_id
+        WHERE t.estado = %(estado)s
+        UNION ALL
+        SELECT p.torneo_id, 0,
+               -- Un bye sin equipos nunca tiene ganador: no queda pendiente
+               CASE WHEN p.ganador_id IS NULL AND COALESCE(p.resultado, '') <> %(bye)s
+                    THEN 1 ELSE 0 END,
+               CASE WHEN p.ganador_id IS NULL AND p.equipo1_id IS NOT NULL
+                         AND p.equipo2_id IS NOT NULL THEN 1 ELSE 0 END,
+               p.ronda
+        FROM {partido} p
+        JOIN {torneo} t ON t.id = p.torneo_id
+        WHERE t.estado = %(estado)s
+    )
+    SELECT t.id, t.nombre, t.actualizado, d.nombre AS division_nombre,
+           COALESCE(SUM(p.de_grupo), 0) AS partidos_grupo,
+           COALESCE(SUM(p.de_grupo * p.pendiente), 0) AS pendientes_grupo,
+           COUNT(p.ronda) AS partidos_eliminacion,
+           COALESCE(SUM((1 - p.de_grupo) * p.pendiente), 0) AS pendientes_eliminacion,
+           COALESCE(SUM(p.jugable), 0) AS jugables_eliminacion,
+           MIN(CASE WHEN p.pendiente = 1 THEN p.ronda END) AS ronda_pendiente,
+           MAX(p.ronda) AS ultima_ronda
+    FROM {torneo} t
+    JOIN {division} d ON d.id = t.division_id
+    LEFT JOIN partidos p ON p.torneo_id = t.id
+    WHERE t.estado = %(estado)s
+    GROUP BY t.id, t.nombre, t.actualizado, d.nombre
+    ORDER BY t.fecha_inicio, t.id
+"""
+
+
+@dataclass
+class EstadoTorneo:
+    pk: int
+    nombre: str
+    division: str
+    actualizado: datetime
+    partidos_grupo: int
+    pendientes_grupo: int
+    partidos_eliminacion: int
+    pendientes_eliminacion: int
+    # Pendientes con los dos equipos definidos (se pueden jugar ya)
+    jugables_eliminacion: int
+    ronda_pendiente: int | None
+    ultima_ronda: int | None
+
+    @property
+    def ronda_actual(self):
+        if not self.partidos_eliminacion:
+            return 'Fase de grupos' if self.partidos_grupo else 'Sin partidos'
+        if self.ronda_pendiente is None:
+            return 'Final jugada'
+        return Partido.nombre_de_ronda(self.ronda_pendiente, self.ultima_ronda)
+
+    @property
+    def progreso_grupos(self):
+        if not self.partidos_grupo:
+            return 0
+        return round(100 * (self.partidos_grupo - self.pendientes_grupo) / self.partidos_grupo)
+
+    @property
+    def grupos_cerrados(self):
+        return bool(self.partidos_grupo) and not self.pendientes_grupo
+
+
+def consulta_tablero():
+    sql = _TABLERO.format(
+        partido_grupo=PartidoGrupo._meta.db_table,
+        partido=Partido._meta.db_table,
+        grupo=Grupo._meta.db_table,
+        torneo=Torneo._meta.db_table,
+        division=Division._meta.db_table,
+    )
+    # raw() para que `actualizado` pase por los conversores del backend
+    return [
+        EstadoTorneo(
+            pk=torneo.pk,
+            nombre=torneo.nombre,
+            division=torneo.division_nombre,
+            actualizado=torneo.actualizado,
+            partidos_grupo=torneo.partidos_grupo,
+            pendientes_grupo=torneo.pendientes_grupo,
+            partidos_eliminacion=torneo.partidos_eliminacion,
+            pendientes_eliminacion=torneo.pendientes_eliminacion,
+            jugables_eliminacion=torneo.jugables_eliminacion,
+            ronda_pendiente=torneo.ronda_pendiente,
+            ultima_ronda=torneo.ultima_ronda,
+        )
+        for torneo in Torneo.objects.raw(
+            sql, {'estado': Torneo.Estado.EN_JUEGO, 'bye': Partido.RESULTADO_BYE}
+        )
+    ]
+
+
+def tablero():
+    """Torneos en juego con su avance; como mucho TTL_CACHE segundos de atraso."""
+    return cache.get_or_set(CLAVE_CACHE, consulta_tablero, TTL_CACHE)
@@ -0,0 +1,233 @@
+import math
+from itertools import combinations
+from random import shuffle
+
+from django.db import connection, transaction
+from django.urls import reverse
+
+from core import siembra
+from core.tareas import ErrorSinReintento, registrar, reportar
+
+from .estadisticas import posiciones, victorias_entre
+from .models import Torneo, Partido, Grupo, EquipoGrupo, PartidoGrupo, Enfrentamiento
+
+
+def _url_gestion(torneo_id):
+    return reverse('torneos:admin_manage', kwargs={'pk': torneo_id})
+
+
+def generar_partidos_grupos(torneo, equipos, grupo_obj):
+    """Crea un partido de 'todos contra todos' para los equipos dentro de un grupo."""
+    partidos_a_crear = []
+    for equipo1, equipo2 in combinations(equipos, 2):
+        partidos_a_crear.append(
+            PartidoGrupo(grupo=grupo_obj, equipo1=equipo1, equipo2=equipo2)
+        )
+    PartidoGrupo.objects.bulk_create(partidos_a_crear)
+
+
+@registrar('crear_torneo_prueba')
+def crear_torneo_prueba(tarea, num_equipos=24):
+    torneo = siembra.crear_torneo_prueba(
+        num_equipos=num_equipos,
+        progreso=lambda porcentaje, mensaje: reportar(tarea, porcentaje, mensaje),
+    )
+    return _url_gestion(torneo.pk)
+
+
+@registrar('iniciar_torneo')
+def iniciar_torneo(tarea, torneo_id):
+    """Sortea los grupos y genera sus partidos (todos contra todos)."""
+    torneo = Torneo.objects.get(pk=torneo_id)
+
+    with transaction.atomic():
+        # Primero el cambio de estado: si la tarea se encoló dos veces, la
+        # segunda espera a que esta termine y no lo encuentra ABIERTO.
+        # Si algo falla, el rollback lo deja abierto de nuevo.
+        if not Torneo.pasar_a(torneo.pk, Torneo.Estado.EN_JUEGO):
+            raise ErrorSinReintento("El torneo ya no está abierto.")
+        torneo.estado = Torneo.Estado.EN_JUEGO
+
+        inscripciones = torneo.inscripciones.select_related('equipo')
+        count = inscripciones.count()
+
+        # Limpiar grupos anteriores si existen (para evitar duplicados al reiniciar)
+        if torneo.grupos.exists():
+            torneo.grupos.all().delete()
+
+        if count < 4:
+            raise ErrorSinReintento(f"Se necesitan al menos 4 equipos. Hay {count}.")
+
+        equipos = [i.equipo for i in inscripciones]
+        shuffle(equipos)
+
+        # Usar el tamaño de grupo configurado en el torneo
+        equipos_por_grupo = torneo.equipos_por_grupo
+        num_grupos = (count + equipos_por_grupo - 1) // equipos_por_grupo
+        letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+        for i in range(num_grupos):
+            grupo = Grupo.objects.create(torneo=torneo, nombre=f"Grupo {letras[i]}")
+            equipos_del_grupo = []
+            for _ in range(equipos_por_grupo):
+                if equipos:
+                    equipos_del_grupo.append(equipos.pop())
+
+            for idx, eq in enumerate(equipos_del_grupo, start=1):
+                EquipoGrupo.objects.create(grupo=grupo, equipo=eq, numero=idx)
+
+            generar_partidos_grupos(torneo, equipos_del_grupo, grupo)
+            reportar(tarea, int(90 * (i + 1) / num_grupos), f"Grupo {letras[i]} generado")
+
+    reportar(tarea, 100, f"Fase de Grupos generada: {num_grupos} grupos creados.")
+    return _url_gestion(torneo.pk)
+
+
+@registrar('generar_bracket')
+def generar_bracket(tarea, torneo_id):
+    """Arma el bracket de eliminación con los 2 primeros de cada grupo."""
+    torneo = Torneo.objects.get(pk=torneo_id)
+    if torneo.partidos.exists():
+        raise ErrorSinReintento("La fase de eliminación ya fue generada.")
+
+    # 1. Obtener clasificados (1ro y 2do de cada grupo)
+    clasificados = []
+    grupos = torneo.grupos.all().order_by('nombre').prefetch_related('tabla__equipo')
+    victorias = victorias_entre(torneo.pk)
+
+    for grupo in grupos:
+        # Ordenada por mérito (PG, head-to-head entre dos empatados, sets)
+        tabla = posiciones(grupo.tabla.all(), victorias)
+        # Clasifican los primeros 2 de cada grupo (estándar para grupos de 3 o 4 equipos)
+        num_clasificados_por_grupo = 2
+        for i in range(min(len(tabla), num_clasificados_por_grupo)):
+            clasificados.append(tabla[i].equipo)
+
+    num_equipos = len(clasificados)
+
+    if num_equipos < 4:
+        raise ErrorSinReintento(
+            f"Solo hay {num_equipos} clasificados. Se necesitan al menos 4."
+        )
+    reportar(tarea, 20, f"{num_equipos} clasificados")
+
+    # 2. Calcular tamaño del bracket (Potencia de 2)
+    bracket_size = 2 ** math.ceil(math.log2(num_equipos))
+    num_byes = bracket_size - num_equipos
+    slots = clasificados + [None] * num_byes
+
+    # 3. Calcular número de rondas
+    # bracket_size = 4 -> 2 rondas (Semifinal=1, Final=2)
+    # bracket_size = 8 -> 3 rondas (Cuartos=1, Semifinal=2, Final=3)
+    # bracket_size = 16 -> 4 rondas (Octavos=1, Cuartos=2, Semifinal=3, Final=4)
+    num_rondas = int(math.log2(bracket_size))
+    ronda_inicio = 1  # Siempre empezamos en ronda 1
+
+    with transaction.atomic():
+        # Toma la fila del torneo (UPDATE condicional) antes de volver a
+        # mirar: dos generaciones simultáneas se ordenan y la segunda falla.
+        if not Torneo.registrar_cambio(pk=torneo.pk, estado=Torneo.Estado.EN_JUEGO):
+            raise ErrorSinReintento("El torneo no está en juego.")
+        if torneo.partidos.exists():
+            raise ErrorSinReintento("La fase de eliminación ya fue generada.")
+
+        # 4. Generar todas las rondas desde la primera hasta la final
+        partidos_por_ronda = {}
+
+        # Generar partidos de la ronda inicial (la más grande)
+        cant_partidos_r1 = bracket_size // 2
+        partidos_por_ronda[ronda_inicio] = []
+
+        for i in range(cant_partidos_r1):
+            e1 = slots.pop(0) if slots else None
+            e2 = slots.pop(0) if slots else None
+
+            p = Partido.objects.create(
+                torneo=torneo,
+                ronda=ronda_inicio,
+                orden_partido=i + 1,
+                equipo1=e1,
+                equipo2=e2,
+            )
+            partidos_por_ronda[ronda_inicio].append(p)
+
+            # MANEJO DE BYES
+            if e1 and not e2:
+                p.ganador = e1
+                p.resultado = Partido.RESULTADO_BYE
+                p.save()
+            elif not e1 and e2:
+                p.ganador = e2
+                p.resultado = Partido.RESULTADO_BYE
+                p.save()
+            elif not e1 and not e2:
+                p.resultado = Partido.RESULTADO_BYE
+                p.save()
+
+        # 5. Generar las rondas superiores (vacías por ahora)
+        for ronda_num in range(2, num_rondas + 1):
+            cant_partidos = bracket_size // (2 ** ronda_num)
+            partidos_por_ronda[ronda_num] = []
+
+            for i in range(cant_partidos):
+                p = Partido.objects.create(
+                    torneo=torneo,
+                    ronda=ronda_num,
+                    orden_partido=i + 1,
+                )
+                partidos_por_ronda[ronda_num].append(p)
+        reportar(tarea, 70, "Enlazando rondas...")
+
+        # 6. Enlazar partidos con siguiente_partido
+        for ronda_num in range(1, num_rondas):
+            partidos_actuales = partidos_por_ronda[ronda_num]
+            partidos_siguientes = partidos_por_ronda.get(ronda_num + 1, [])
+
+            for i, partido in enumerate(partidos_actuales):
+                if partidos_siguientes:
+                    partido.siguiente_partido = partidos_siguientes[i // 2]
+                    partido.save()
+
+    reportar(tarea, 100, f"Bracket de {bracket_size} generado con {num_equipos} equipos.")
+    return _url_gestion(torneo.pk)
+
+
+def borrar_bracket(torneo_id):
+    """
+    Borra los partidos de eliminación de un torneo EN_JUEGO con cuatro
+    sentencias, sin importar el tamaño del cuadro. Devuelve cuántos borró, o
+    None si el torneo no está en juego (no toca nada).
+
+    `.delete()` del ORM lee cada partido, pone en NULL los siguiente_partido
+    que apuntan a él y dispara las señales por fila (head-to-head y versión
+    del torneo). Aquí se hace lo mismo una sola vez: el UPDATE condicional
+    del torneo (sube la versión y toma la fila), desenlazar, borrar y limpiar
+    los enfrentamientos de la fase eliminatoria, que salían de esos partidos.
+    Hay que llamarla dentro de una transacción.
+    """
+    # Un torneo finalizado tiene campeón salido del bracket: no se borra
+    if not Torneo.registrar_cambio(pk=torneo_id, estado=Torneo.Estado.EN_JUEGO):
+        return None
+    # Las FK diferidas (PostgreSQL, SQLite) no lo necesitan, el resto de backends sí
+    Partido.objects.filter(torneo_id=torneo_id, siguiente_partido__isnull=False).update(
+        siguiente_partido=None
+    )
+    with connection.cursor() as c:
+        c.execute(f"DELETE FROM {Partido._meta.db_table} WHERE torneo_id = %s", [torneo_id])
+        borrados = c.rowcount
+    # Sin dependientes ni señales: un solo DELETE
+    Enfrentamiento.objects.filter(
+        torneo_id=torneo_id, fase=Enfrentamiento.Fase.ELIMINATORIA
+    ).delete()
+    return borrados
+
+
+@registrar('reset_bracket')
+def reset_bracket(tarea, torneo_id):
+    """Elimina todos los partidos de eliminación del torneo."""
+    with transaction.atomic():
+        if borrar_bracket(torneo_id) is None:
+            raise ErrorSinReintento("Solo se puede borrar el bracket de un torneo en juego.")
+    reportar(tarea, 100, "Bracket eliminado. Puedes generar uno nuevo.")
+    return _url_gestion(torneo_id)
+
@@ -1,9 +1,11 @@
 from django import template
+from core.sqlcomentarios import etiqueta_sql
 from torneos.models import EquipoGrupo
 
 register = template.Library()
 
 @register.simple_tag
+@etiqueta_sql
 def get_team_code(equipo, torneo):
     """
     Devuelve el código del equipo en el torneo (Ej: "A1", "B2").
@@ -36,6 +38,7 @@ def get_team_code(equipo, torneo):
     return equipo.nombre
 
 @register.simple_tag
+@etiqueta_sql
 def get_team_info(equipo, torneo):
     """
     Devuelve un diccionario con el código y nombre del equipo.
@@ -1,3 +1,860 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from importlib import import_module
+from io import BytesIO, StringIO
+from unittest import mock
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpResponse
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import Division
+from core import portada
+from core.models import Tarea
+from core.tareas import ErrorSinReintento
+from core.siembra import crear_bracket_jugado, crear_equipos, crear_jugadores
+
+from .models import (
+    Enfrentamiento, EquipoGrupo, Grupo, Inscripcion, Partido, PartidoGrupo, ResultadoDesactualizado, Torneo,
+)
+from . import compartir, congelado, tablero
+from .bracket import abracket, bracket
+from .estadisticas import posiciones, reconstruir_enfrentamientos, victorias_entre
+from .tareas import borrar_bracket, iniciar_torneo
+
+User = get_user_model()
+
+
+class BorrarBracketTests(TestCase):
+    """borrar_bracket(): sentencias fijas y torneo consistente después del reset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(cls.division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 129)
+            for letra in ('a', 'b')
+        ])
+        cls.equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), cls.division)
+
+    def crear_torneo(self):
+        return Torneo.objects.create(
+            nombre="Torneo", division=self.division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now() + timedelta(days=7),
+            estado=Torneo.Estado.EN_JUEGO,
+        )
+
+    def test_sentencias_fijas_sin_importar_el_tamano(self):
+        for num_equipos in (8, 128):
+            with self.subTest(equipos=num_equipos):
+                torneo = self.crear_torneo()
+                crear_bracket_jugado(torneo, self.equipos[:num_equipos])
+                # UPDATE del torneo, desenlazar, DELETE de partidos y de enfrentamientos
+                with self.assertNumQueries(4):
+                    borrados = borrar_bracket(torneo.pk)
+                self.assertEqual(borrados, num_equipos - 1)
+
+    def test_torneo_consistente_despues_del_reset(self):
+        torneo = self.crear_torneo()
+        crear_bracket_jugado(torneo, self.equipos)
+        otro = self.crear_torneo()
+        crear_bracket_jugado(otro, self.equipos[:8])
+        version = Torneo.objects.get(pk=torneo.pk).version
+
+        home = async_to_sync(portada.version)()
+
+        borrar_bracket(torneo.pk)
+
+        torneo.refresh_from_db()
+        self.assertFalse(Partido.objects.filter(torneo=torneo).exists())
+        self.assertFalse(Partido.objects.filter(siguiente_partido__torneo=torneo).exists())
+        self.assertFalse(
+            Enfrentamiento.objects.filter(torneo=torneo, fase=Enfrentamiento.Fase.ELIMINATORIA).exists()
+        )
+        self.assertEqual(torneo.estado, Torneo.Estado.EN_JUEGO)
+        self.assertIsNone(torneo.ganador_del_torneo_id)
+        self.assertGreater(torneo.version, version)
+        # La Home (que muestra el torneo) cambia de versión
+        self.assertNotEqual(async_to_sync(portada.version)(), home)
+        # Los demás torneos no se tocan
+        self.assertEqual(Partido.objects.filter(torneo=otro).count(), 7)
+        self.assertTrue(Enfrentamiento.objects.filter(torneo=otro).exists())
+
+    def test_torneo_finalizado_queda_intacto(self):
+        torneo = self.crear_torneo()
+        final = crear_bracket_jugado(torneo, self.equipos[:8])
+        # La final se juega con save(): el torneo pasa a FINALIZADO con campeón
+        final.cargar_sets([(6, 2), (6, 2)])
+        final.ganador = final.equipo1
+        final.save()
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(borrar_bracket(torneo.pk))
+
+        torneo.refresh_from_db()
+        self.assertEqual(Partido.objects.filter(torneo=torneo).count(), 7)
+        self.assertEqual(torneo.estado, Torneo.Estado.FINALIZADO)
+        self.assertEqual(torneo.ganador_del_torneo_id, final.equipo1_id)
+
+
+class CongeladoTests(TestCase):
+    """Página congelada de un torneo finalizado: render propio, sin mensajes, legible por el servidor."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 5)
+            for letra in ('a', 'b')
+        ])
+        equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        cls.torneo = Torneo.objects.create(
+            nombre="Torneo", division=division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=Torneo.Estado.EN_JUEGO,
+        )
+        final = crear_bracket_jugado(cls.torneo, equipos)
+        final.cargar_sets([(6, 2), (6, 2)])
+        final.ganador = final.equipo1
+        final.save()
+        cls.torneo.refresh_from_db()
+
+    def setUp(self):
+        self.raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.raiz)
+        ajustes = override_settings(CONGELADOS_ROOT=self.raiz)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.url = reverse('torneos:detail', args=[self.torneo.pk])
+        self.archivo = congelado.ruta(self.torneo.pk, self.torneo.version, 'html')
+
+    def dejar_mensaje(self, texto):
+        """Cookie de mensajes flash como la que deja un redirect."""
+        storage = CookieStorage(RequestFactory().get('/'))
+        storage.add(messages.SUCCESS, texto)
+        respuesta = HttpResponse()
+        storage.update(respuesta)
+        self.client.cookies.update(respuesta.cookies)
+
+    def test_primera_visita_congela_y_la_siguiente_sirve_el_archivo(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(self.archivo.exists())
+        self.assertEqual(self.archivo.stat().st_mode & 0o777, 0o644)
+        self.assertEqual(b''.join(respuesta.streaming_content), self.archivo.read_bytes())
+
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(self.url)
+        self.assertEqual(b''.join(respuesta.streaming_content), self.archivo.read_bytes())
+
+    def test_visita_con_mensajes_no_congela(self):
+        self.dejar_mensaje("Mensaje de otra página")
+        respuesta = self.client.get(self.url)
+        self.assertContains(respuesta, "Mensaje de otra página")
+        self.assertFalse(self.archivo.exists())
+        # La respuesta borra la cookie; el cliente de tests la deja vacía
+        self.assertEqual(respuesta.cookies[CookieStorage.cookie_name]['max-age'], 0)
+        del self.client.cookies[CookieStorage.cookie_name]
+
+        # La próxima visita limpia congela una página sin ese mensaje
+        self.client.get(self.url)
+        self.assertTrue(self.archivo.exists())
+        self.assertNotIn("Mensaje de otra página", self.archivo.read_text())
+
+
+class ResultadoConcurrenteTests(TestCase):
+    """Dos admins cargando el mismo partido: el segundo no pisa al primero."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 3)
+            for letra in ('a', 'b')
+        ])
+        equipo1, equipo2 = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        torneo = Torneo.objects.create(
+            nombre="Torneo", division=division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=Torneo.Estado.EN_JUEGO,
+        )
+        grupo = Grupo.objects.create(torneo=torneo, nombre="Grupo 1")
+        cls.partido = PartidoGrupo.objects.create(grupo=grupo, equipo1=equipo1, equipo2=equipo2)
+        cls.admin = User.objects.create_superuser(
+            email='admin@ejemplo.com', password='admin123', nombre='Admin', apellido='Test'
+        )
+
+    def cargar(self, partido, sets):
+        partido.cargar_sets(sets)
+        partido.ganador = partido.ganador_por_sets()
+
+    def test_segundo_guardado_con_la_misma_version_falla(self):
+        primero = PartidoGrupo.objects.get(pk=self.partido.pk)
+        segundo = PartidoGrupo.objects.get(pk=self.partido.pk)
+
+        self.cargar(primero, [(6, 2), (6, 3)])
+        primero.guardar_resultado(primero.version)
+        self.cargar(segundo, [(2, 6), (3, 6)])
+        with self.assertRaises(ResultadoDesactualizado):
+            segundo.guardar_resultado(segundo.version)
+
+        guardado = PartidoGrupo.objects.get(pk=self.partido.pk)
+        self.assertEqual(guardado.version, 2)
+        self.assertEqual(guardado.ganador_id, self.partido.equipo1_id)
+
+    def test_vista_avisa_el_conflicto_sin_pisar(self):
+        self.client.force_login(self.admin)
+        url = reverse('torneos:cargar_resultado_grupo', args=[self.partido.pk])
+        version = self.client.get(url).context['form'].initial['version']
+
+        otro = PartidoGrupo.objects.get(pk=self.partido.pk)
+        self.cargar(otro, [(6, 2), (6, 3)])
+        otro.guardar_resultado(otro.version)
+
+        respuesta = self.client.post(url, {
+            'version': version,
+            'e1_set1': 2, 'e2_set1': 6, 'e1_set2': 3, 'e2_set2': 6,
+        }, HTTP_HX_REQUEST='true')
+        self.assertContains(respuesta, "Otro admin guardó este partido")
+        # El formulario vuelve con la versión nueva para poder reintentar
+        self.assertEqual(respuesta.context['form'].initial['version'], version + 1)
+        guardado = PartidoGrupo.objects.get(pk=self.partido.pk)
+        self.assertEqual((guardado.e1_set1, guardado.e2_set1), (6, 2))
+        self.assertEqual(guardado.ganador_id, self.partido.equipo1_id)
+
+
+@override_settings(TAREAS_EN_HILO=False)
+class AccionesIdempotentesTests(TestCase):
+    """Acciones de gestión del torneo: un reenvío o un estado viejo no repiten nada."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(cls.division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 5)
+            for letra in ('a', 'b')
+        ])
+        cls.equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), cls.division)
+        cls.admin = User.objects.create_superuser(
+            email='admin@ejemplo.com', password='admin123', nombre='Admin', apellido='Test'
+        )
+
+    def crear_torneo(self, estado=Torneo.Estado.ABIERTO):
+        return Torneo.objects.create(
+            nombre="Torneo", division=self.division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=estado,
+        )
+
+    def test_doble_envio_con_la_misma_clave_encola_una_tarea(self):
+        torneo = self.crear_torneo()
+        self.client.force_login(self.admin)
+        url = reverse('torneos:admin_manage', args=[torneo.pk])
+        clave = self.client.get(url).context['clave_accion']
+
+        for _ in range(2):
+            respuesta = self.client.post(url, {'action': 'iniciar_torneo', 'clave': clave})
+            self.assertRedirects(respuesta, url, fetch_redirect_response=False)
+
+        self.assertEqual(Tarea.objects.filter(nombre='iniciar_torneo').count(), 1)
+
+    def test_pasar_a_desde_otro_estado_no_hace_nada(self):
+        torneo = self.crear_torneo()
+        self.assertFalse(Torneo.pasar_a(torneo.pk, Torneo.Estado.FINALIZADO))
+        guardado = Torneo.objects.get(pk=torneo.pk)
+        self.assertEqual(guardado.estado, Torneo.Estado.ABIERTO)
+        self.assertEqual(guardado.version, torneo.version)
+
+    def test_iniciar_con_menos_de_4_equipos_deshace_todo(self):
+        torneo = self.crear_torneo()
+        Inscripcion.objects.bulk_create([Inscripcion(torneo=torneo, equipo=e) for e in self.equipos[:3]])
+        grupo = Grupo.objects.create(torneo=torneo, nombre="Grupo A")
+        version = Torneo.objects.get(pk=torneo.pk).version
+
+        with self.assertRaises(ErrorSinReintento):
+            iniciar_torneo(None, torneo.pk)
+
+        guardado = Torneo.objects.get(pk=torneo.pk)
+        self.assertEqual(guardado.estado, Torneo.Estado.ABIERTO)
+        self.assertEqual(guardado.version, version)
+        self.assertTrue(Grupo.objects.filter(pk=grupo.pk).exists())
+
+    def test_la_final_finaliza_con_campeon_en_un_update(self):
+        torneo = self.crear_torneo(Torneo.Estado.EN_JUEGO)
+        final = crear_bracket_jugado(torneo, self.equipos)
+        final.cargar_sets([(6, 2), (6, 2)])
+        final.ganador = final.equipo1
+        final.save()
+
+        torneo.refresh_from_db()
+        self.assertEqual(torneo.estado, Torneo.Estado.FINALIZADO)
+        self.assertEqual(torneo.ganador_del_torneo_id, final.equipo1_id)
+
+        # Corregir la final cambia el campeón sin volver a "finalizar"
+        final.cargar_sets([(2, 6), (2, 6)])
+        final.ganador = final.equipo2
+        final.save()
+        torneo.refresh_from_db()
+        self.assertEqual(torneo.estado, Torneo.Estado.FINALIZADO)
+        self.assertEqual(torneo.ganador_del_torneo_id, final.equipo2_id)
+
+
+class VersionTorneoTests(TestCase):
+    """La versión del torneo es el ETag del detalle: sube una vez por cambio."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 5)
+            for letra in ('a', 'b')
+        ])
+        equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        cls.torneo = Torneo.objects.create(
+            nombre="Torneo", division=division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=Torneo.Estado.EN_JUEGO,
+        )
+        grupo = Grupo.objects.create(torneo=cls.torneo, nombre="Grupo A")
+        EquipoGrupo.objects.bulk_create([
+            EquipoGrupo(grupo=grupo, equipo=equipo, numero=i) for i, equipo in enumerate(equipos, start=1)
+        ])
+        cls.partido = PartidoGrupo.objects.create(grupo=grupo, equipo1=equipos[0], equipo2=equipos[1])
+
+    def version(self):
+        return Torneo.objects.values_list('version', flat=True).get(pk=self.torneo.pk)
+
+    def cargar_resultado(self):
+        self.partido.cargar_sets([(6, 2), (6, 3)])
+        self.partido.ganador = self.partido.ganador_por_sets()
+        self.partido.guardar_resultado(self.partido.version)
+
+    def test_un_resultado_sube_la_version_una_vez(self):
+        antes = self.version()
+        self.cargar_resultado()
+        self.assertEqual(self.version(), antes + 1)
+        # La tabla se recalculó igual
+        ganador = EquipoGrupo.objects.get(grupo=self.partido.grupo, equipo=self.partido.equipo1)
+        self.assertEqual((ganador.partidos_jugados, ganador.partidos_ganados), (1, 1))
+
+    def test_304_hasta_que_cambia_la_version(self):
+        url = reverse('torneos:detail', args=[self.torneo.pk])
+        etag = self.client.get(url)['ETag']
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+        self.cargar_resultado()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+
+migracion_sets = import_module('torneos.migrations.0008_partido_marcador_sets')
+
+
+class ParesDeSetsTests(TestCase):
+    """Lectura de las listas JSON viejas en la migración 0008."""
+
+    def test_listas_completas(self):
+        self.assertEqual(migracion_sets.pares_de_sets([6, 4, 7], [4, 6, 5]), [(6, 4), (4, 6), (7, 5)])
+
+    def test_texto_y_listas_a_medias(self):
+        casos = [
+            ((["6", " 3 "], ["2", "6"]), [(6, 2), (3, 6)]),
+            # Un set sin el games del rival no se inventa
+            (([6, 6, 7], [2, 4]), [(6, 2), (6, 4)]),
+            (([6, "", None, "x", -1, True], [2, 6, 6, 6, 6, 6]), [(6, 2)]),
+            (([6, 6, 6, 6], [1, 1, 1, 1]), [(6, 1)] * 3),
+            (("6-2 6-3", []), []),
+            ((None, [6]), []),
+            (([{"e1": 6}], [2]), []),
+        ]
+        for (local, visitante), esperado in casos:
+            with self.subTest(local=local, visitante=visitante):
+                self.assertEqual(migracion_sets.pares_de_sets(local, visitante), esperado)
+
+
+class MigracionMarcadorSetsTests(TransactionTestCase):
+    """0008 ida y vuelta sobre datos reales: columnas por set <-> listas JSON."""
+
+    antes = [('torneos', '0007_torneo_version')]
+    despues = [('torneos', '0008_partido_marcador_sets')]
+
+    def migrar(self, destino):
+        executor = MigrationExecutor(connection)
+        executor.migrate(destino)
+        return executor.loader.project_state(destino).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_ida_y_vuelta(self):
+        apps = self.migrar(self.antes)
+        Division = apps.get_model('accounts', 'Division')
+        Torneo = apps.get_model('torneos', 'Torneo')
+        Partido = apps.get_model('torneos', 'Partido')
+        torneo = Torneo.objects.create(
+            nombre="Torneo", division=Division.objects.create(nombre="Séptima"),
+            fecha_inicio=timezone.now().date(), fecha_limite_inscripcion=timezone.now(),
+        )
+        datos = {
+            'completo': ([6, 4, 7], [3, 6, 5]),
+            'texto': (["6", "6"], ["1", "2"]),
+            'a_medias': ([6, 6, "x"], [4]),
+            'sin_jugar': ([], []),
+        }
+        ids = {
+            nombre: Partido.objects.create(
+                torneo=torneo, ronda=1, orden_partido=n, sets_local=local, sets_visitante=visitante,
+            ).pk
+            for n, (nombre, (local, visitante)) in enumerate(datos.items(), start=1)
+        }
+
+        Partido = self.migrar(self.despues).get_model('torneos', 'Partido')
+        completo = Partido.objects.get(pk=ids['completo'])
+        self.assertEqual(
+            [(completo.e1_set1, completo.e2_set1), (completo.e1_set3, completo.e2_set3)], [(6, 3), (7, 5)]
+        )
+        self.assertEqual((completo.e1_sets_ganados, completo.e2_sets_ganados), (2, 1))
+        self.assertEqual((completo.e1_games_ganados, completo.e2_games_ganados), (17, 14))
+        texto = Partido.objects.get(pk=ids['texto'])
+        self.assertEqual((texto.e1_sets_ganados, texto.e1_games_ganados, texto.e2_games_ganados), (2, 12, 3))
+        a_medias = Partido.objects.get(pk=ids['a_medias'])
+        self.assertEqual((a_medias.e1_set1, a_medias.e2_set1, a_medias.e1_set2), (6, 4, None))
+        sin_jugar = Partido.objects.get(pk=ids['sin_jugar'])
+        self.assertIsNone(sin_jugar.e1_set1)
+
+        # Vuelta atrás: las listas se rearman desde las columnas (ya como enteros)
+        Partido = self.migrar(self.antes).get_model('torneos', 'Partido')
+        listas = {
+            nombre: (partido.sets_local, partido.sets_visitante)
+            for nombre, partido in ((n, Partido.objects.get(pk=pk)) for n, pk in ids.items())
+        }
+        self.assertEqual(listas, {
+            'completo': ([6, 4, 7], [3, 6, 5]),
+            'texto': ([6, 6], [1, 2]),
+            'a_medias': ([6], [4]),
+            'sin_jugar': ([], []),
+        })
+
+
+class HeadToHeadTests(TestCase):
+    """Desempate por partido entre sí (Enfrentamiento) en las tablas de grupo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 8)
+            for letra in ('a', 'b')
+        ])
+        cls.equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        cls.torneo = Torneo.objects.create(
+            nombre="Torneo", division=division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=Torneo.Estado.EN_JUEGO,
+        )
+
+    def crear_grupo(self, nombre, equipos):
+        grupo = Grupo.objects.create(torneo=self.torneo, nombre=nombre)
+        EquipoGrupo.objects.bulk_create([
+            EquipoGrupo(grupo=grupo, equipo=equipo, numero=i) for i, equipo in enumerate(equipos, start=1)
+        ])
+        return grupo
+
+    def jugar(self, grupo, equipo1, equipo2, sets):
+        partido = PartidoGrupo(grupo=grupo, equipo1=equipo1, equipo2=equipo2)
+        partido.cargar_sets(sets)
+        partido.ganador = partido.ganador_por_sets()
+        partido.save()
+
+    def tabla(self, grupo):
+        return [fila.equipo for fila in posiciones(grupo.tabla.all(), victorias_entre(self.torneo.pk))]
+
+    def test_dos_empatados_los_ordena_el_partido_entre_ellos(self):
+        t1, t2, t3, t4 = self.equipos[:4]
+        grupo = self.crear_grupo("Grupo A", [t1, t2, t3, t4])
+        self.jugar(grupo, t1, t3, [(6, 0), (6, 0)])
+        self.jugar(grupo, t1, t4, [(6, 0), (6, 0)])
+        self.jugar(grupo, t2, t1, [(7, 5), (6, 7), (7, 6)])
+        self.jugar(grupo, t2, t3, [(4, 6), (4, 6)])
+        self.jugar(grupo, t2, t4, [(6, 4), (7, 5)])
+        self.jugar(grupo, t4, t3, [(6, 4), (6, 4)])
+
+        # Por sets iría primero t1; t2 le ganó el partido entre ellos
+        self.assertEqual(grupo.tabla.first().equipo, t1)
+        self.assertEqual(self.tabla(grupo), [t2, t1, t4, t3])
+
+    def test_triple_empate_queda_el_orden_por_sets(self):
+        a, b, c = self.equipos[4:7]
+        grupo = self.crear_grupo("Grupo B", [a, b, c])
+        self.jugar(grupo, a, b, [(6, 0), (6, 0)])
+        self.jugar(grupo, b, c, [(6, 4), (4, 6), (6, 4)])
+        self.jugar(grupo, c, a, [(6, 4), (6, 4)])
+
+        self.assertEqual(self.tabla(grupo), [c, a, b])
+
+    def test_reconstruir_da_lo_mismo_que_las_senales(self):
+        t1, t2, t3, t4 = self.equipos[:4]
+        grupo = self.crear_grupo("Grupo A", [t1, t2, t3, t4])
+        self.jugar(grupo, t1, t2, [(6, 4), (6, 4)])
+        self.jugar(grupo, t2, t1, [(6, 4), (6, 4)])
+        self.jugar(grupo, t3, t4, [(6, 1), (3, 6), (6, 2)])
+        campos = (
+            'equipo_menor_id', 'equipo_mayor_id', 'fase', 'partidos', 'victorias_menor',
+            'victorias_mayor', 'sets_menor', 'sets_mayor', 'games_menor', 'games_mayor',
+        )
+        por_senales = set(Enfrentamiento.objects.filter(torneo=self.torneo).values_list(*campos))
+        self.assertEqual(len(por_senales), 2)
+
+        Enfrentamiento.objects.all().delete()
+        self.assertEqual(reconstruir_enfrentamientos([self.torneo.pk]), 2)
+        self.assertEqual(set(Enfrentamiento.objects.filter(torneo=self.torneo).values_list(*campos)), por_senales)
+        self.assertEqual(reconstruir_enfrentamientos([]), 0)
+
+
+class SimulateTournamentTests(TestCase):
+    """El simulador en lote deja torneos finalizados y consistentes, reproducibles con --seed."""
+
+    def simular(self, **opciones):
+        call_command(
+            'simulate_tournament', teams=12, group_size=3, tournaments=2, seed=7,
+            stdout=StringIO(), **opciones,
+        )
+        return list(Torneo.objects.order_by('-pk')[:2])[::-1]
+
+    def resultados(self, torneo):
+        grupos = PartidoGrupo.objects.filter(grupo__torneo=torneo).order_by('pk').values_list(
+            'equipo1_id', 'equipo2_id', 'e1_set1', 'e2_set1', 'e1_set2', 'e2_set2', 'e1_set3', 'e2_set3'
+        )
+        bracket = torneo.partidos.order_by('ronda', 'orden_partido').values_list(
+            'equipo1_id', 'equipo2_id', 'ganador_id', 'resultado'
+        )
+        return list(grupos), list(bracket)
+
+    def test_torneos_consistentes(self):
+        for torneo in self.simular():
+            with self.subTest(torneo=torneo.nombre):
+                self.assertEqual(torneo.estado, Torneo.Estado.FINALIZADO)
+                self.assertEqual(torneo.inscripciones.count(), 12)
+
+                partidos = PartidoGrupo.objects.filter(grupo__torneo=torneo)
+                # 4 grupos de 3: 3 partidos por grupo, todos con ganador
+                self.assertEqual(partidos.count(), 12)
+                self.assertFalse(partidos.filter(ganador__isnull=True).exists())
+                for partido in partidos:
+                    self.assertEqual(partido.ganador, partido.ganador_por_sets())
+                tabla = EquipoGrupo.objects.filter(grupo__torneo=torneo).aggregate(
+                    ganados=Sum('partidos_ganados'), jugados=Sum('partidos_jugados')
+                )
+                self.assertEqual(tabla, {'ganados': 12, 'jugados': 24})
+
+                final = torneo.partidos.get(siguiente_partido__isnull=True)
+                self.assertEqual(final.ganador_id, torneo.ganador_del_torneo_id)
+                # Cada ganador juega el partido siguiente
+                for partido in torneo.partidos.filter(siguiente_partido__isnull=False):
+                    siguiente = partido.siguiente_partido
+                    self.assertIn(partido.ganador_id, (siguiente.equipo1_id, siguiente.equipo2_id))
+                byes = torneo.partidos.filter(Q(equipo1__isnull=True) | Q(equipo2__isnull=True))
+                self.assertFalse(byes.exclude(resultado=Partido.RESULTADO_BYE).exists())
+                # El head-to-head se reconstruye después de los bulk_create
+                self.assertTrue(Enfrentamiento.objects.filter(torneo=torneo).exists())
+
+    def test_misma_semilla_mismos_resultados(self):
+        primeros = [self.resultados(torneo) for torneo in self.simular()]
+        segundos = [self.resultados(torneo) for torneo in self.simular()]
+        self.assertEqual(primeros, segundos)
+        # El plantel se reutiliza entre corridas
+        self.assertEqual(
+            Inscripcion.objects.values('equipo').annotate(n=Count('pk')).filter(n=4).count(), 12
+        )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class VistasAsyncTests(TestCase):
+    """Home y detalle son vistas async: por ASGI arman el mismo contexto que la versión sync."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 3)
+            for letra in ('a', 'b')
+        ])
+        cls.jugador = jugadores[0]
+        equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        hoy = timezone.now()
+        cls.inscripto, cls.libre = [
+            Torneo.objects.create(
+                nombre=nombre, division=division, fecha_inicio=hoy.date(),
+                fecha_limite_inscripcion=hoy + timedelta(days=7),
+            )
+            for nombre in ("Torneo Apertura", "Torneo Clausura")
+        ]
+        Inscripcion.objects.create(torneo=cls.inscripto, equipo=equipos[0])
+        Inscripcion.objects.create(torneo=cls.libre, equipo=equipos[1])
+
+    async def test_home_marca_los_torneos_del_equipo(self):
+        await self.async_client.aforce_login(self.jugador)
+        respuesta = await self.async_client.get(reverse('core:home'))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(
+            [(t['pk'], t['inscrito'], t['num_inscripciones']) for t in respuesta.context['torneos_abiertos']],
+            [(self.inscripto.pk, True, 1), (self.libre.pk, False, 1)],
+        )
+
+    async def test_detalle_con_el_estado_de_inscripcion(self):
+        await self.async_client.aforce_login(self.jugador)
+        for torneo, inscrito in ((self.inscripto, True), (self.libre, False)):
+            with self.subTest(torneo=torneo.nombre):
+                respuesta = await self.async_client.get(reverse('torneos:detail', args=[torneo.pk]))
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(respuesta.context['object'], torneo)
+                self.assertIs(respuesta.context['ya_inscrito'], inscrito)
+                self.assertIs(respuesta.context['puede_inscribirse'], not inscrito)
+
+    async def test_detalle_inexistente_404(self):
+        respuesta = await self.async_client.get(reverse('torneos:detail', args=[self.libre.pk + 100]))
+        self.assertEqual(respuesta.status_code, 404)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BracketTests(TestCase):
+    """El cuadro se arma en dos consultas y queda en caché hasta que cambia la versión del torneo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 9)
+            for letra in ('a', 'b')
+        ])
+        cls.equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        cls.torneo = Torneo.objects.create(
+            nombre="Torneo", division=division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=Torneo.Estado.EN_JUEGO,
+        )
+        # Dos grupos de 4: códigos A1..A4 y B1..B4 en el orden de los equipos
+        for letra, equipos in (('A', cls.equipos[:4]), ('B', cls.equipos[4:])):
+            grupo = Grupo.objects.create(torneo=cls.torneo, nombre=f"Grupo {letra}")
+            EquipoGrupo.objects.bulk_create([
+                EquipoGrupo(grupo=grupo, equipo=equipo, numero=numero)
+                for numero, equipo in enumerate(equipos, start=1)
+            ])
+        cls.final = crear_bracket_jugado(cls.torneo, cls.equipos)
+
+    def setUp(self):
+        cache.clear()
+        self.torneo.refresh_from_db()
+
+    def test_rondas_lugares_y_grilla(self):
+        with self.assertNumQueries(2):
+            cuadro = bracket(self.torneo)
+        self.assertEqual(cuadro.filas, 4)
+        self.assertEqual(
+            [(r.nombre, r.nombre_corto, r.columna, len(r.partidos)) for r in cuadro.rondas],
+            [('Cuartos de Final', 'Cuartos', 1, 4), ('Semifinal', 'Semifinal', 2, 2), ('Final', 'Final', 3, 1)],
+        )
+        cuartos, semis, (final,) = (ronda.partidos for ronda in cuadro.rondas)
+        self.assertEqual(
+            [(p.equipo1.codigo, p.equipo2.codigo) for p in cuartos],
+            [('A1', 'A2'), ('A3', 'A4'), ('B1', 'B2'), ('B3', 'B4')],
+        )
+        # Gana siempre el equipo1; la final está sin jugar
+        self.assertTrue(all(p.equipo1.gano and not p.equipo2.gano for p in cuartos + semis))
+        self.assertEqual(cuartos[0].ganador.codigo, 'A1')
+        self.assertEqual(cuartos[0].sets, ['6-3', '6-4'])
+        self.assertIsNone(final.ganador)
+        self.assertTrue(final.jugable)
+        self.assertEqual(
+            [(p.fila, p.alto, p.conector, p.entrada) for p in (*cuartos[:2], *semis, final)],
+            [(1, 1, 'abajo', False), (2, 1, 'arriba', False),
+             (1, 2, 'abajo', True), (3, 2, 'arriba', True), (1, 4, None, True)],
+        )
+
+    def test_en_cache_hasta_que_cambia_la_version(self):
+        bracket(self.torneo)
+        # Un cambio sin registrar_cambio no se ve: la clave es la misma versión
+        Partido.objects.filter(pk=self.final.pk).update(equipo2=None)
+        with self.assertNumQueries(0):
+            self.assertTrue(bracket(self.torneo).rondas[-1].partidos[0].jugable)
+
+        Torneo.registrar_cambio(pk=self.torneo.pk)
+        self.torneo.refresh_from_db()
+        final = async_to_sync(abracket)(self.torneo).rondas[-1].partidos[0]
+        self.assertFalse(final.jugable)
+        self.assertFalse(final.equipo2.definido)
+        self.assertEqual(final.equipo2.codigo, '')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CompartirTests(TestCase):
+    """PNG para compartir: se genera una vez por versión, se sirve inmutable y una versión vieja redirige."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 5)
+            for letra in ('a', 'b')
+        ])
+        equipos = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        cls.torneo = Torneo.objects.create(
+            nombre="Torneo Simulación", division=division, fecha_inicio=timezone.now().date(),
+            fecha_limite_inscripcion=timezone.now(), estado=Torneo.Estado.EN_JUEGO,
+        )
+        cls.grupo = Grupo.objects.create(torneo=cls.torneo, nombre="Grupo A")
+        EquipoGrupo.objects.bulk_create([
+            EquipoGrupo(grupo=cls.grupo, equipo=equipo, numero=numero)
+            for numero, equipo in enumerate(equipos, start=1)
+        ])
+        cls.final = crear_bracket_jugado(cls.torneo, equipos)
+
+    def setUp(self):
+        cache.clear()
+        self.raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.raiz)
+        ajustes = override_settings(CONGELADOS_ROOT=self.raiz)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.torneo.refresh_from_db()
+
+    def url(self, nombre, *objeto, version=None):
+        return reverse(
+            f'torneos:compartir_{nombre}', args=[self.torneo.pk, version or self.torneo.version, *objeto]
+        )
+
+    def test_se_genera_una_vez_y_se_sirve_inmutable(self):
+        for nombre, objeto in (('cuadro', ()), ('grupo', (self.grupo.pk,)), ('partido', (self.final.pk,))):
+            with self.subTest(imagen=nombre):
+                respuesta = self.client.get(self.url(nombre, *objeto))
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual(respuesta['Content-Type'], 'image/png')
+                self.assertIn('immutable', respuesta['Cache-Control'])
+                contenido = b''.join(respuesta.streaming_content)
+                self.assertEqual(Image.open(BytesIO(contenido)).format, 'PNG')
+
+                # Ya en disco: sin consultas ni Pillow
+                with self.assertNumQueries(0), mock.patch.object(compartir, 'generar') as generar:
+                    respuesta = self.client.get(self.url(nombre, *objeto))
+                    self.assertEqual(b''.join(respuesta.streaming_content), contenido)
+                generar.assert_not_called()
+
+    def test_version_vieja_redirige_a_la_actual(self):
+        vieja = self.torneo.version
+        self.client.get(self.url('cuadro'))
+        Torneo.registrar_cambio(pk=self.torneo.pk)
+        self.torneo.refresh_from_db()
+
+        # El archivo viejo sigue en disco hasta que se genera el nuevo
+        respuesta = self.client.get(self.url('cuadro', version=vieja + 1))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(compartir.ruta(self.torneo.pk, vieja, 'cuadro').exists())
+        respuesta = self.client.get(self.url('cuadro', version=vieja))
+        self.assertRedirects(respuesta, self.url('cuadro'), fetch_redirect_response=False)
+
+    def test_objeto_de_otro_torneo_404(self):
+        for nombre in ('grupo', 'partido', 'partido_grupo'):
+            with self.subTest(imagen=nombre):
+                self.assertEqual(self.client.get(self.url(nombre, 999_999)).status_code, 404)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TableroTests(TestCase):
+    """Tablero de torneos en juego: pendientes por fase y ronda actual, sin contar los byes vacíos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        division = Division.objects.create(nombre="Séptima")
+        jugadores = crear_jugadores(division, [
+            {'email': f"jugador{i}{letra}@ejemplo.com", 'nombre': f"Jugador{i}", 'apellido': f"Apellido{i}{letra}"}
+            for i in range(1, 7)
+            for letra in ('a', 'b')
+        ])
+        e1, e2, e3, e4, e5, e6 = crear_equipos(zip(jugadores[0::2], jugadores[1::2]), division)
+        hoy = timezone.now()
+        cls.torneo, cls.sin_partidos = [
+            Torneo.objects.create(
+                nombre=nombre, division=division, fecha_inicio=hoy.date() + timedelta(days=dias),
+                fecha_limite_inscripcion=hoy, estado=Torneo.Estado.EN_JUEGO,
+            )
+            for dias, nombre in ((0, "Torneo Apertura"), (1, "Torneo Clausura"))
+        ]
+        Torneo.objects.create(
+            nombre="Torneo abierto", division=division, fecha_inicio=hoy.date(),
+            fecha_limite_inscripcion=hoy + timedelta(days=7),
+        )
+
+        grupo = Grupo.objects.create(torneo=cls.torneo, nombre="Grupo A")
+        jugado = PartidoGrupo(grupo=grupo, equipo1=e1, equipo2=e2)
+        jugado.cargar_sets([(6, 3), (6, 4)])
+        jugado.ganador = e1
+        jugado.save()
+        PartidoGrupo.objects.create(grupo=grupo, equipo1=e3, equipo2=e4)
+
+        # Cuadro de 8 con 6 equipos, como lo arma generar_bracket: el último cruce es un bye vacío
+        final = Partido.objects.create(torneo=cls.torneo, ronda=3, orden_partido=1)
+        semis = [
+            Partido.objects.create(torneo=cls.torneo, ronda=2, orden_partido=i, siguiente_partido=final)
+            for i in (1, 2)
+        ]
+        cruces = [(e1, e2, None), (e3, e4, e3), (e5, e6, None), (None, None, None)]
+        for i, (local, visitante, ganador) in enumerate(cruces, start=1):
+            Partido.objects.create(
+                torneo=cls.torneo, ronda=1, orden_partido=i, equipo1=local, equipo2=visitante,
+                ganador=ganador, siguiente_partido=semis[(i - 1) // 2],
+                resultado=Partido.RESULTADO_BYE if local is None else None,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pendientes_sin_byes_vacios(self):
+        with self.assertNumQueries(1):
+            estado, sin_partidos = tablero.tablero()
+        self.assertEqual((estado.pk, sin_partidos.pk), (self.torneo.pk, self.sin_partidos.pk))
+        self.assertEqual((estado.partidos_grupo, estado.pendientes_grupo, estado.progreso_grupos), (2, 1, 50))
+        self.assertFalse(estado.grupos_cerrados)
+        # 7 partidos: el bye vacío y el cuarto jugado no quedan pendientes
+        self.assertEqual(
+            (estado.partidos_eliminacion, estado.pendientes_eliminacion, estado.jugables_eliminacion),
+            (7, 5, 2),
+        )
+        self.assertEqual(estado.ronda_actual, 'Cuartos de Final')
+        self.assertEqual(sin_partidos.ronda_actual, 'Sin partidos')
+
+        # En caché: los cambios se ven recién cuando vence el TTL
+        Partido.objects.filter(torneo=self.torneo).delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(tablero.tablero()[0].partidos_eliminacion, 7)
+
+    def test_vista_solo_admins_y_fragmento_htmx(self):
+        url = reverse('torneos:admin_tablero')
+        self.client.force_login(User.objects.get(email='jugador1a@ejemplo.com'))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(User.objects.create_superuser(
+            email='admin@ejemplo.com', password='admin123', nombre='Admin', apellido='Test'
+        ))
+        respuesta = self.client.get(url, headers={'HX-Request': 'true'})
+        self.assertTemplateUsed(respuesta, 'torneos/admin_tablero_estado.html')
+        self.assertTemplateNotUsed(respuesta, 'torneos/admin_tablero.html')
+        self.assertContains(respuesta, "Torneo Apertura")
+        self.assertNotContains(respuesta, "Torneo abierto")
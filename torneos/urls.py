@@ -1,4 +1,6 @@
 from django.urls import path
+from core.replicas import en_replica
+
 from . import views
 
 app_name = 'torneos'
@@ -6,9 +8,43 @@ app_name = 'torneos'
 urlpatterns = [
     # Vistas de Jugador
     path(
-        'finalizados/', views.TorneoFinalizadoListView.as_view(), name='finalizado_list'
+        'finalizados/',
+        en_replica(views.TorneoFinalizadoListView.as_view()),
+        name='finalizado_list',
+    ),
+    path('<int:pk>/', en_replica(views.TorneoDetailView.as_view()), name='detail'),
+    path('<int:pk>/json/', views.torneo_json, name='detail_json'),
+    # Imágenes para compartir (la versión del torneo va en la URL)
+    path(
+        '<int:pk>/compartir/v<int:version>/cuadro.png',
+        views.imagen_compartir,
+        {'tipo': 'cuadro'},
+        name='compartir_cuadro',
+    ),
+    path(
+        '<int:pk>/compartir/v<int:version>/grupo-<int:objeto_pk>.png',
+        views.imagen_compartir,
+        {'tipo': 'grupo'},
+        name='compartir_grupo',
+    ),
+    path(
+        '<int:pk>/compartir/v<int:version>/partido-grupo-<int:objeto_pk>.png',
+        views.imagen_compartir,
+        {'tipo': 'partido-grupo'},
+        name='compartir_partido_grupo',
+    ),
+    path(
+        '<int:pk>/compartir/v<int:version>/partido-<int:objeto_pk>.png',
+        views.imagen_compartir,
+        {'tipo': 'partido'},
+        name='compartir_partido',
+    ),
+    # Head-to-head entre dos equipos (widget HTMX)
+    path(
+        'enfrentamiento/<int:pk>/<int:rival_pk>/',
+        views.enfrentamiento,
+        name='enfrentamiento',
     ),
-    path('<int:pk>/', views.TorneoDetailView.as_view(), name='detail'),
     path(
         '<int:torneo_pk>/inscribirse/',
         views.InscripcionCreateView.as_view(),
@@ -16,6 +52,7 @@ urlpatterns = [
     ),
     # Vistas de Admin
     path('admin/listado/', views.AdminTorneoListView.as_view(), name='admin_list'),
+    path('admin/en-juego/', views.AdminTableroView.as_view(), name='admin_tablero'),
     path('admin/crear/', views.AdminTorneoCreateView.as_view(), name='admin_crear'),
     path(
         'admin/<int:pk>/editar/',
@@ -1,19 +1,24 @@
-from django.shortcuts import render, get_object_or_404, redirect
-from django.views.generic import ListView, DetailView, CreateView, UpdateView
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.utils import timezone
-from django.db.models import Q, F
-from random import shuffle
+from django.db.models import Q, F, Count, Max
 from collections import defaultdict
-import math
-from itertools import combinations
-from django.http import HttpResponse
-
-from .models import Torneo, Inscripcion, Partido, Grupo, EquipoGrupo, PartidoGrupo
+from uuid import uuid4
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+
+from . import compartir, congelado, tablero
+from .bracket import abracket, bracket
+from .estadisticas import avictorias_entre, ordenar_grupos, victorias_entre
+from .models import (
+    Torneo, Inscripcion, Partido, Grupo, EquipoGrupo, PartidoGrupo, Enfrentamiento,
+    ResultadoDesactualizado,
+)
 from .forms import (
     TorneoAdminForm,
     CargarResultadoGrupoForm,
@@ -22,6 +27,22 @@ from .forms import (
     PartidoResultadoForm,
 )
 from equipos.models import Equipo
+from core.condicional import (
+    CACHE_FINALIZADO,
+    CACHE_INMUTABLE,
+    CACHE_PUBLICA,
+    GetCondicionalMixin,
+    Validadores,
+    aplicar_validadores,
+    armar_validadores,
+    es_condicional,
+    get_condicional,
+    parte_usuario,
+    respuesta_no_modificada,
+)
+from core.models import Tarea
+from core.paginacion import KeysetPaginationMixin
+from core.tareas import encolar, encolar_una_vez
 
 # --- Mixins de Permisos ---
 
@@ -44,19 +65,6 @@ class AdminRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
         return redirect('core:home')
 
 
-# --- FUNCIONES AUXILIARES ---
-
-
-def generar_partidos_grupos(torneo, equipos, grupo_obj):
-    """Crea un partido de 'todos contra todos' para los equipos dentro de un grupo."""
-    partidos_a_crear = []
-    for equipo1, equipo2 in combinations(equipos, 2):
-        partidos_a_crear.append(
-            PartidoGrupo(grupo=grupo_obj, equipo1=equipo1, equipo2=equipo2)
-        )
-    PartidoGrupo.objects.bulk_create(partidos_a_crear)
-
-
 # --- VISTA DE GESTIÓN PRINCIPAL (LÓGICA CENTRALIZADA) ---
 
 
@@ -84,7 +92,7 @@ class AdminTorneoManageView(AdminRequiredMixin, DetailView):
             )
             .order_by('nombre')
         )
-        context['grupos'] = grupos
+        context['grupos'] = ordenar_grupos(list(grupos), victorias_entre(torneo.pk))
 
         context['partidos_grupo_pendientes'] = PartidoGrupo.objects.filter(
             grupo__torneo=torneo, ganador__isnull=True
@@ -92,189 +100,100 @@ class AdminTorneoManageView(AdminRequiredMixin, DetailView):
 
         context['todos_grupos_cargados'] = (
             context['partidos_grupo_pendientes'] == 0
-        ) and grupos.exists()
+        ) and bool(context['grupos'])
 
         # Fase Eliminatoria
-        context['fase_eliminatoria_existente'] = torneo.partidos.exists()
-        context['partidos_eliminacion'] = torneo.partidos.all().order_by(
-            'ronda', 'orden_partido'
+        context['bracket'] = bracket(torneo)
+        context['fase_eliminatoria_existente'] = bool(context['bracket'])
+
+        # Tareas en cola o en ejecución sobre este torneo
+        context['tareas_activas'] = Tarea.objects.filter(
+            parametros__torneo_id=torneo.pk,
+            estado__in=[Tarea.Estado.PENDIENTE, Tarea.Estado.EN_CURSO],
         )
+        # Idempotencia: un reenvío de este mismo formulario no repite la acción
+        context['clave_accion'] = uuid4().hex
 
         return context
 
+    # Acciones pesadas: se encolan y el worker las ejecuta (ver torneos/tareas.py)
+    ACCIONES_EN_COLA = {
+        'iniciar_torneo': 'iniciar_torneo',
+        'generar_octavos': 'generar_bracket',
+        'reset_bracket': 'reset_bracket',
+    }
+    # Estado en el que tiene que estar el torneo para encolar la acción. La
+    # tarea lo vuelve a comprobar con un UPDATE condicional al ejecutarse.
+    ESTADO_REQUERIDO = {
+        'iniciar_torneo': Torneo.Estado.ABIERTO,
+        'generar_octavos': Torneo.Estado.EN_JUEGO,
+        'reset_bracket': Torneo.Estado.EN_JUEGO,
+    }
+
     def post(self, request, *args, **kwargs):
         torneo = self.get_object()
         action = request.POST.get('action')
 
-        if action == 'iniciar_torneo':
-            return self.iniciar_torneo_logica(request, torneo)
-
-        elif action == 'generar_octavos':
-            return self.generar_octavos_logica(request, torneo)
-        
-        elif action == 'reset_bracket':
-            # Eliminar todos los partidos de eliminación
-            torneo.partidos.all().delete()
-            messages.success(request, "Bracket eliminado. Puedes generar uno nuevo.")
+        if action in self.ACCIONES_EN_COLA:
+            requerido = self.ESTADO_REQUERIDO.get(action)
+            if requerido and torneo.estado != requerido:
+                messages.warning(request, "El torneo ya cambió de estado: no se repite la acción.")
+                return redirect('torneos:admin_manage', pk=torneo.pk)
+            _, creada = encolar_una_vez(
+                request.POST.get('clave', '')[:64] or None,
+                self.ACCIONES_EN_COLA[action],
+                usuario=request.user,
+                torneo_id=torneo.pk,
+            )
+            if creada:
+                messages.info(request, "Operación en curso. La página se actualizará al terminar.")
+            else:
+                messages.info(request, "Esa operación ya se había enviado.")
             return redirect('torneos:admin_manage', pk=torneo.pk)
 
         elif action == 'finalizar_torneo':
-            torneo.estado = Torneo.Estado.FINALIZADO
-            torneo.save()
-            messages.success(request, "Torneo finalizado.")
+            if Torneo.pasar_a(torneo.pk, Torneo.Estado.FINALIZADO):
+                messages.success(request, "Torneo finalizado.")
+            else:
+                messages.warning(request, "El torneo no estaba en juego: no se finalizó.")
             return redirect('torneos:admin_manage', pk=torneo.pk)
 
         return redirect('torneos:admin_manage', pk=torneo.pk)
 
-    # --- LÓGICA DE NEGOCIO INTERNA ---
 
-    def iniciar_torneo_logica(self, request, torneo):
-        if torneo.estado != Torneo.Estado.ABIERTO:
-            return redirect('torneos:admin_manage', pk=torneo.pk)
-
-        inscripciones = torneo.inscripciones.all()
-        count = inscripciones.count()
-
-        # Limpiar grupos anteriores si existen (para evitar duplicados al reiniciar)
-        if torneo.grupos.exists():
-            torneo.grupos.all().delete()
-
-        if count < 4:
-            messages.error(request, f"Se necesitan al menos 4 equipos. Hay {count}.")
-            return redirect('torneos:admin_manage', pk=torneo.pk)
-
-        equipos = [i.equipo for i in inscripciones]
-        shuffle(equipos)
-
-        # Usar el tamaño de grupo configurado en el torneo
-        equipos_por_grupo = torneo.equipos_por_grupo
-        num_grupos = (count + equipos_por_grupo - 1) // equipos_por_grupo
-        letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-
-        for i in range(num_grupos):
-            grupo = Grupo.objects.create(torneo=torneo, nombre=f"Grupo {letras[i]}")
-            equipos_del_grupo = []
-            for _ in range(equipos_por_grupo):
-                if equipos:
-                    equipos_del_grupo.append(equipos.pop())
-
-            for idx, eq in enumerate(equipos_del_grupo, start=1):
-                EquipoGrupo.objects.create(grupo=grupo, equipo=eq, numero=idx)
+# --- OTRAS VISTAS (Carga de Resultados, etc.) ---
 
-            generar_partidos_grupos(torneo, equipos_del_grupo, grupo)
 
-        torneo.estado = Torneo.Estado.EN_JUEGO
-        torneo.save()
-        messages.success(
-            request, f"Fase de Grupos generada: {num_grupos} grupos creados."
-        )
-        return redirect('torneos:admin_manage', pk=torneo.pk)
+class ResultadoModalMixin:
+    """
+    Guardado de los modales de resultado. Si otro admin cargó el partido
+    mientras este lo editaba (ResultadoDesactualizado), no se pisa nada: el
+    modal vuelve con lo que quedó guardado y un aviso para revisar.
+    """
 
-    def generar_octavos_logica(self, request, torneo):
-        # Permitir regeneración si se eliminaron los partidos
-        # if torneo.partidos.exists():
-        #     messages.warning(request, "La fase de eliminación ya fue generada.")
-        #     return redirect('torneos:admin_manage', pk=torneo.pk)
-
-        # 1. Obtener clasificados (1ro y 2do de cada grupo)
-        clasificados = []
-        grupos = torneo.grupos.all().order_by('nombre')
-
-        for grupo in grupos:
-            tabla = grupo.tabla.all()  # Ya viene ordenada por mérito (PG, DS, DG)
-            # Clasifican los primeros 2 de cada grupo (estándar para grupos de 3 o 4 equipos)
-            num_clasificados_por_grupo = 2
-            for i in range(min(len(tabla), num_clasificados_por_grupo)):
-                clasificados.append(tabla[i].equipo)
-
-        num_equipos = len(clasificados)
-
-        if num_equipos < 4:
-            messages.error(
-                request,
-                f"Solo hay {num_equipos} clasificados. Se necesitan al menos 4.",
-            )
-            return redirect('torneos:admin_manage', pk=torneo.pk)
+    def form_valid(self, form):
+        try:
+            response = super().form_valid(form)
+        except ResultadoDesactualizado:
+            return self.conflicto()
+        if self.request.headers.get('HX-Request'):
+            return HttpResponse('<script>window.location.reload();</script>')
+        return response
 
-        # 2. Calcular tamaño del bracket (Potencia de 2)
-        import math
-        bracket_size = 2 ** math.ceil(math.log2(num_equipos))
-        num_byes = bracket_size - num_equipos
-        slots = clasificados + [None] * num_byes
-
-        # 3. Calcular número de rondas
-        # bracket_size = 4 -> 2 rondas (Semifinal=1, Final=2)
-        # bracket_size = 8 -> 3 rondas (Cuartos=1, Semifinal=2, Final=3)
-        # bracket_size = 16 -> 4 rondas (Octavos=1, Cuartos=2, Semifinal=3, Final=4)
-        num_rondas = int(math.log2(bracket_size))
-        ronda_inicio = 1  # Siempre empezamos en ronda 1
-        
-        # 4. Generar todas las rondas desde la primera hasta la final
-        partidos_por_ronda = {}
-        
-        # Generar partidos de la ronda inicial (la más grande)
-        cant_partidos_r1 = bracket_size // 2
-        partidos_por_ronda[ronda_inicio] = []
-        
-        for i in range(cant_partidos_r1):
-            e1 = slots.pop(0) if slots else None
-            e2 = slots.pop(0) if slots else None
-
-            p = Partido.objects.create(
-                torneo=torneo,
-                ronda=ronda_inicio,
-                orden_partido=i + 1,
-                equipo1=e1,
-                equipo2=e2,
-            )
-            partidos_por_ronda[ronda_inicio].append(p)
-
-            # MANEJO DE BYES
-            if e1 and not e2:
-                p.ganador = e1
-                p.resultado = "Bye"
-                p.save()
-            elif not e1 and e2:
-                p.ganador = e2
-                p.resultado = "Bye"
-                p.save()
-            elif not e1 and not e2:
-                p.resultado = "Bye"
-                p.save()
-
-        # 5. Generar las rondas superiores (vacías por ahora)
-        for ronda_num in range(2, num_rondas + 1):
-            cant_partidos = bracket_size // (2 ** ronda_num)
-            partidos_por_ronda[ronda_num] = []
-            
-            for i in range(cant_partidos):
-                p = Partido.objects.create(
-                    torneo=torneo,
-                    ronda=ronda_num,
-                    orden_partido=i + 1,
-                )
-                partidos_por_ronda[ronda_num].append(p)
-
-        # 6. Enlazar partidos con siguiente_partido
-        for ronda_num in range(1, num_rondas):
-            partidos_actuales = partidos_por_ronda[ronda_num]
-            partidos_siguientes = partidos_por_ronda.get(ronda_num + 1, [])
-            
-            for i, partido in enumerate(partidos_actuales):
-                if partidos_siguientes:
-                    partido.siguiente_partido = partidos_siguientes[i // 2]
-                    partido.save()
-
-        messages.success(
-            request, f"Bracket de {bracket_size} generado con {num_equipos} equipos."
+    def conflicto(self):
+        self.object = self.get_object()
+        marcador = self.object.marcador() or 'sin resultado'
+        context = self.get_context_data(
+            form=self.get_form_class()(instance=self.object),
+            conflicto=(
+                f"Otro admin guardó este partido mientras lo editabas ({marcador}). "
+                "Revisá el resultado y volvé a guardar si hay que cambiarlo."
+            ),
         )
-        return redirect('torneos:admin_manage', pk=torneo.pk)
+        return self.render_to_response(context)
 
 
-# --- OTRAS VISTAS (Carga de Resultados, etc.) ---
-
-
-class CargarResultadoGrupoView(AdminRequiredMixin, UpdateView):
+class CargarResultadoGrupoView(AdminRequiredMixin, ResultadoModalMixin, UpdateView):
     model = PartidoGrupo
     form_class = CargarResultadoGrupoForm
     template_name = 'torneos/cargar_resultado_grupo.html'
@@ -284,14 +203,8 @@ class CargarResultadoGrupoView(AdminRequiredMixin, UpdateView):
             'torneos:admin_manage', kwargs={'pk': self.object.grupo.torneo.pk}
         )
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
-        if self.request.headers.get('HX-Request'):
-            return HttpResponse('<script>window.location.reload();</script>')
-        return response
-
 
-class AdminPartidoUpdateView(AdminRequiredMixin, UpdateView):
+class AdminPartidoUpdateView(AdminRequiredMixin, ResultadoModalMixin, UpdateView):
     model = Partido
     form_class = PartidoResultadoForm
     template_name = 'torneos/admin_partido_form.html'
@@ -302,12 +215,6 @@ class AdminPartidoUpdateView(AdminRequiredMixin, UpdateView):
             'torneos:admin_manage', kwargs={'pk': self.object.torneo.pk}
         )
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
-        if self.request.headers.get('HX-Request'):
-            return HttpResponse('<script>window.location.reload();</script>')
-        return response
-
 
 # --- VISTAS CRUD (List, Create, Update, Detail) ---
 
@@ -319,6 +226,25 @@ class AdminTorneoListView(AdminRequiredMixin, ListView):
     queryset = Torneo.objects.select_related('division').order_by('-fecha_inicio')
 
 
+class AdminTableroView(AdminRequiredMixin, TemplateView):
+    """
+    Torneos en juego con partidos pendientes y ronda actual (ver
+    torneos.tablero). Por HTMX devuelve solo el fragmento que se refresca.
+    """
+    template_name = 'torneos/admin_tablero.html'
+
+    def get_template_names(self):
+        if self.request.headers.get('HX-Request'):
+            return ['torneos/admin_tablero_estado.html']
+        return [self.template_name]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['torneos'] = tablero.tablero()
+        context['refresco'] = tablero.REFRESCO
+        return context
+
+
 class AdminTorneoCreateView(AdminRequiredMixin, CreateView):
     model = Torneo
     form_class = TorneoAdminForm
@@ -346,12 +272,75 @@ class AdminTorneoUpdateView(AdminRequiredMixin, UpdateView):
 
 
 class TorneoDetailView(DetailView):
+    """
+    Detalle público del torneo. Vista async: los datos se cargan con el ORM
+    asíncrono y la TemplateResponse se renderiza en un hilo (lo hace Django).
+    """
     model = Torneo
     template_name = 'torneos/torneo_detail.html'
     context_object_name = 'torneo'
+    # Finalizados + anónimo: se sirve (o se genera) la página congelada en disco
+    servir_congelado = True
+
+    async def get(self, request, *args, **kwargs):
+        # Se reemplaza el usuario perezoso para que el template no lo vuelva a consultar
+        request.user = await request.auser()
+        self.version_torneo = None
+        validadores = await self.aget_validadores() if es_condicional(request) else None
+        if no_modificada := respuesta_no_modificada(request, validadores):
+            return no_modificada
+
+        archivo = self.ruta_congelada()
+        if archivo:
+            if not archivo.exists():
+                # Primera visita en esta instancia: se congela un render propio
+                await congelado.acongelar_html(
+                    self.kwargs[self.pk_url_kwarg], self.version_torneo['version']
+                )
+            respuesta = FileResponse(archivo.open('rb'), content_type='text/html; charset=utf-8')
+            return aplicar_validadores(respuesta, validadores)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+        self.object = await aget_object_or_404(
+            Torneo.objects.select_related('division', 'ganador_del_torneo'),
+            pk=self.kwargs[self.pk_url_kwarg],
+        )
+        context = await self.aget_context_data(object=self.object)
+        return aplicar_validadores(self.render_to_response(context), validadores)
+
+    def ruta_congelada(self):
+        """Ruta del HTML congelado si esta visita puede usarlo; None si no."""
+        torneo = self.version_torneo
+        if (
+            not self.servir_congelado
+            or torneo is None
+            or torneo['estado'] != Torneo.Estado.FINALIZADO
+            or self.request.user.is_authenticated
+        ):
+            return None
+        return congelado.ruta(self.kwargs[self.pk_url_kwarg], torneo['version'], 'html')
+
+    async def aget_validadores(self):
+        """ETag a partir de la versión del torneo: una consulta, sin armar el contexto."""
+        self.version_torneo = torneo = await Torneo.objects.filter(
+            pk=self.kwargs[self.pk_url_kwarg]
+        ).values('version', 'actualizado', 'estado', 'fecha_limite_inscripcion').afirst()
+        if torneo is None:
+            return None
+        user = self.request.user
+        equipo = await user.aequipo() if user.is_authenticated else None
+        # El cierre de inscripción depende de la hora, no de una escritura
+        cerrada = int(timezone.now() > torneo['fecha_limite_inscripcion'])
+        etag = (
+            f"torneo-{self.kwargs[self.pk_url_kwarg]}-v{torneo['version']}-{cerrada}-"
+            f"{parte_usuario(user, equipo)}"
+        )
+        finalizado = torneo['estado'] == Torneo.Estado.FINALIZADO
+        return armar_validadores(
+            etag, user, torneo['actualizado'], CACHE_FINALIZADO if finalizado else CACHE_PUBLICA
+        )
+
+    async def aget_context_data(self, **kwargs):
+        context = self.get_context_data(**kwargs)
         torneo = self.object
         user = self.request.user
         grupos = torneo.grupos.all().prefetch_related(
@@ -359,31 +348,24 @@ class TorneoDetailView(DetailView):
             'partidos_grupo__equipo1',
             'partidos_grupo__equipo2'
         )
-        context['grupos'] = grupos
-        context['partidos_eliminacion'] = torneo.partidos.all().order_by(
-            'ronda', 'orden_partido'
-        )
-        if context['partidos_eliminacion'].exists():
-            from django.db.models import Max
-            context['total_rondas'] = context['partidos_eliminacion'].aggregate(Max('ronda'))['ronda__max']
-        
-        context['tiene_equipo'] = (
-            user.is_authenticated
-            and hasattr(user, 'equipo')
-            and user.equipo is not None
+        context['grupos'] = ordenar_grupos(
+            [grupo async for grupo in grupos], await avictorias_entre(torneo.pk)
         )
+        context['bracket'] = await abracket(torneo)
+
+        equipo = await user.aequipo() if user.is_authenticated else None
+        context['tiene_equipo'] = equipo is not None
         if context['tiene_equipo']:
-            equipo = user.equipo
             context['equipo'] = equipo
-            context['ya_inscrito'] = Inscripcion.objects.filter(
+            context['ya_inscrito'] = await Inscripcion.objects.filter(
                 torneo=torneo, equipo=equipo
-            ).exists()
-            context['division_correcta'] = equipo.division == torneo.division
+            ).aexists()
+            context['division_correcta'] = equipo.division_id == torneo.division_id
             context['torneo_abierto'] = torneo.estado == Torneo.Estado.ABIERTO
             context['inscripcion_cerrada'] = (
                 timezone.now() > torneo.fecha_limite_inscripcion
             )
-            context['hay_cupos'] = torneo.inscripciones.count() < torneo.cupos_totales
+            context['hay_cupos'] = await torneo.inscripciones.acount() < torneo.cupos_totales
             context['puede_inscribirse'] = (
                 context['tiene_equipo']
                 and context['torneo_abierto']
@@ -396,14 +378,97 @@ class TorneoDetailView(DetailView):
         return context
 
 
-class TorneoFinalizadoListView(ListView):
+class TorneoFinalizadoListView(GetCondicionalMixin, KeysetPaginationMixin, ListView):
     model = Torneo
     template_name = 'torneos/torneo_finalizado_list.html'
     context_object_name = 'torneos_finalizados'
     queryset = Torneo.objects.filter(estado=Torneo.Estado.FINALIZADO) \
-        .select_related('division') \
-        .order_by('-fecha_inicio')
+        .select_related('division', 'ganador_del_torneo')
     paginate_by = 10
+    orden_keyset = ('-fecha_inicio', 'id')
+
+    def get_validadores(self):
+        # Cualquier alta, baja o cambio de un finalizado mueve el total o el máximo
+        resumen = Torneo.objects.filter(estado=Torneo.Estado.FINALIZADO).aggregate(
+            total=Count('id'), ultimo=Max('actualizado')
+        )
+        ultimo = resumen['ultimo']
+        user = self.request.user
+        etag = (
+            f"finalizados-{resumen['total']}-{ultimo.timestamp() if ultimo else 0}-"
+            f"{parte_usuario(user, user.equipo if user.is_authenticated else None)}"
+        )
+        return armar_validadores(etag, user, ultimo)
+
+
+def validadores_json(request, pk):
+    torneo = Torneo.objects.filter(pk=pk).values('version', 'actualizado', 'estado').first()
+    if torneo is None:
+        return None
+    finalizado = torneo['estado'] == Torneo.Estado.FINALIZADO
+    # El JSON es igual para todos los usuarios: siempre público
+    return Validadores(
+        f'W/"torneo-json-{pk}-v{torneo["version"]}"',
+        torneo['actualizado'],
+        dict(CACHE_FINALIZADO if finalizado else CACHE_PUBLICA),
+    )
+
+
+@get_condicional(validadores_json)
+def torneo_json(request, pk):
+    """Grupos, tablas y bracket del torneo en JSON (congelado en disco si está finalizado)."""
+    torneo = get_object_or_404(
+        Torneo.objects.select_related('division', 'ganador_del_torneo'), pk=pk
+    )
+    if torneo.estado != Torneo.Estado.FINALIZADO:
+        return HttpResponse(congelado.json_torneo(torneo), content_type='application/json')
+
+    archivo = congelado.ruta(torneo.pk, torneo.version, 'json')
+    if not archivo.exists():
+        congelado.guardar(torneo.pk, torneo.version, 'json', congelado.json_torneo(torneo))
+    return FileResponse(archivo.open('rb'), content_type='application/json')
+
+
+def imagen_compartir(request, pk, version, tipo, objeto_pk=None):
+    """
+    PNG para compartir (partido, grupo o cuadro) de la versión `version` del
+    torneo. Si ya está en disco se sirve directo, sin consultas; si no, se
+    genera una vez. Una versión vieja redirige a la imagen actual.
+    """
+    archivo = compartir.ruta(pk, version, tipo, objeto_pk)
+    if not archivo.exists():
+        torneo = get_object_or_404(Torneo.objects.select_related('division'), pk=pk)
+        if torneo.version != version:
+            argumentos = {'pk': pk, 'version': torneo.version}
+            if objeto_pk is not None:
+                argumentos['objeto_pk'] = objeto_pk
+            return redirect(request.resolver_match.view_name, **argumentos)
+        archivo = compartir.guardar(
+            torneo, tipo, objeto_pk, compartir.generar(torneo, tipo, objeto_pk)
+        )
+    respuesta = FileResponse(archivo.open('rb'), content_type='image/png')
+    patch_cache_control(respuesta, **CACHE_INMUTABLE)
+    return respuesta
+
+
+def enfrentamiento(request, pk, rival_pk):
+    """
+    Widget de head-to-head: historial de `pk` contra `rival_pk` en todos los
+    torneos y, con ?torneo=<id>, en ese torneo. Lee la tabla Enfrentamiento
+    (par ordenado), sin recorrer partidos.
+    """
+    equipos = Equipo.objects.in_bulk([pk, rival_pk])
+    if pk == rival_pk or len(equipos) != 2:
+        raise Http404("Equipos inválidos.")
+    context = {
+        'equipo': equipos[pk],
+        'rival': equipos[rival_pk],
+        'historico': Enfrentamiento.resumen(pk, rival_pk),
+    }
+    torneo_id = request.GET.get('torneo')
+    if torneo_id and torneo_id.isdigit():
+        context['en_torneo'] = Enfrentamiento.resumen(pk, rival_pk, torneo_id=int(torneo_id))
+    return render(request, 'torneos/enfrentamiento.html', context)
 
 
 class InscripcionCreateView(PlayerRequiredMixin, CreateView):
@@ -415,7 +480,10 @@ class InscripcionCreateView(PlayerRequiredMixin, CreateView):
         return reverse_lazy('torneos:detail', kwargs={'pk': self.kwargs['torneo_pk']})
 
     def get_torneo(self):
-        return get_object_or_404(Torneo, pk=self.kwargs['torneo_pk'])
+        # Se usa en dispatch, get_context_data y form_valid: una sola consulta
+        if not hasattr(self, '_torneo'):
+            self._torneo = get_object_or_404(Torneo, pk=self.kwargs['torneo_pk'])
+        return self._torneo
 
     def dispatch(self, request, *args, **kwargs):
         if not hasattr(request.user, 'equipo') or not request.user.equipo:
@@ -429,7 +497,7 @@ class InscripcionCreateView(PlayerRequiredMixin, CreateView):
         if Inscripcion.objects.filter(torneo=torneo, equipo=equipo).exists():
             messages.warning(request, "Tu equipo ya está inscrito.")
             return redirect(reverse_lazy('torneos:detail', kwargs={'pk': torneo.pk}))
-        if equipo.division != torneo.division:
+        if equipo.division_id != torneo.division_id:
             messages.error(request, "División incorrecta.")
             return redirect(reverse_lazy('torneos:detail', kwargs={'pk': torneo.pk}))
         if torneo.inscripciones.count() >= torneo.cupos_totales:
@@ -457,76 +525,12 @@ def crear_torneo_prueba(request):
     """
     Vista protegida para admins que crea un torneo de prueba con 24 equipos.
     Accesible desde la interfaz web sin necesidad de shell.
+    La creación corre como tarea en segundo plano; se redirige a su progreso.
     """
     # Verificar que el usuario sea admin
     if request.user.tipo_usuario != 'ADMIN':
         messages.error(request, "Acceso denegado: solo administradores.")
         return redirect('core:home')
-    
-    from accounts.models import Division
-    from django.contrib.auth import get_user_model
-    from datetime import timedelta
-    import string
-    
-    User = get_user_model()
-    
-    # Limpiar datos de prueba anteriores
-    Torneo.objects.filter(nombre__startswith="Torneo 24 Equipos").delete()
-    User.objects.filter(email__contains='@ejemplo.com').delete()
-    
-    # Crear división
-    division, _ = Division.objects.get_or_create(nombre="Séptima")
-    
-    # Crear torneo
-    torneo_nombre = f"Torneo 24 Equipos - {timezone.now().strftime('%Y-%m-%d %H:%M')}"
-    torneo = Torneo.objects.create(
-        nombre=torneo_nombre,
-        division=division,
-        fecha_inicio=timezone.now().date(),
-        fecha_limite_inscripcion=timezone.now() + timedelta(days=7),
-        cupos_totales=24,
-        equipos_por_grupo=3,
-        estado=Torneo.Estado.ABIERTO
-    )
-    
-    # Crear 24 equipos
-    for i in range(1, 25):
-        sufijo = string.ascii_lowercase[i % 26] if i > 26 else ''
-        email1 = f"jugador{i}a{sufijo}@ejemplo.com"
-        email2 = f"jugador{i}b{sufijo}@ejemplo.com"
-        
-        jugador1 = User.objects.create_user(
-            email=email1,
-            nombre=f'Jugador{i}A',
-            apellido=f'Sim{i}A',
-            division=division,
-            tipo_usuario='PLAYER',
-            password='sim123456'
-        )
-        
-        jugador2 = User.objects.create_user(
-            email=email2,
-            nombre=f'Jugador{i}B',
-            apellido=f'Sim{i}B',
-            division=division,
-            tipo_usuario='PLAYER',
-            password='sim123456'
-        )
-        
-        equipo = Equipo.objects.create(
-            jugador1=jugador1,
-            jugador2=jugador2,
-            division=division
-        )
-        
-        Inscripcion.objects.create(
-            torneo=torneo,
-            equipo=equipo
-        )
-    
-    messages.success(
-        request, 
-        f"✓ Torneo de prueba creado con 24 equipos. "
-        f"Ahora puedes iniciar el torneo para crear los grupos."
-    )
-    return redirect('torneos:admin_manage', pk=torneo.pk)
+
+    tarea = encolar('crear_torneo_prueba', usuario=request.user, num_equipos=24)
+    return redirect('core:tarea_detalle', pk=tarea.pk)